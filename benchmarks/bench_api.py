@@ -0,0 +1,171 @@
+"""Query-count and latency regression checks for the API endpoints.
+
+Every endpoint runs against synthetic tournaments of each ``--bench-sizes``
+size with the cache cleared before each request, so the database path is
+measured. The query count must stay under a size-independent bound (an N+1
+shows up as a failure at the larger sizes) and is compared with p50/p95
+latencies against ``benchmarks/baseline.json`` (see ``conftest.py``).
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.urls import reverse
+from tournament.models import Match, Score, Tournament
+
+# Widest bulk row written by an endpoint (a standings row).
+PARAMS_PER_ROW = 8
+
+
+@dataclass
+class Endpoint:
+    name: str
+    max_queries: int
+    url: Callable[[Tournament], str]
+    method: str = "get"
+    # Request body of the n-th sample.
+    payload: Optional[Callable[[Tournament, int], Dict[str, Any]]] = None
+    status: int = 200
+    # Bulk statements that Django splits on backends with a parameter limit.
+    bulk_statements: int = 0
+
+    def query_budget(self, size: int) -> int:
+        """``max_queries`` on PostgreSQL, plus the batches other backends need."""
+        max_params = connection.features.max_query_params
+        if max_params is None or not self.bulk_statements:
+            return self.max_queries
+        batches = math.ceil(size * PARAMS_PER_ROW / max_params)
+        return self.max_queries + self.bulk_statements * (batches - 1)
+
+
+def first_match(tournament: Tournament) -> Match:
+    return Match.objects.filter(tournament=tournament).order_by("id").first()
+
+
+def round_results(tournament: Tournament, sample: int) -> Dict[str, Any]:
+    # Alternate the winners so every sample writes every board.
+    matches = Match.objects.filter(tournament=tournament, round_number=2)
+    return {
+        "results": [
+            {
+                "match": match.id,
+                "winner": match.player1_id if sample % 2 else match.player2_id,
+            }
+            for match in matches
+        ]
+    }
+
+
+def new_tournament(tournament: Tournament, sample: int) -> Dict[str, Any]:
+    return {
+        "name": f"{tournament.name} copy {sample}",
+        "start_date": "2024-08-01",
+        "end_date": "2024-08-10",
+        "participants": list(tournament.participants.values_list("id", flat=True)),
+    }
+
+
+ENDPOINTS = [
+    Endpoint("tournament-list", 2, lambda t: reverse("tournament-list-create")),
+    Endpoint(
+        "tournament-detail", 2, lambda t: reverse("tournament-detail", args=[t.pk])
+    ),
+    Endpoint(
+        "tournament-participants",
+        2,
+        lambda t: reverse("tournament-participants", args=[t.pk]),
+    ),
+    Endpoint(
+        "tournament-leaderboard",
+        1,
+        lambda t: reverse("tournament-leaderboard", args=[t.pk]),
+    ),
+    Endpoint("match-list", 1, lambda t: reverse("match-list-create")),
+    Endpoint(
+        "match-list-expanded",
+        1,
+        lambda t: reverse("match-list-create") + "?expand=player1,player2,winner",
+    ),
+    Endpoint(
+        "match-detail", 1, lambda t: reverse("match-detail", args=[first_match(t).pk])
+    ),
+    Endpoint("score-list", 1, lambda t: reverse("score-list-create")),
+    Endpoint(
+        "score-detail",
+        1,
+        lambda t: reverse(
+            "score-detail", args=[Score.objects.filter(tournament=t).first().pk]
+        ),
+    ),
+    Endpoint("player-list", 1, lambda t: reverse("player-list-create")),
+    Endpoint(
+        "player-search",
+        1,
+        lambda t: reverse("player-list-create") + "?search=nor&ordering=-rating",
+    ),
+    Endpoint(
+        "player-detail",
+        1,
+        lambda t: reverse("player-detail", args=[t.participants.first().pk]),
+    ),
+    Endpoint(
+        "round-results",
+        18,
+        lambda t: reverse("tournament-round-results", args=[t.pk, 2]),
+        method="post",
+        payload=round_results,
+        bulk_statements=2,
+    ),
+    Endpoint(
+        "tournament-create",
+        8,
+        lambda t: reverse("tournament-list-create"),
+        method="post",
+        payload=new_tournament,
+        status=201,
+        bulk_statements=3,
+    ),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("endpoint", ENDPOINTS, ids=lambda endpoint: endpoint.name)
+def test_endpoint(
+    endpoint,
+    size,
+    synthetic_tournament,
+    admin_client,
+    bench_baseline,
+    django_assert_max_num_queries,
+    request,
+):
+    url = endpoint.url(synthetic_tournament)
+    samples = request.config.getoption("bench_samples")
+    payloads = [
+        endpoint.payload(synthetic_tournament, sample) if endpoint.payload else None
+        for sample in range(samples + 1)
+    ]
+    send = getattr(admin_client, endpoint.method)
+
+    def call(payload):
+        cache.clear()
+        started = time.perf_counter()
+        response = send(url, payload, format="json") if payload else send(url)
+        elapsed = time.perf_counter() - started
+        assert response.status_code == endpoint.status, response.content[:500]
+        return elapsed
+
+    # First request: warm-up and query count. Building the dataset can fill
+    # the (bounded) query log, which would hide this request's queries.
+    reset_queries()
+    with django_assert_max_num_queries(endpoint.query_budget(size)) as queries:
+        call(payloads[0])
+    # Read the count now: later requests reset the query log it slices.
+    query_count = len(queries)
+    timings = [call(payload) for payload in payloads[1:]]
+    bench_baseline.check(f"{endpoint.name}[{size}]", query_count, timings)
@@ -0,0 +1,65 @@
+"""Queries and latency of authenticated cached GETs, with and without the
+user cache of ``CachedJWTAuthentication``.
+
+Needs a database, so it runs under pytest:
+
+    pytest benchmarks/bench_auth.py -s
+"""
+
+import statistics
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from user.authentication import CachedJWTAuthentication, local_users
+from user.models import Player
+
+REQUESTS = 200
+
+
+def measure(client, url):
+    client.get(url)  # Fill the response and user caches.
+    timings = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(REQUESTS):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200
+    return len(queries) / REQUESTS, timings
+
+
+@pytest.mark.django_db
+def test_cached_reads_make_no_queries(monkeypatch):
+    cache.clear()
+    local_users.clear()
+    user = User.objects.create_user(username="reader", password="password")
+    Player.objects.create(user=user, name="Reader", age=30, country="USA")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    url = reverse("player-list-create")
+
+    results = {}
+    for label, authentication in [
+        ("jwt", JWTAuthentication),
+        ("cached", CachedJWTAuthentication),
+    ]:
+        monkeypatch.setattr(APIView, "authentication_classes", [authentication])
+        results[label] = measure(client, url)
+    for label, (queries, timings) in results.items():
+        timings.sort()
+        print(
+            f"{label:>7}: {queries:.1f} queries/request, "
+            f"p50 {statistics.median(timings) * 1000:.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms"
+        )
+    assert results["jwt"][0] >= 1
+    assert results["cached"][0] == 0
@@ -0,0 +1,91 @@
+"""Compare per-match result reporting with the bulk round endpoint.
+
+Needs a database, so it runs under pytest:
+
+    pytest benchmarks/bench_round_results.py -s
+"""
+
+import time
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from tournament.models import Match, Tournament
+from user.models import Player
+
+BOARDS = 500
+
+
+def create_round(name, boards):
+    password = make_password("password")
+    users = User.objects.bulk_create(
+        [User(username=f"{name}-{i}", password=password) for i in range(boards * 2)]
+    )
+    players = Player.objects.bulk_create(
+        [
+            Player(user=user, name=user.username, age=20, rating=1500, country="USA")
+            for user in users
+        ]
+    )
+    tournament = Tournament.objects.create(
+        name=name, start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    Match.objects.bulk_create(
+        [
+            Match(
+                tournament=tournament,
+                player1=players[i],
+                player2=players[i + 1],
+                round_number=1,
+            )
+            for i in range(0, len(players), 2)
+        ]
+    )
+    return tournament, list(Match.objects.filter(tournament=tournament))
+
+
+def report(label, elapsed, queries):
+    print(
+        f"{label:>10}: {BOARDS} boards in {elapsed * 1000:8.1f} ms, "
+        f"{queries} queries"
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_results_against_per_match_updates():
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_superuser(username="arbiter", password="password")
+    )
+
+    _, matches = create_round("Per match", BOARDS)
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for match in matches:
+            response = client.put(
+                reverse("match-detail", args=[match.pk]),
+                {"winner": match.player1_id},
+                format="json",
+            )
+            assert response.status_code == 200
+        per_match = time.perf_counter() - started
+    report("per match", per_match, len(queries))
+
+    tournament, matches = create_round("Bulk", BOARDS)
+    payload = {"results": [{"match": m.pk, "winner": m.player1_id} for m in matches]}
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.post(
+            reverse("tournament-round-results", args=[tournament.pk, 1]),
+            payload,
+            format="json",
+        )
+        bulk = time.perf_counter() - started
+    assert response.status_code == 200
+    report("bulk", bulk, len(queries))
+    print(f"{'speedup':>10}: {per_match / bulk:.1f}x")
@@ -0,0 +1,63 @@
+"""Per-row cost of the ModelSerializer read path against the values() one.
+
+Renders every match, standings row and player of the synthetic tournaments
+both ways (query included) and reports the cost per row:
+
+    pytest benchmarks/bench_serializers.py -s --bench-sizes 1000,10000
+"""
+
+import time
+
+import pytest
+from player.serializers import PlayerSerializer
+from tournament.serializers import MatchSerializer, ScoreSerializer
+
+CASES = [
+    (MatchSerializer, []),
+    (MatchSerializer, ["player1", "player2", "winner"]),
+    (ScoreSerializer, []),
+    (ScoreSerializer, ["player"]),
+    (PlayerSerializer, []),
+]
+
+
+def best_of(samples, render):
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        rows = render()
+        timings.append(time.perf_counter() - started)
+    return min(timings), len(rows)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "serializer_class, expand",
+    CASES,
+    ids=[cls.__name__ + "".join(f"+{name}" for name in e) for cls, e in CASES],
+)
+def test_values_reader_is_cheaper_per_row(
+    serializer_class, expand, size, synthetic_tournament, request
+):
+    params = {"expand": expand}
+    samples = request.config.getoption("bench_samples")
+    model = serializer_class.Meta.model
+    queryset = model.objects.order_by("id")
+    if expand:
+        queryset = queryset.select_related(*expand)
+
+    serializer_time, count = best_of(
+        samples, lambda: serializer_class(queryset.all(), many=True, **params).data
+    )
+    reader = serializer_class.values_reader(**params)
+    reader_time, _ = best_of(
+        samples, lambda: reader.render(reader.queryset(model.objects.order_by("id")))
+    )
+    label = f"{serializer_class.__name__}{'+expand' if expand else ''}[{size}]"
+    print(
+        f"{label:>32}: {count:6} rows, serializer "
+        f"{serializer_time / count * 1e6:6.1f} us/row, values "
+        f"{reader_time / count * 1e6:6.1f} us/row, "
+        f"{serializer_time / reader_time:4.1f}x"
+    )
+    assert reader_time < serializer_time
@@ -0,0 +1,96 @@
+"""Peak memory of a streamed list response against a buffered one.
+
+Builds growing match tables and measures, with ``tracemalloc``, the peak
+Python memory of rendering the whole list in one piece (``serializer.data``
+plus the rendered body, as an unpaginated list would) and of consuming
+``GET /tournament/matches/?stream=true``. The streamed peak must stay flat:
+
+    pytest benchmarks/bench_streaming.py -s --bench-stream-rows 5000,100000
+"""
+
+import tracemalloc
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from core.bulk import bulk_insert
+from tournament.models import Match, Tournament
+from tournament.serializers import MatchSerializer
+from user.models import Player
+
+# Allowed growth of the streamed peak from the smallest to the largest table.
+MAX_STREAM_GROWTH = 1.5
+
+
+def add_matches(tournament, players, first, count):
+    """Add ``count`` rounds of one board each, after the first ``first``."""
+    white, black = players
+    bulk_insert(
+        Match,
+        ["tournament_id", "round_number", "player1_id", "player2_id", "winner_id"],
+        (
+            (tournament.id, round_number, white.id, black.id, white.id)
+            for round_number in range(first + 1, first + count + 1)
+        ),
+    )
+
+
+def peak(consume):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        size = consume()
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.django_db
+def test_streamed_memory_stays_flat(request, settings):
+    settings.DEBUG = False
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_superuser(username="bench-admin", password="password")
+    )
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"stream-{i}"),
+            name=f"Player {i}",
+            age=30,
+            rating=1500,
+            country="USA",
+        )
+        for i in range(2)
+    ]
+    tournament = Tournament.objects.create(
+        name="Streamed", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    url = reverse("match-list-create") + "?stream=true"
+
+    def buffered():
+        data = MatchSerializer(Match.objects.order_by("id"), many=True).data
+        return len(JSONRenderer().render(data))
+
+    def streamed():
+        response = client.get(url)
+        assert response.status_code == 200
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    rows = 0
+    peaks = []
+    sizes = request.config.getoption("bench_stream_rows").split(",")
+    for target in sorted(int(size) for size in sizes):
+        add_matches(tournament, players, rows, target - rows)
+        rows = target
+        body, buffered_peak = peak(buffered)
+        streamed_body, streamed_peak = peak(streamed)
+        assert streamed_body == body
+        peaks.append(streamed_peak)
+        print(
+            f"{rows:>8} rows, {body / 2**20:7.1f} MiB body: "
+            f"buffered peak {buffered_peak / 2**20:7.1f} MiB, "
+            f"streamed peak {streamed_peak / 2**20:7.1f} MiB"
+        )
+    assert peaks[-1] <= peaks[0] * MAX_STREAM_GROWTH, peaks
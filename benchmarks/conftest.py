@@ -0,0 +1,185 @@
+"""Options and fixtures shared by the database benchmarks.
+
+Endpoint benchmarks compare their query counts and latencies with a JSON
+baseline and fail on regressions, or when the baseline has no entry yet:
+
+    pytest benchmarks/bench_api.py -s --bench-update-baseline   # record
+    pytest benchmarks/bench_api.py -s                           # compare
+"""
+
+import json
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from tournament.models import Match, Tournament
+from tournament.standings import rebuild_standings, refresh_participant_counts
+from user.models import Player
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = "100,1000,10000"
+DEFAULT_STREAM_ROWS = "5000,20000,100000"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--bench-sizes",
+        default=DEFAULT_SIZES,
+        help="Comma separated player counts of the synthetic tournaments.",
+    )
+    group.addoption("--bench-samples", type=int, default=10)
+    group.addoption(
+        "--bench-stream-rows",
+        default=DEFAULT_STREAM_ROWS,
+        help="Comma separated row counts of the streamed list memory benchmark.",
+    )
+    group.addoption("--bench-baseline", default=str(DEFAULT_BASELINE))
+    group.addoption(
+        "--bench-update-baseline",
+        action="store_true",
+        help="Record the measurements as the new baseline instead of comparing.",
+    )
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.5,
+        help="Allowed relative p50/p95 slowdown before a run fails.",
+    )
+    group.addoption(
+        "--bench-min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Latency changes below this many milliseconds are never failures.",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [
+            int(size) for size in metafunc.config.getoption("bench_sizes").split(",")
+        ]
+        metafunc.parametrize("size", sizes, scope="module")
+
+
+def percentile(timings: List[float], fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class Baseline:
+    def __init__(self, config) -> None:
+        self.path = Path(config.getoption("bench_baseline"))
+        self.update = config.getoption("bench_update_baseline")
+        self.threshold = config.getoption("bench_threshold")
+        self.min_delta = config.getoption("bench_min_delta_ms")
+        self.entries: Dict[str, Dict] = (
+            json.loads(self.path.read_text()) if self.path.exists() else {}
+        )
+
+    def check(self, name: str, queries: int, timings: List[float]) -> None:
+        """Record one measurement and fail if it regressed against the baseline."""
+        measured = {
+            "queries": queries,
+            "p50_ms": round(statistics.median(timings) * 1000, 2),
+            "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+        }
+        print(
+            f"{name:>40}: {queries:3} queries, "
+            f"p50 {measured['p50_ms']:8.2f} ms, p95 {measured['p95_ms']:8.2f} ms"
+        )
+        if self.update:
+            self.entries[name] = measured
+            return
+        previous = self.entries.get(name)
+        if previous is None:
+            pytest.fail(
+                f"{name} has no baseline in {self.path}: record one with "
+                "--bench-update-baseline"
+            )
+
+        failures = []
+        if queries > previous["queries"]:
+            failures.append(f"queries {previous['queries']} -> {queries}")
+        for key in ("p50_ms", "p95_ms"):
+            limit = max(
+                previous[key] * (1 + self.threshold), previous[key] + self.min_delta
+            )
+            if measured[key] > limit:
+                failures.append(f"{key} {previous[key]} -> {measured[key]}")
+        if failures:
+            pytest.fail(f"{name} regressed: {', '.join(failures)}")
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def bench_baseline(request):
+    baseline = Baseline(request.config)
+    yield baseline
+    if baseline.update:
+        baseline.save()
+
+
+def create_tournament(size: int, name: str) -> Tournament:
+    """A tournament of ``size`` players with one finished and one paired round."""
+    password = make_password("password")
+    users = User.objects.bulk_create(
+        [User(username=f"{name}-{i}", password=password) for i in range(size)]
+    )
+    players = Player.objects.bulk_create(
+        [
+            Player(
+                user=user,
+                name=f"Player {i}",
+                age=20 + i % 40,
+                rating=1000 + i * 7 % 1800,
+                country=("USA", "NOR", "IND", "CHN")[i % 4],
+            )
+            for i, user in enumerate(users)
+        ]
+    )
+    tournament = Tournament.objects.create(
+        name=name, start_date="2024-07-01", end_date="2024-07-10"
+    )
+    Tournament.participants.through.objects.bulk_create(
+        [
+            Tournament.participants.through(tournament=tournament, player=player)
+            for player in players
+        ]
+    )
+    refresh_participant_counts([tournament.id])
+    matches = []
+    for round_number in (1, 2):
+        offset = round_number - 1
+        for i in range(0, size - 1, 2):
+            white = players[(i + offset) % size]
+            black = players[(i + 1 + offset) % size]
+            winner = white if round_number == 1 else None
+            matches.append(
+                Match(
+                    tournament=tournament,
+                    player1=white,
+                    player2=black,
+                    winner=winner,
+                    round_number=round_number,
+                )
+            )
+    Match.objects.bulk_create(matches, batch_size=1000)
+    rebuild_standings(tournament.id)
+    return tournament
+
+
+@pytest.fixture(scope="module")
+def synthetic_tournament(size, django_db_setup, django_db_blocker):
+    """Module-wide synthetic tournament; tests roll back their own writes."""
+    with django_db_blocker.unblock():
+        tournament = create_tournament(size, f"Synthetic {size}")
+        yield tournament
+        tournament.delete()
+        # Players and their standings rows cascade from the users.
+        User.objects.filter(username__startswith=f"Synthetic {size}-").delete()
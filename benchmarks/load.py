@@ -0,0 +1,141 @@
+"""Requests per second of running API servers under many open connections.
+
+Keeps ``--connections`` keep-alive connections busy with GET requests for
+``--duration`` seconds and reports throughput per server worker, to compare
+the WSGI deployment with the ASGI one (async read views) on the same data:
+
+    gunicorn core.wsgi -w 1 --threads 8 -b :8000
+    uvicorn core.asgi:application --workers 1 --port 8001
+    python -m benchmarks.load wsgi=http://127.0.0.1:8000 \\
+        asgi=http://127.0.0.1:8001 --workers 1 --connections 1000 \\
+        --path /tournament/matches/ --path /tournament/tournaments/1/leaderboard/
+
+Needs no Django settings; raise ``ulimit -n`` above the connection count.
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Result:
+    requests: int = 0
+    errors: int = 0
+    statuses: dict = field(default_factory=dict)
+    latencies: List[float] = field(default_factory=list)
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Read one response; returns its status and whether to keep the connection."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return status, False
+    connection = headers.get("connection", "").lower()
+    if lines[0].startswith("HTTP/1.0"):
+        return status, connection == "keep-alive"
+    return status, connection != "close"
+
+
+async def client(
+    url: str, paths: Sequence[str], deadline: float, result: Result, start: int
+) -> None:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    requests = itertools.cycle(
+        f"GET {parts.path.rstrip('/')}{path} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\nAccept: application/json\r\n\r\n".encode()
+        for path in paths
+    )
+    # Spread the connections over the paths.
+    for _ in range(start % len(paths)):
+        next(requests)
+    connection = None
+    while time.monotonic() < deadline:
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            reader, writer = connection
+            started = time.monotonic()
+            writer.write(next(requests))
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            result.errors += 1
+            connection = None
+            await asyncio.sleep(0.01)
+            continue
+        result.latencies.append(time.monotonic() - started)
+        result.requests += 1
+        result.statuses[status] = result.statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def run(
+    url: str, paths: Sequence[str], connections: int, duration: float
+) -> Result:
+    result = Result()
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *(client(url, paths, deadline, result, i) for i in range(connections))
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", nargs="+", help="name=base_url of each server")
+    parser.add_argument(
+        "--path", action="append", dest="paths", help="GET path (repeatable)"
+    )
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes of each server."
+    )
+    args = parser.parse_args()
+    paths = args.paths or ["/tournament/matches/"]
+
+    for target in args.targets:
+        name, _, url = target.partition("=")
+        if "://" in name:
+            name, url = "", target
+        result = asyncio.run(run(url, paths, args.connections, args.duration))
+        latencies = sorted(result.latencies) or [0.0]
+        rate = result.requests / args.duration
+        p99 = latencies[min(len(latencies) - 1, round(0.99 * (len(latencies) - 1)))]
+        print(
+            f"{name or url:>10}: {rate:9.1f} req/s, "
+            f"{rate / args.workers:9.1f} req/s per worker, "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+            f"p99 {p99 * 1000:7.1f} ms, "
+            f"{result.errors} errors, statuses {dict(sorted(result.statuses.items()))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
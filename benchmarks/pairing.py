@@ -0,0 +1,60 @@
+"""Time Swiss round generation for large open events.
+
+Runs the pairing engine on synthetic players without the database:
+
+    python -m benchmarks.pairing --players 2000 5000 --rounds 9
+"""
+
+import argparse
+import random
+import time
+
+from tournament.pairing import BLACK, WHITE, PairingPlayer, SwissPairingStrategy
+
+
+def simulate(player_count: int, rounds: int, seed: int) -> list:
+    rng = random.Random(seed)
+    players = [
+        PairingPlayer(id=i, rating=rng.randint(1000, 2800)) for i in range(player_count)
+    ]
+    by_id = {player.id: player for player in players}
+    strategy = SwissPairingStrategy()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = strategy.pair(players)
+        timings.append(time.perf_counter() - started)
+
+        for white_id, black_id in result.pairs:
+            white, black = by_id[white_id], by_id[black_id]
+            white.opponents.add(black_id)
+            black.opponents.add(white_id)
+            white.colours.append(WHITE)
+            black.colours.append(BLACK)
+            # Higher rating wins most of the time.
+            expected = 1 / (1 + 10 ** ((black.rating - white.rating) / 400))
+            (white if rng.random() < expected else black).score += 1
+        if result.bye is not None:
+            by_id[result.bye].had_bye = True
+            by_id[result.bye].score += 1
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[2000, 5000])
+    parser.add_argument("--rounds", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for player_count in args.players:
+        timings = simulate(player_count, args.rounds, args.seed)
+        print(
+            f"{player_count:>6} players, {args.rounds} rounds: "
+            f"mean {sum(timings) / len(timings) * 1000:7.1f} ms, "
+            f"max {max(timings) * 1000:7.1f} ms per round"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time a full rating replay over a large synthetic game history.
+
+Runs the vectorized Elo engine on NumPy arrays without the database:
+
+    python -m benchmarks.ratings --games 1000000 --players 20000
+"""
+
+import argparse
+import os
+import time
+
+import django
+import numpy as np
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+django.setup()
+
+from tournament.ratings import INITIAL_RATING, replay  # noqa: E402
+
+
+def synthetic_history(game_count: int, player_count: int, boards: int, seed: int):
+    rng = np.random.default_rng(seed)
+    white = rng.integers(0, player_count, game_count)
+    black = (white + rng.integers(1, player_count, game_count)) % player_count
+    strength = rng.normal(1600, 300, player_count)
+    expected = 1 / (1 + 10 ** ((strength[black] - strength[white]) / 400))
+    white_score = (rng.random(game_count) < expected).astype(np.float64)
+    periods = np.arange(game_count) // boards
+    return periods, white, black, white_score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=20_000)
+    parser.add_argument(
+        "--boards", type=int, default=500, help="Games per rating period."
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    history = synthetic_history(args.games, args.players, args.boards, args.seed)
+    ratings = np.full(args.players, float(INITIAL_RATING))
+    games = np.zeros(args.players, dtype=np.int64)
+
+    started = time.perf_counter()
+    replay(ratings, games, *history)
+    elapsed = time.perf_counter() - started
+    periods = int(history[0][-1]) + 1
+    print(
+        f"{args.games:>9} games, {periods} periods, {args.players} players: "
+        f"{elapsed:.2f} s ({args.games / elapsed:,.0f} games/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from core import bulk
+from tournament.models import Tournament
+from user.models import Player
+
+COPY_FIELD = re.compile(r'("(?:[^"]|"")*"|[^,]*)(,|$)')
+
+
+def read_copy_csv(text):
+    """Rows of ``COPY ... WITH (FORMAT csv)`` input, as PostgreSQL reads them."""
+    rows = []
+    for line in text.splitlines():
+        row, position = [], 0
+        while True:
+            value, separator = COPY_FIELD.match(line, position).groups()
+            if value.startswith('"'):
+                row.append(value[1:-1].replace('""', '"'))
+            else:
+                row.append(value or None)
+            position += len(value) + len(separator)
+            if not separator:
+                break
+        rows.append(row)
+    return rows
+
+
+@pytest.fixture
+def copy_path(monkeypatch):
+    """Send ``bulk_insert`` through the ``COPY`` encoding on any database.
+
+    Rows are written as ``_copy`` writes them and read back as PostgreSQL
+    reads them. Values must survive as text, and NULL only as NULL; the
+    original values are then inserted with ``executemany``.
+    """
+    executemany = bulk._executemany
+
+    def through_copy(connection, table, columns, width, rows):
+        copied = read_copy_csv(bulk._copy_buffer(rows).read())
+        assert copied == [
+            [None if value is None else str(value) for value in row] for row in rows
+        ]
+        executemany(connection, table, columns, width, rows)
+
+    monkeypatch.setattr(bulk, "_executemany", through_copy)
+
+
+@pytest.fixture
+def admin_client():
+    """API client authenticated as a superuser, with an empty cache."""
+    cache.clear()
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_superuser(
+            username="admin", password="password", email="admin@example.com"
+        )
+    )
+    return client
+
+
+@pytest.fixture
+def player_ratings():
+    """Ratings of the ``players``; override it in a module for other ratings."""
+    return [1500, 1500, 1500, 1500]
+
+
+@pytest.fixture
+def players(player_ratings):
+    return [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20,
+            rating=rating,
+            country="USA",
+        )
+        for i, rating in enumerate(player_ratings)
+    ]
+
+
+@pytest.fixture
+def participants(players):
+    """Players entered in the ``tournament``: all of them by default."""
+    return players
+
+
+@pytest.fixture
+def tournament(participants):
+    tournament = Tournament.objects.create(
+        name="Test Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(participants)
+    return tournament
@@ -0,0 +1,18 @@
+"""URL configuration of the ASGI application (see ``core/asgi.py``).
+
+The async read views come first and take over GET of their URLs (passing
+other methods on to the DRF views); everything else is ``core.urls``.
+"""
+
+from django.urls import include, path
+
+from player.urls import async_urlpatterns as player_async_urlpatterns
+from tournament.urls import async_urlpatterns as tournament_async_urlpatterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("player/", include(player_async_urlpatterns)),
+    path("tournament/", include(tournament_async_urlpatterns)),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,112 @@
+"""Non-blocking access to the default cache for async views.
+
+django-redis only has a synchronous client, and Django's ``aget``/``aset``
+fallbacks run it in a thread. ``get_async_cache`` returns an adapter that
+talks to the same Redis server through ``redis.asyncio`` instead, encoding
+keys and values with the sync client so both read each other's entries.
+Other backends (such as the in-memory one used in tests) are returned as
+is and go through Django's async cache methods.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+
+class AsyncRedisCache:
+    """The subset of Django's async cache API the caching helpers use."""
+
+    def __init__(self, backend: RedisCache, url: str) -> None:
+        self.backend = backend
+        self.client = backend.client
+        self.url = url
+        # redis.asyncio connections belong to the loop that opened them.
+        self._connections: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _connection(self):
+        import redis.asyncio
+
+        loop = asyncio.get_running_loop()
+        connection = self._connections.get(loop)
+        if connection is None:
+            connection = redis.asyncio.Redis.from_url(self.url)
+            self._connections[loop] = connection
+        return connection
+
+    def _px(self, timeout: Any) -> Optional[int]:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.backend.default_timeout
+        return None if timeout is None else max(1, int(timeout * 1000))
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        value = await self._connection().get(self.client.make_key(key))
+        return default if value is None else self.client.decode(value)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self._connection().mget(
+            [self.client.make_key(key) for key in keys]
+        )
+        return {
+            key: self.client.decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    async def aset(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        await self._connection().set(
+            self.client.make_key(key), self.client.encode(value), px=self._px(timeout)
+        )
+
+    async def aadd(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> bool:
+        added = await self._connection().set(
+            self.client.make_key(key),
+            self.client.encode(value),
+            px=self._px(timeout),
+            nx=True,
+        )
+        return bool(added)
+
+    async def aincr(self, key: str, delta: int = 1) -> int:
+        name = self.client.make_key(key)
+        connection = self._connection()
+        if not await connection.exists(name):
+            raise ValueError(f"Key '{key}' not found.")
+        return await connection.incrby(name, delta)
+
+    async def adelete(self, key: str) -> bool:
+        return bool(await self._connection().delete(self.client.make_key(key)))
+
+
+_adapter: Optional[AsyncRedisCache] = None
+
+
+def server_url(alias: str = DEFAULT_CACHE_ALIAS) -> str:
+    """The Redis server of a cache that takes the writes.
+
+    ``LOCATION`` is a URL, a comma separated string or a list of them; like
+    django-redis, the first one is the primary.
+    """
+    location = settings.CACHES[alias]["LOCATION"]
+    servers = location.split(",") if isinstance(location, str) else location
+    return servers[0].strip()
+
+
+def get_async_cache():
+    """The default cache, with native async I/O for django-redis."""
+    global _adapter
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if not isinstance(backend, RedisCache):
+        return backend
+    if _adapter is None:
+        # Backends are per thread and task; one adapter (and one connection
+        # pool per event loop) serves the whole process.
+        _adapter = AsyncRedisCache(backend, server_url())
+    return _adapter
@@ -0,0 +1,113 @@
+"""Async read views for the ASGI server (``core/asgi.py``).
+
+DRF views are synchronous, so under ASGI every request holds a thread for
+its whole duration, mostly waiting on Redis and the database. An
+``AsyncReadView`` answers GET and HEAD on the event loop instead: cache
+hits and 304s are a few non-blocking Redis calls, and misses use the async
+ORM. Every other method, and the reads it does not handle natively (such
+as ``?stream=true``), goes to the DRF view of the same URL.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from user.authentication import CachedJWTAuthentication
+
+from .conditional import acached_response, json_response
+from .pagination import KeysetPagination
+from .serializers import ValuesReader
+
+
+class AsyncReadView(View):
+    """Async GET of a read endpoint; other requests go to ``sync_view``.
+
+    Subclasses set ``sync_view`` to the DRF view of the same URL and define
+    an async ``get``. Its reads need no permissions (``IsAdminUserOrReadOnly``),
+    but credentials that are sent are still checked, as DRF does.
+    """
+
+    sync_view: Any = None
+    pagination_class = KeysetPagination
+    # The sync view, wrapped by ``as_view``.
+    delegate_view: Any = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        delegate_view = sync_to_async(cls.sync_view.as_view())
+        view = super().as_view(delegate_view=delegate_view, **initkwargs)
+        # DRF views enforce CSRF themselves, for session authentication only.
+        return csrf_exempt(view)
+
+    async def dispatch(self, request: Any, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method not in ("GET", "HEAD"):
+            return await self.delegate(request, *args, **kwargs)
+        try:
+            await self.authenticate(request)
+            return await self.get(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            # Same status, headers and body as DRF's error responses.
+            response = exception_handler(exc, {})
+            headers = {
+                name: value
+                for name, value in response.items()
+                if name != "Content-Type"
+            }
+            return json_response(
+                response.data, status=response.status_code, headers=headers
+            )
+
+    async def authenticate(self, request: Any) -> None:
+        if "HTTP_AUTHORIZATION" not in request.META:
+            return
+        authenticator = CachedJWTAuthentication()
+        try:
+            await sync_to_async(authenticator.authenticate)(request)
+        except AuthenticationFailed as exc:
+            exc.auth_header = authenticator.authenticate_header(request)
+            raise
+
+    async def delegate(self, request: Any, *args: Any, **kwargs: Any) -> HttpResponse:
+        return await self.delegate_view(request, *args, **kwargs)
+
+    def error(self, message: str) -> HttpResponse:
+        return json_response({"error": message}, status=400)
+
+    async def cached_page(
+        self,
+        request: Any,
+        key: str,
+        queryset: QuerySet,
+        reader: ValuesReader,
+        tags: Iterable[str],
+        view: Any = None,
+        on_compute: Optional[Callable[[], None]] = None,
+    ) -> HttpResponse:
+        """One cursor page of ``queryset``, cached under ``key`` (see
+        ``KeysetPagination.get_cache_key``) like the sync list views.
+
+        ``view`` supplies the ordering options (``self`` by default), and
+        ``on_compute`` is called on a cache miss.
+        """
+        if not isinstance(request, Request):
+            request = Request(request)
+        paginator = self.pagination_class()
+
+        async def compute() -> Dict[str, Any]:
+            if on_compute is not None:
+                on_compute()
+            # DRF's cursor paginator is synchronous; the page query runs on
+            # the request's thread, as the async ORM's own queries do.
+            page = await sync_to_async(paginator.paginate_queryset)(
+                queryset, request, view=view or self
+            )
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        return await acached_response(request, key, compute, tags)
@@ -0,0 +1,209 @@
+"""Bulk writes for seeding and imports.
+
+``bulk_insert`` streams plain value tuples into a table in batches: with
+PostgreSQL ``COPY ... FROM STDIN``, elsewhere with one ``executemany`` per
+batch. ``bulk_update_rows`` updates rows by key with a join against a
+``VALUES`` list. Both skip model instances, ``save()`` and signals, which
+is what makes them fast; callers that need new primary keys read them back.
+"""
+
+import io
+from itertools import islice
+from typing import Any, Iterable, List, Sequence, Type
+
+from django.db import connections, models
+from django.db.models import F
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Values of these fields reach the database driver unchanged.
+PLAIN_FIELD_TYPES = {
+    "AutoField",
+    "BigAutoField",
+    "BigIntegerField",
+    "BooleanField",
+    "CharField",
+    "FloatField",
+    "ForeignKey",
+    "IntegerField",
+    "OneToOneField",
+    "PositiveIntegerField",
+    "SmallIntegerField",
+    "TextField",
+}
+
+
+def _columns(model: Type[models.Model], attnames: Sequence[str], connection):
+    """Fields to write and the prepared defaults of the ones not given."""
+    fields = [model._meta.get_field(name) for name in attnames]
+    defaults = [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.attname not in attnames
+    ]
+    values = [
+        field.get_db_prep_save(field.get_default(), connection) for field in defaults
+    ]
+    return fields + defaults, values
+
+
+def _prepare(fields, connection, rows) -> List[List[Any]]:
+    prepare = [
+        (
+            None
+            if field.get_internal_type() in PLAIN_FIELD_TYPES
+            else (lambda value, field=field: field.get_db_prep_save(value, connection))
+        )
+        for field in fields
+    ]
+    if not any(prepare):
+        return [list(row) for row in rows]
+    return [
+        [value if fn is None else fn(value) for fn, value in zip(prepare, row)]
+        for row in rows
+    ]
+
+
+def _csv_field(value: Any) -> str:
+    # COPY reads an unquoted empty field as NULL and a quoted one as an
+    # empty string, so every value but NULL is quoted.
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_buffer(rows) -> io.StringIO:
+    """``rows`` as the CSV that ``COPY ... WITH (FORMAT csv)`` reads."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_csv_field(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _copy(connection, table: str, columns: str, rows) -> None:
+    buffer = _copy_buffer(rows)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+def _executemany(connection, table: str, columns: str, width: int, rows) -> None:
+    placeholders = ", ".join(["%s"] * width)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows
+        )
+
+
+def bulk_insert(
+    model: Type[models.Model],
+    attnames: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: str = "default",
+) -> int:
+    """Insert ``rows`` of ``attnames`` values; returns the row count.
+
+    Columns not named get their field default. Nothing is validated, so the
+    rows must already satisfy the table's constraints.
+    """
+    connection = connections[using]
+    fields, defaults = _columns(model, attnames, connection)
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(field.column) for field in fields)
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        prepared = _prepare(fields[: len(attnames)], connection, batch)
+        prepared = [row + defaults for row in prepared]
+        if connection.vendor == "postgresql":
+            _copy(connection, table, columns, prepared)
+        else:
+            _executemany(connection, table, columns, len(fields), prepared)
+        count += len(batch)
+
+
+def bulk_update_rows(
+    model: Type[models.Model],
+    attnames: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: str = "default",
+    keys: int = 1,
+    add: bool = False,
+) -> int:
+    """Update rows by key; returns the number of rows given.
+
+    The first ``keys`` of ``attnames`` identify the rows (by default the
+    primary key alone). With ``add`` the other values are added to the
+    columns instead of replacing them. Unlike ``QuerySet.bulk_update``, whose
+    ``CASE`` per column grows with every row, each batch is a single
+    ``UPDATE ... FROM (VALUES ...)`` join.
+    """
+    connection = connections[using]
+    fields = [model._meta.get_field(name) for name in attnames]
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return _update_rows_fallback(
+            model, attnames, rows, batch_size, using, keys, add
+        )
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+
+    def value(index: int) -> str:
+        db_type = fields[index].cast_db_type(connection)
+        return f"CAST(v.column{index + 1} AS {db_type})"
+
+    def assignment(index: int) -> str:
+        column = quote(fields[index].column)
+        if add:
+            return f"{column} = {table}.{column} + {value(index)}"
+        return f"{column} = {value(index)}"
+
+    assignments = ", ".join(assignment(index) for index in range(keys, len(fields)))
+    where = " AND ".join(
+        f"{table}.{quote(fields[index].column)} = {value(index)}"
+        for index in range(keys)
+    )
+    max_params = connection.features.max_query_params
+    if max_params:
+        batch_size = min(batch_size, max_params // len(fields))
+    row_placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    rows = iter(rows)
+    count = 0
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, batch_size)):
+            prepared = _prepare(fields, connection, batch)
+            values = ", ".join([row_placeholder] * len(prepared))
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} FROM (VALUES {values}) AS v "
+                f"WHERE {where}",
+                [value for row in prepared for value in row],
+            )
+            count += len(batch)
+    return count
+
+
+def _update_rows_fallback(model, attnames, rows, batch_size, using, keys, add):
+    manager = model.objects.using(using)
+    count = 0
+    if keys == 1 and not add:
+        objs = (model(**dict(zip(attnames, row))) for row in rows)
+        while batch := list(islice(objs, batch_size)):
+            manager.bulk_update(batch, attnames[1:])
+            count += len(batch)
+        return count
+    for row in rows:
+        values = dict(zip(attnames[keys:], row[keys:]))
+        if add:
+            values = {name: F(name) + delta for name, delta in values.items()}
+        manager.filter(**dict(zip(attnames[:keys], row[:keys]))).update(**values)
+        count += 1
+    return count
@@ -0,0 +1,306 @@
+"""Tag-versioned caching helpers.
+
+Every tag (``tournament:42``, ``player:7``, ``matches:list``) has a version
+counter. Cached entries remember the versions of the tags they depend on
+and are treated as misses once any of them moves on, so invalidation is an
+O(1) counter bump per tag and needs no key scans. Model signals bump the
+tags (see the apps' ``signals`` modules), which keeps admin edits and bulk
+writes from serving stale data and lets entries live for hours.
+
+The ``a``-prefixed functions are the read side for async views; they share
+entries and locks with the sync ones (see ``core.async_cache``).
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import urlencode
+
+from .async_cache import get_async_cache
+
+STATS_TTL = 60 * 60 * 24
+TTL_JITTER = 0.1
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_cache_ttl() -> int:
+    return getattr(settings, "CACHE_TTL", 60 * 5)
+
+
+def _version_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+def _modified_key(tag: str) -> str:
+    return f"tagtime:{tag}"
+
+
+def get_tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    keys = {_version_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, tag in keys.items():
+        if key not in found:
+            # Seed from the clock so a lost counter never reuses old versions.
+            now = time.time()
+            cache.add(key, int(now * 1_000_000), None)
+            cache.add(_modified_key(tag), now, None)
+            versions[tag] = cache.get(key)
+    return versions
+
+
+def get_tag_state(tags: Iterable[str]) -> Tuple[Dict[str, int], float]:
+    """Versions of ``tags`` and the last time any of them was bumped.
+
+    One cache round trip when every tag has a version already. The time is
+    0 when unknown.
+    """
+    tags = list(tags)
+    keys = [_version_key(tag) for tag in tags] + [_modified_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    versions = {
+        tag: found[_version_key(tag)] for tag in tags if _version_key(tag) in found
+    }
+    if len(versions) < len(tags):
+        versions = get_tag_versions(tags)
+    modified = [found.get(_modified_key(tag), 0) for tag in tags]
+    return versions, max(modified, default=0)
+
+
+def invalidate_tags(*tags: str) -> None:
+    bumped = []
+    for tag in tags:
+        try:
+            cache.incr(_version_key(tag))
+        except ValueError:
+            # No version yet: nothing cached depends on the tag, and readers
+            # seed the version before they compute.
+            continue
+        bumped.append(tag)
+    if bumped:
+        now = time.time()
+        cache.set_many({_modified_key(tag): now for tag in bumped}, None)
+
+
+def invalidate_tags_on_commit(*tags: str) -> None:
+    """Invalidate now and again once the current transaction commits.
+
+    The second bump drops anything a concurrent reader cached from the
+    pre-commit state in between.
+    """
+    invalidate_tags(*tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def _jittered(timeout: int) -> int:
+    return max(1, round(timeout * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)))
+
+
+def _store(key: str, compute: Callable[[], Any], tags: Iterable[str], timeout: int):
+    # Snapshot the tag versions first: a write racing with ``compute`` then
+    # leaves the new entry already stale instead of hiding the write.
+    versions, modified = get_tag_state(tags)
+    value = compute()
+    fresh_for = _jittered(timeout)
+    entry = {
+        "value": value,
+        "tags": versions,
+        "modified": modified,
+        "fresh_until": time.time() + fresh_for,
+    }
+    cache.set(key, entry, fresh_for + getattr(settings, "CACHE_STALE_TTL", 60 * 5))
+    return entry
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    tags: Iterable[str] = (),
+    timeout: Optional[int] = None,
+) -> Any:
+    return get_or_compute_entry(key, compute, tags, timeout)["value"]
+
+
+def get_or_compute_entry(
+    key: str,
+    compute: Callable[[], Any],
+    tags: Iterable[str] = (),
+    timeout: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Cache-aside read with single-flight refresh and stale-while-revalidate.
+
+    Entries are fresh for a jittered ``timeout`` and stay in the cache for
+    ``CACHE_STALE_TTL`` longer. A stale entry (expired or with a bumped tag)
+    is refreshed by whichever worker takes the short ``lock:<key>``; the
+    others keep serving the stale value meanwhile. On a cold miss the
+    others wait for the lock holder's result instead of computing it again.
+
+    Returns the cache entry: the ``value`` plus the tag versions (``tags``)
+    and last bump time (``modified``) it was computed at, which may be older
+    than the current ones while a stale value is served.
+    """
+    timeout = get_cache_ttl() if timeout is None else timeout
+    entry = cache.get(key)
+    if entry is not None:
+        fresh = entry["fresh_until"] > time.time()
+        if fresh and get_tag_versions(entry["tags"]) == entry["tags"]:
+            return entry
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, LOCK_TIMEOUT):
+        try:
+            return _store(key, compute, tags, timeout)
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    if entry is not None:
+        return entry
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            break
+    return _store(key, compute, tags, timeout)
+
+
+async def aget_tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    store = get_async_cache()
+    keys = {_version_key(tag): tag for tag in tags}
+    found = await store.aget_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, tag in keys.items():
+        if key not in found:
+            now = time.time()
+            await store.aadd(key, int(now * 1_000_000), None)
+            await store.aadd(_modified_key(tag), now, None)
+            versions[tag] = await store.aget(key)
+    return versions
+
+
+async def aget_tag_state(tags: Iterable[str]) -> Tuple[Dict[str, int], float]:
+    tags = list(tags)
+    keys = [_version_key(tag) for tag in tags] + [_modified_key(tag) for tag in tags]
+    found = await get_async_cache().aget_many(keys)
+    versions = {
+        tag: found[_version_key(tag)] for tag in tags if _version_key(tag) in found
+    }
+    if len(versions) < len(tags):
+        versions = await aget_tag_versions(tags)
+    modified = [found.get(_modified_key(tag), 0) for tag in tags]
+    return versions, max(modified, default=0)
+
+
+async def _astore(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    tags: Iterable[str],
+    timeout: int,
+):
+    versions, modified = await aget_tag_state(tags)
+    value = await compute()
+    fresh_for = _jittered(timeout)
+    entry = {
+        "value": value,
+        "tags": versions,
+        "modified": modified,
+        "fresh_until": time.time() + fresh_for,
+    }
+    await get_async_cache().aset(
+        key, entry, fresh_for + getattr(settings, "CACHE_STALE_TTL", 60 * 5)
+    )
+    return entry
+
+
+async def aget_or_compute_entry(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    tags: Iterable[str] = (),
+    timeout: Optional[int] = None,
+) -> Dict[str, Any]:
+    """``get_or_compute_entry`` for async views; ``compute`` is awaited.
+
+    Shares entries, tags and locks with the sync version, and waits for
+    another worker's refresh without blocking the event loop.
+    """
+    store = get_async_cache()
+    timeout = get_cache_ttl() if timeout is None else timeout
+    entry = await store.aget(key)
+    if entry is not None:
+        fresh = entry["fresh_until"] > time.time()
+        if fresh and await aget_tag_versions(entry["tags"]) == entry["tags"]:
+            return entry
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    if await store.aadd(lock_key, token, LOCK_TIMEOUT):
+        try:
+            return await _astore(key, compute, tags, timeout)
+        finally:
+            if await store.aget(lock_key) == token:
+                await store.adelete(lock_key)
+
+    if entry is not None:
+        return entry
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await store.aget(key)
+        if entry is not None:
+            return entry
+        if await store.aget(lock_key) is None:
+            break
+    return await _astore(key, compute, tags, timeout)
+
+
+def list_cache_key(name: str, params: Dict[str, str]) -> Tuple[str, str]:
+    """Return ``(cache_key, variant)`` for one variant of a cached list.
+
+    ``params`` must already be normalized; empty values are dropped and the
+    rest sorted, so equivalent requests share a key. Entries are tagged
+    with ``<name>:list``, whose version invalidates every variant at once.
+    """
+    canonical = urlencode(sorted((k, v) for k, v in params.items() if v))
+    variant = hashlib.sha1(canonical.encode()).hexdigest()[:16]
+    return f"{name}:{variant}", variant
+
+
+def record_cache_access(name: str, variant: str, hit: bool) -> None:
+    key = f"{name}:stats:{variant}:{'hits' if hit else 'misses'}"
+    cache.add(key, 0, STATS_TTL)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+async def arecord_cache_access(name: str, variant: str, hit: bool) -> None:
+    store = get_async_cache()
+    key = f"{name}:stats:{variant}:{'hits' if hit else 'misses'}"
+    await store.aadd(key, 0, STATS_TTL)
+    try:
+        await store.aincr(key)
+    except ValueError:
+        pass
+
+
+def get_cache_stats(name: str, variant: str) -> Dict[str, int]:
+    prefix = f"{name}:stats:{variant}"
+    values = cache.get_many([f"{prefix}:hits", f"{prefix}:misses"])
+    return {
+        "hits": values.get(f"{prefix}:hits", 0),
+        "misses": values.get(f"{prefix}:misses", 0),
+    }
@@ -0,0 +1,106 @@
+"""Conditional GET (``ETag`` / ``Last-Modified``) for cached API payloads.
+
+A cached payload is determined by its cache key, the versions of the tags
+it depends on and the renderer, so a hash of the three is a strong ETag.
+Checking ``If-None-Match`` / ``If-Modified-Since`` therefore takes one
+cache read of the tag versions; a client whose copy is current gets a 304
+before the database or the cached value is touched. Full responses carry
+the validators of the tag versions their body was computed at, which lag
+behind the current ones while a stale value is being refreshed.
+
+``acached_response`` is the same for async views, which render JSON only;
+it produces the ETags a sync view sends for JSON.
+"""
+
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .cache import (
+    aget_or_compute_entry,
+    aget_tag_state,
+    get_or_compute_entry,
+    get_tag_state,
+)
+
+
+def make_etag(key: str, versions: Dict[str, int], renderer_format: str) -> str:
+    state = f"{key}|{renderer_format}|{sorted(versions.items())}"
+    return f'"{hashlib.sha1(state.encode()).hexdigest()[:32]}"'
+
+
+def is_not_modified(request: Any, etag: str, modified: float) -> bool:
+    """Whether the client's copy is current (``If-None-Match`` wins)."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        # Weak comparison, as for GET in RFC 9110.
+        etags = [value.removeprefix("W/") for value in parse_etags(if_none_match)]
+        return "*" in etags or etag in etags
+    if_modified_since = request.META.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since and modified:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(modified) <= since
+    return False
+
+
+def _validators(etag: str, modified: float) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if modified:
+        headers["Last-Modified"] = http_date(modified)
+    return headers
+
+
+def cached_response(
+    request: Any,
+    key: str,
+    compute: Callable[[], Any],
+    tags: Iterable[str],
+    timeout: Optional[int] = None,
+) -> Response:
+    """``get_or_compute`` as a conditional ``Response`` (200 or 304)."""
+    tags = list(tags)
+    renderer_format = request.accepted_renderer.format
+    versions, modified = get_tag_state(tags)
+    etag = make_etag(key, versions, renderer_format)
+    if is_not_modified(request, etag, modified):
+        return Response(
+            status=status.HTTP_304_NOT_MODIFIED, headers=_validators(etag, modified)
+        )
+    entry = get_or_compute_entry(key, compute, tags, timeout)
+    etag = make_etag(key, entry["tags"], renderer_format)
+    return Response(entry["value"], headers=_validators(etag, entry.get("modified", 0)))
+
+
+def json_response(data: Any, status: int = 200, headers=None) -> HttpResponse:
+    """``data`` rendered as DRF's ``JSONRenderer`` renders a ``Response``."""
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type=JSONRenderer.media_type,
+        status=status,
+        headers=headers,
+    )
+
+
+async def acached_response(
+    request: Any,
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    tags: Iterable[str],
+    timeout: Optional[int] = None,
+) -> HttpResponse:
+    """``cached_response`` for async views (JSON only)."""
+    tags = list(tags)
+    versions, modified = await aget_tag_state(tags)
+    etag = make_etag(key, versions, JSONRenderer.format)
+    if is_not_modified(request, etag, modified):
+        return HttpResponseNotModified(headers=_validators(etag, modified))
+    entry = await aget_or_compute_entry(key, compute, tags, timeout)
+    etag = make_etag(key, entry["tags"], JSONRenderer.format)
+    return json_response(
+        entry["value"], headers=_validators(etag, entry.get("modified", 0))
+    )
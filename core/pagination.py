@@ -0,0 +1,141 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+from .cache import list_cache_key
+
+
+class KeysetPagination(CursorPagination):
+    """Opaque cursor pagination over a unique, composite key.
+
+    The requested ordering is extended with the primary key, in the
+    direction of its first field, so that every row has a distinct position
+    (``?ordering=-rating`` pages by ``(-rating, -id)``). A page is then a
+    ``WHERE (rating, id) < (<position>) ORDER BY ... LIMIT n`` and deep
+    pages cost the same as the first one; DRF's offsets for tied positions,
+    capped at ``offset_cutoff``, are never used. Ordering fields must not
+    be nullable.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 1000)
+
+    def get_ordering(self, request, queryset, view) -> Tuple[str, ...]:
+        ordering = super().get_ordering(request, queryset, view)
+        pk = queryset.model._meta.pk.name
+        if not {pk, "pk"} & {field.lstrip("-") for field in ordering}:
+            ordering += ("-" + pk if ordering[0].startswith("-") else pk,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[List[Any]]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        position = None if self.cursor is None else self.cursor.position
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+        # One extra row tells whether there is a page beyond this one.
+        rows = list(queryset[: self.page_size + 1])
+        self.page = rows[: self.page_size]
+        has_more = len(rows) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.page:
+            self.previous_position = self._get_position(self.page[0])
+            self.next_position = self._get_position(self.page[-1])
+        else:
+            self.previous_position = self.next_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
+
+    def decode_cursor(self, request) -> Optional[Cursor]:
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            # Also a cursor from another ordering of the same list.
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def _get_position(self, row: Any) -> List[str]:
+        fields = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [str(row[field]) for field in fields]
+        return [str(getattr(row, field)) for field in fields]
+
+    def get_cache_params(self, request) -> Dict[str, str]:
+        return {
+            "cursor": request.query_params.get(self.cursor_query_param, ""),
+            "page_size": str(self.get_page_size(request)),
+        }
+
+    def get_cache_variant(
+        self, name: str, request, params: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, str]:
+        """Cache key and variant id of this page, plus any view ``params``."""
+        return list_cache_key(
+            name, {**(params or {}), **self.get_cache_params(request)}
+        )
+
+    def get_cache_key(
+        self, name: str, request, params: Optional[Dict[str, str]] = None
+    ) -> str:
+        return self.get_cache_variant(name, request, params)[0]
+
+
+def _after(ordering: Sequence[str], position: Sequence[str]) -> Q:
+    """Rows past ``position`` in ``ordering``: a row-value comparison.
+
+    ``(a, b) > (x, y)`` is spelled ``a >= x AND (a > x OR (a = x AND b > y))``
+    so that the leading bound can range-scan an index on the ordering.
+    """
+    fields = [field.lstrip("-") for field in ordering]
+    lookups = ["__lt" if field.startswith("-") else "__gt" for field in ordering]
+    after = Q()
+    for i in range(len(fields)):
+        tied = {fields[j]: position[j] for j in range(i)}
+        after |= Q(**tied, **{fields[i] + lookups[i]: position[i]})
+    return Q(**{fields[0] + lookups[0] + "e": position[0]}) & after
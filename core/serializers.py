@@ -0,0 +1,179 @@
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from .cache import list_cache_key
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """``many=True`` related field that resolves all keys with one ``IN`` query.
+
+    DRF's ``ManyRelatedField`` looks each primary key up separately, which
+    costs one query per item on writes.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        relation = self.child_relation
+        try:
+            keys = list(dict.fromkeys(int(value) for value in data))
+        except (TypeError, ValueError):
+            relation.fail("incorrect_type", data_type="list item")
+        found = relation.get_queryset().in_bulk(keys)
+        for key in keys:
+            if key not in found:
+                relation.fail("does_not_exist", pk_value=key)
+        return [found[key] for key in keys]
+
+
+def _split(value: str) -> List[str]:
+    return sorted({name.strip() for name in value.split(",") if name.strip()})
+
+
+# Serializer fields whose representation of a database value is the value.
+PLAIN_FIELD_TYPES = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _column_reader(column: str, field: serializers.Field) -> Callable[[Dict], Any]:
+    if isinstance(field, PLAIN_FIELD_TYPES):
+        return itemgetter(column)
+    convert = field.to_representation
+
+    def read(row: Dict) -> Any:
+        value = row[column]
+        return None if value is None else convert(value)
+
+    return read
+
+
+def _nested_reader(column: str, build: Callable[[Dict], Dict]) -> Callable:
+    def read(row: Dict) -> Optional[Dict]:
+        return None if row[column] is None else build(row)
+
+    return read
+
+
+class ValuesReader:
+    """Render rows of ``QuerySet.values()`` like a serializer would.
+
+    Built from a serializer class plus its ``fields`` and ``expand``
+    choices, it selects the columns those fields read (joining expanded
+    relations) and turns each row into the serializer's output with plain
+    dict lookups: no model instances and no per-field serializer calls
+    except for values that need converting, such as dates.
+    """
+
+    def __init__(self, serializer_class, fields=None, expand=()) -> None:
+        self.columns: List[str] = []
+        self.build = self._plan(serializer_class, fields, expand, "")
+
+    def _plan(self, serializer_class, names, expand, prefix: str):
+        readers = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (names is not None and name not in names):
+                continue
+            if isinstance(field, serializers.ManyRelatedField):
+                raise TypeError(f"{serializer_class.__name__}.{name} is a list.")
+            column = prefix + field.source.replace(".", "__")
+            self.columns.append(column)
+            if name in expand:
+                nested = serializer_class.expandable_fields[name]
+                build = self._plan(nested, None, (), f"{column}__")
+                readers.append((name, _nested_reader(column, build)))
+            else:
+                readers.append((name, _column_reader(column, field)))
+
+        def build(row: Dict) -> Dict:
+            return {name: read(row) for name, read in readers}
+
+        return build
+
+    def queryset(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        """``queryset.values()`` with the columns to render, the primary key
+        and ``extra`` columns (such as a cursor's ordering field)."""
+        columns = dict.fromkeys([queryset.model._meta.pk.name, *self.columns, *extra])
+        return queryset.values(*columns)
+
+    def render(self, rows: Iterable[Dict]) -> List[Dict]:
+        return [self.build(row) for row in rows]
+
+
+class ExpandableFieldsMixin:
+    """Sparse fieldsets (``fields=``) and opt-in expansion (``expand=``).
+
+    ``fields`` limits the rendered fields; ``expand`` renders the named
+    relations with their ``expandable_fields`` serializer instead of primary
+    keys. Both apply to the top level only. ``values_reader`` renders the
+    same output straight from ``values()`` rows, and ``expansion_tags``
+    names the cache tags the expanded objects add.
+    """
+
+    expandable_fields: Dict[str, Type[serializers.Serializer]] = {}
+    # Tag of the list cache that changes whenever one of the objects does.
+    cache_tag: Optional[str] = None
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in expand:
+            if name in self.fields:
+                many = isinstance(self.fields[name], serializers.ManyRelatedField)
+                self.fields[name] = self.expandable_fields[name](
+                    many=many, read_only=True
+                )
+
+    @classmethod
+    def get_field_params(cls, query_params) -> Dict[str, Any]:
+        """``fields`` and ``expand`` arguments from ``?fields=`` and ``?expand=``.
+
+        Raises ``ValueError`` naming unknown fields or expansions.
+        """
+        fields = _split(query_params.get("fields", ""))
+        expand = _split(query_params.get("expand", ""))
+        readable = {
+            name for name, field in cls().fields.items() if not field.write_only
+        }
+        unknown = [name for name in fields if name not in readable]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        unknown = [name for name in expand if name not in cls.expandable_fields]
+        if unknown:
+            raise ValueError(f"Unknown expansions: {', '.join(unknown)}")
+        return {"fields": fields or None, "expand": expand}
+
+    @staticmethod
+    def get_cache_params(params: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "fields": ",".join(params["fields"] or ()),
+            "expand": ",".join(params["expand"]),
+        }
+
+    @classmethod
+    def get_cache_key(cls, name: str, params: Dict[str, Any]) -> str:
+        """``name`` for the default representation, else a per-variant key."""
+        if not params["fields"] and not params["expand"]:
+            return name
+        return list_cache_key(name, cls.get_cache_params(params))[0]
+
+    @classmethod
+    def expansion_tags(cls, params: Dict[str, Any]) -> List[str]:
+        tags = {cls.expandable_fields[name].cache_tag for name in params["expand"]}
+        return sorted(tag for tag in tags if tag)
+
+    @classmethod
+    def values_reader(cls, fields=None, expand=()) -> ValuesReader:
+        """Fast read path rendering ``values()`` rows like this serializer."""
+        return ValuesReader(cls, fields, expand)
@@ -44,16 +44,31 @@ INSTALLED_APPS = [
     "user",
     "player",
     "tournament",
+    "jobs",
 ]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema'
 }
 
+# Upper bound for the ?page_size= query parameter on list endpoints.
+API_MAX_PAGE_SIZE = 1000
+# Rows serialized per chunk by streamed list responses (?stream=true).
+API_STREAM_CHUNK_SIZE = 500
+
+# Background jobs (see jobs/queue.py): attempts per job, base delay in
+# seconds of the exponential retry backoff, and how long a job may run
+# before its worker is presumed dead and the job is requeued.
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 5
+JOBS_LOCK_TIMEOUT = 60 * 10
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Basic': {
@@ -104,6 +119,21 @@ CACHES = {
     }
 }
 
+# Cached API payloads are invalidated through tags bumped by model signals
+# (see core/cache.py), so they can live much longer than a poll interval.
+CACHE_TTL = 60 * 60 * 6
+# How long a stale entry may still be served while one worker refreshes it.
+CACHE_STALE_TTL = 60 * 5
+# Users authenticated from a JWT are cached in Redis and, for a few seconds,
+# in each process (see user/authentication.py); saves drop both.
+AUTH_USER_CACHE_TTL = 60 * 5
+AUTH_USER_LOCAL_TTL = 5
+AUTH_USER_LOCAL_SIZE = 10_000
+# Processes hashing passwords for bulk account provisioning, in
+# `manage.py provision_users` and the `run_jobs` worker (default: one per
+# CPU; 1 hashes in the command's process).
+PROVISIONING_HASH_WORKERS = None
+
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -191,3 +221,27 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Live tournament events: one Redis pub/sub subscription per process fans
+# out to that process's open streams (tournament.events.LocalBackend works
+# for a single process).
+TOURNAMENT_EVENTS_BACKEND = "tournament.events.RedisBackend"
+TOURNAMENT_EVENTS_REDIS_URL = "redis://127.0.0.1:6379/2"
+
+# Redis holding the per-tournament rank index (tournament/rank_index.py)
+# behind the ranks endpoints; an index not written for RANK_INDEX_TTL seconds
+# expires and is rebuilt from the standings on the next read.
+RANK_INDEX_REDIS_URL = "redis://127.0.0.1:6379/3"
+RANK_INDEX_TTL = 60 * 60 * 24 * 7
+
+# Dotted path of the strategy used to pair tournament rounds.
+PAIRING_STRATEGY = "tournament.pairing.SwissPairingStrategy"
+
+# Tiebreaks applied in order after points on the leaderboard; see
+# tournament.tiebreaks.TIEBREAKS for the available rules.
+LEADERBOARD_TIEBREAKS = [
+    "buchholz",
+    "median_buchholz",
+    "sonneborn_berger",
+    "progressive",
+]
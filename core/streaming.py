@@ -0,0 +1,62 @@
+"""Streamed JSON rendering of whole list endpoints.
+
+``GET ...?stream=true`` returns every row of a list as one JSON array
+instead of a cursor page. Rows are read with ``QuerySet.iterator()`` and
+rendered and encoded ``API_STREAM_CHUNK_SIZE`` at a time, so a worker holds
+one chunk rather than the whole list, its rendered data and the body.
+Streamed responses bypass the cache.
+"""
+
+from itertools import islice
+from typing import Any, Callable, Iterator, List
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_QUERY_PARAM = "stream"
+
+
+def get_stream_chunk_size() -> int:
+    return getattr(settings, "API_STREAM_CHUNK_SIZE", 500)
+
+
+def wants_stream(request: Any) -> bool:
+    value = request.query_params.get(STREAM_QUERY_PARAM, "")
+    return value.lower() in ("1", "true", "yes")
+
+
+def iter_json_list(
+    queryset: QuerySet,
+    render: Callable[[List[Any]], List[Any]],
+    chunk_size: int,
+) -> Iterator[bytes]:
+    """Yield ``queryset`` as the bytes of one JSON array, chunk by chunk.
+
+    ``render`` turns a chunk of rows into JSON-ready data, e.g.
+    ``ValuesReader.render`` or one reused list serializer's
+    ``to_representation`` (a new serializer per chunk would leave reference
+    cycles that only the rare full garbage collection frees).
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    rows = queryset.iterator(chunk_size=chunk_size)
+    yield b"["
+    separator = ""
+    while chunk := list(islice(rows, chunk_size)):
+        data = render(chunk)
+        yield (separator + ",".join(map(encoder.encode, data))).encode()
+        separator = ","
+    yield b"]"
+
+
+def stream_list(
+    queryset: QuerySet, render: Callable[[List[Any]], List[Any]]
+) -> StreamingHttpResponse:
+    """Stream every row of ``queryset`` (by ``id`` unless already ordered)."""
+    if not queryset.ordered:
+        queryset = queryset.order_by("id")
+    return StreamingHttpResponse(
+        iter_json_list(queryset, render, get_stream_chunk_size()),
+        content_type="application/json",
+    )
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from core.async_cache import server_url
+from core.bulk import bulk_insert
+from core.cache import get_or_compute, invalidate_tags
+from tournament.models import Tournament
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_misses_run_one_query():
+    Tournament.objects.create(
+        name="Busy Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    queries = []
+    results = []
+    barrier = threading.Barrier(16)
+
+    def compute():
+        queries.append(1)
+        time.sleep(0.2)
+        return list(Tournament.objects.values_list("name", flat=True))
+
+    def request():
+        barrier.wait()
+        results.append(get_or_compute("busy", compute, tags=["tournaments:list"]))
+
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(queries) == 1
+    assert results == [["Busy Open"]] * 16
+
+
+def test_stale_value_is_served_while_another_worker_refreshes():
+    get_or_compute("board", lambda: "old", tags=["tournament:1"])
+    invalidate_tags("tournament:1")
+
+    cache.add("lock:board", "other-worker", 10)
+    assert get_or_compute("board", lambda: "new", tags=["tournament:1"]) == "old"
+
+    cache.delete("lock:board")
+    assert get_or_compute("board", lambda: "new", tags=["tournament:1"]) == "new"
+
+
+def test_expired_entries_are_refreshed_with_jittered_ttl():
+    get_or_compute("standings", lambda: 1, timeout=100)
+    entry = cache.get("standings")
+    assert 90 <= entry["fresh_until"] - time.time() <= 110
+
+    entry["fresh_until"] = time.time() - 1
+    cache.set("standings", entry)
+    assert get_or_compute("standings", lambda: 2, timeout=100) == 2
+
+
+@pytest.mark.django_db
+def test_copy_keeps_null_and_empty_strings_apart(copy_path):
+    bulk_insert(User, ["username", "password"], [("ann", ""), ('say "hi", bob', "x")])
+    ann = User.objects.get(username="ann")
+    assert ann.password == "" and ann.last_login is None
+    assert User.objects.filter(username='say "hi", bob').exists()
+
+
+@pytest.mark.parametrize(
+    "location",
+    [
+        "redis://primary:6379/1",
+        "redis://primary:6379/1, redis://replica:6379/1",
+        ["redis://primary:6379/1", "redis://replica:6379/1"],
+    ],
+)
+def test_async_cache_writes_to_the_primary(location):
+    caches = {"default": {"BACKEND": "django_redis.cache.RedisCache"}}
+    caches["default"]["LOCATION"] = location
+    with override_settings(CACHES=caches):
+        assert server_url() == "redis://primary:6379/1"
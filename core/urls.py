@@ -41,6 +41,7 @@ urlpatterns = [
     path("user/", include("user.urls")),
     path("player/", include("player.urls")),
     path("tournament/", include("tournament.urls")),
+    path("jobs/", include("jobs.urls")),
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
         schema_view.without_ui(cache_timeout=0),
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "created_at", "finished_at")
+    search_fields = ("kind", "dedup_key")
+    list_filter = ("kind", "status")
+
+
+admin.site.register(Job, JobAdmin)
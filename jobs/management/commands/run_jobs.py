@@ -0,0 +1,93 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (pairings, standings rebuilds, account "
+        "provisioning) until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--batch", type=int, default=1, help="Jobs claimed per database round trip."
+        )
+        parser.add_argument(
+            "--poll", type=float, default=1.0, help="Seconds between polls when idle."
+        )
+        parser.add_argument(
+            "--kind",
+            action="append",
+            dest="kinds",
+            help="Only run jobs of this kind (repeatable).",
+        )
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=60.0,
+            help="Seconds between throughput log lines.",
+        )
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        # Finish the current job on SIGTERM / Ctrl-C, then exit.
+        previous = {
+            signum: signal.signal(signum, stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            processed, succeeded = self.work(worker, lambda: stopping, **options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {processed} jobs, {succeeded} succeeded.")
+        )
+
+    def work(self, worker, stopping, **options):
+        processed = succeeded = 0
+        window_start = time.monotonic()
+        window_count = 0
+        while not stopping():
+            close_old_connections()
+            requeue_stale_jobs()
+            jobs = claim_jobs(worker, options["batch"], options["kinds"])
+            if not jobs and options["once"]:
+                break
+            for job in jobs:
+                run_job(job)
+                processed += 1
+                window_count += 1
+                succeeded += job.status == job.Status.SUCCEEDED
+                self.stdout.write(
+                    f"Job {job.pk} ({job.kind}): {job.status} "
+                    f"in {job.duration:.3f}s (attempt {job.attempts})"
+                )
+            elapsed = time.monotonic() - window_start
+            if elapsed >= options["stats_interval"]:
+                self.stdout.write(
+                    f"{worker}: {window_count} jobs in {elapsed:.0f}s "
+                    f"({window_count / elapsed:.2f}/s)"
+                )
+                window_start, window_count = time.monotonic(), 0
+            if not jobs:
+                time.sleep(options["poll"])
+        return processed, succeeded
@@ -0,0 +1,241 @@
+"""Database-backed job queue.
+
+Jobs are rows of ``jobs.Job``; ``manage.py run_jobs`` workers claim them
+with ``SELECT ... FOR UPDATE SKIP LOCKED`` (so any number of workers can
+share the table without a broker) and run the handler registered for
+their ``kind``. A handler that raises ``JobError`` fails its job for good;
+any other exception is retried with exponential backoff until
+``max_attempts``. Jobs whose worker died are requeued once they have been
+running for ``JOBS_LOCK_TIMEOUT`` seconds.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Any]
+
+_handlers: Dict[str, Handler] = {}
+
+# Sent with ``job`` once a job has succeeded or failed for good.
+job_finished = Signal()
+
+
+class JobError(Exception):
+    """A failure that retrying cannot fix."""
+
+
+def register(kind: str) -> Callable[[Handler], Handler]:
+    """Register the decorated function as the handler of ``kind`` jobs.
+
+    It is called with the job's payload as keyword arguments, and its
+    return value (which must be JSON serializable) becomes the job result.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        _handlers[kind] = handler
+        return handler
+
+    return decorator
+
+
+def get_max_attempts() -> int:
+    return getattr(settings, "JOBS_MAX_ATTEMPTS", 3)
+
+
+def get_retry_delay(attempts: int) -> float:
+    """Seconds to wait before the retry following attempt ``attempts``."""
+    return getattr(settings, "JOBS_RETRY_BACKOFF", 5) * 2 ** (attempts - 1)
+
+
+def get_lock_timeout() -> int:
+    return getattr(settings, "JOBS_LOCK_TIMEOUT", 60 * 10)
+
+
+def enqueue(
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    dedup_key: str = "",
+    max_attempts: Optional[int] = None,
+) -> Tuple[Job, bool]:
+    """Queue a job; returns ``(job, created)``.
+
+    With a ``dedup_key``, an already queued or running job with the same
+    key is returned instead of queueing another one.
+    """
+    fields = {
+        "kind": kind,
+        "payload": payload or {},
+        "max_attempts": max_attempts or get_max_attempts(),
+    }
+    if not dedup_key:
+        return Job.objects.create(**fields), True
+    active = Job.objects.filter(dedup_key=dedup_key, status__in=Job.ACTIVE)
+    job = active.first()
+    if job is None:
+        try:
+            with transaction.atomic():
+                return Job.objects.create(dedup_key=dedup_key, **fields), True
+        except IntegrityError:
+            # Queued concurrently: return that job instead.
+            job = active.first()
+            if job is None:
+                raise
+    return job, False
+
+
+def claim_jobs(
+    worker: str, limit: int = 1, kinds: Optional[Iterable[str]] = None
+) -> List[Job]:
+    """Mark up to ``limit`` due jobs as running by ``worker`` and return them."""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now)
+    if kinds:
+        due = due.filter(kind__in=list(kinds))
+    with transaction.atomic():
+        ids = list(
+            due.order_by("run_after", "id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:limit]
+        )
+        # The status check keeps backends without row locks from double-claiming.
+        Job.objects.filter(id__in=ids, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(
+        Job.objects.filter(id__in=ids, locked_by=worker, started_at=now).order_by(
+            "run_after", "id"
+        )
+    )
+
+
+def _finish(job: Job, **fields: Any) -> bool:
+    """Store the outcome of ``job`` unless it was taken from its worker."""
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    ).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return bool(updated)
+
+
+def run_job(job: Job) -> Job:
+    """Run a claimed job and record its result, retry or failure."""
+    handler = _handlers.get(job.kind)
+    started = time.perf_counter()
+    try:
+        if handler is None:
+            raise JobError(f"No handler for job kind {job.kind!r}")
+        result = handler(**job.payload)
+    except JobError as exc:
+        fields = {"status": Job.Status.FAILED, "error": str(exc)}
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        fields = {"error": f"{type(exc).__name__}: {exc}"}
+        if job.attempts < job.max_attempts:
+            delay = get_retry_delay(job.attempts)
+            fields.update(
+                status=Job.Status.QUEUED,
+                locked_by="",
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+        else:
+            fields["status"] = Job.Status.FAILED
+    else:
+        fields = {"status": Job.Status.SUCCEEDED, "result": result, "error": ""}
+    fields["duration"] = time.perf_counter() - started
+    if fields["status"] != Job.Status.QUEUED:
+        fields["finished_at"] = timezone.now()
+    if _finish(job, **fields) and job.status != Job.Status.QUEUED:
+        job_finished.send(sender=Job, job=job)
+    return job
+
+
+def requeue_stale_jobs(timeout: Optional[int] = None) -> int:
+    """Requeue (or fail, if out of attempts) jobs whose worker stopped.
+
+    Returns the number of jobs touched.
+    """
+    timeout = get_lock_timeout() if timeout is None else timeout
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING, started_at__lt=now - timedelta(seconds=timeout)
+    )
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=Job.Status.QUEUED,
+        locked_by="",
+        run_after=now,
+        error="Worker stopped responding",
+    )
+    failed = list(stale)
+    for job in failed:
+        if _finish(
+            job,
+            status=Job.Status.FAILED,
+            error="Worker stopped responding",
+            finished_at=now,
+        ):
+            job_finished.send(sender=Job, job=job)
+    return requeued + len(failed)
+
+
+def get_job_metrics(window: int = 300) -> Dict[str, Any]:
+    """Queue depth plus per-kind throughput of the last ``window`` seconds."""
+    now = timezone.now()
+    active = {
+        row["status"]: row
+        for row in Job.objects.filter(status__in=Job.ACTIVE)
+        .values("status")
+        .annotate(count=Count("id"), oldest=Min("created_at"))
+    }
+    queued = active.get(Job.Status.QUEUED, {"count": 0, "oldest": None})
+    kinds: Dict[str, Dict[str, Any]] = {}
+    finished = (
+        Job.objects.filter(finished_at__gte=now - timedelta(seconds=window))
+        .values("kind", "status")
+        .annotate(
+            count=Count("id"),
+            avg_duration=Avg("duration"),
+            max_duration=Max("duration"),
+            retries=Sum(F("attempts") - 1),
+        )
+        .order_by("kind", "status")
+    )
+    for row in finished:
+        stats = kinds.setdefault(
+            row["kind"],
+            {"succeeded": 0, "failed": 0, "retries": 0, "per_minute": 0.0},
+        )
+        stats[row["status"]] = row["count"]
+        stats["retries"] += row["retries"] or 0
+        stats["per_minute"] = round(
+            (stats["succeeded"] + stats["failed"]) * 60 / window, 2
+        )
+        if row["status"] == Job.Status.SUCCEEDED:
+            stats["avg_duration"] = round(row["avg_duration"] or 0, 4)
+            stats["max_duration"] = round(row["max_duration"] or 0, 4)
+    return {
+        "window": window,
+        "queued": queued["count"],
+        "running": active.get(Job.Status.RUNNING, {"count": 0})["count"],
+        "oldest_queued_age": (
+            round((now - queued["oldest"]).total_seconds(), 1)
+            if queued["oldest"]
+            else None
+        ),
+        "kinds": kinds,
+    }
@@ -0,0 +1,182 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from jobs import queue
+from jobs.models import Job
+from jobs.queue import (
+    JobError,
+    claim_jobs,
+    enqueue,
+    get_job_metrics,
+    requeue_stale_jobs,
+    run_job,
+)
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+
+    def record(**payload):
+        calls.append(payload)
+        return {"echo": payload}
+
+    def flaky(**payload):
+        raise ConnectionError("database went away")
+
+    def broken(**payload):
+        raise JobError("cannot be done")
+
+    monkeypatch.setattr(
+        queue,
+        "_handlers",
+        {"test.record": record, "test.flaky": flaky, "test.broken": broken},
+    )
+    return calls
+
+
+@pytest.fixture
+def finished(monkeypatch):
+    jobs = []
+
+    def receiver(sender, job, **kwargs):
+        jobs.append(job)
+
+    queue.job_finished.connect(receiver)
+    yield jobs
+    queue.job_finished.disconnect(receiver)
+
+
+def run_next(worker="worker-1"):
+    (job,) = claim_jobs(worker)
+    return run_job(job)
+
+
+@pytest.mark.django_db
+def test_jobs_are_deduplicated_while_active(handlers):
+    job, created = enqueue("test.record", {"n": 1}, dedup_key="round:1")
+    assert created
+    assert enqueue("test.record", {"n": 2}, dedup_key="round:1") == (job, False)
+    assert enqueue("test.record", {"n": 3}, dedup_key="round:2")[1]
+
+    claim_jobs("worker-1", limit=1)
+    assert enqueue("test.record", dedup_key="round:1") == (job, False)
+    run_job(Job.objects.get(pk=job.pk))
+    # Finished jobs do not block a new one.
+    assert enqueue("test.record", dedup_key="round:1")[0] != job
+
+
+@pytest.mark.django_db
+def test_worker_runs_job_and_stores_result(handlers, finished):
+    job, _ = enqueue("test.record", {"n": 1})
+    assert claim_jobs("worker-2") == [job]
+    job = run_job(Job.objects.get(pk=job.pk))
+
+    job.refresh_from_db()
+    assert handlers == [{"n": 1}]
+    assert job.status == Job.Status.SUCCEEDED
+    assert job.result == {"echo": {"n": 1}}
+    assert job.attempts == 1 and job.locked_by == "worker-2"
+    assert job.finished_at is not None and job.duration is not None
+    assert finished == [job]
+    assert claim_jobs("worker-2") == []
+
+
+@pytest.mark.django_db
+def test_transient_failures_are_retried_with_backoff(handlers, finished, settings):
+    settings.JOBS_RETRY_BACKOFF = 10
+    job, _ = enqueue("test.flaky", max_attempts=2)
+
+    before = timezone.now()
+    job = run_next()
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED
+    assert "ConnectionError: database went away" in job.error
+    assert job.run_after >= before + timedelta(seconds=10)
+    # Not due yet.
+    assert claim_jobs("worker-1") == []
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    job = run_next()
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+    assert job.attempts == 2
+    assert finished == [job]
+
+
+@pytest.mark.django_db
+def test_job_errors_and_unknown_kinds_fail_without_retry(handlers):
+    broken, _ = enqueue("test.broken")
+    unknown, _ = enqueue("test.unknown")
+    for job in claim_jobs("worker-1", limit=2):
+        run_job(job)
+    broken.refresh_from_db()
+    unknown.refresh_from_db()
+    assert (broken.status, broken.error) == (Job.Status.FAILED, "cannot be done")
+    assert unknown.status == Job.Status.FAILED
+    assert broken.attempts == unknown.attempts == 1
+
+
+@pytest.mark.django_db
+def test_jobs_of_dead_workers_are_requeued(handlers, finished):
+    retried, _ = enqueue("test.record")
+    exhausted, _ = enqueue("test.record", max_attempts=1)
+    claim_jobs("dead-worker", limit=2)
+    Job.objects.update(started_at=timezone.now() - timedelta(hours=1))
+
+    assert requeue_stale_jobs(timeout=60) == 2
+    retried.refresh_from_db()
+    exhausted.refresh_from_db()
+    assert retried.status == Job.Status.QUEUED
+    assert exhausted.status == Job.Status.FAILED
+    assert finished == [exhausted]
+    # A late result from the dead worker is ignored.
+    assert run_job(Job.objects.get(pk=exhausted.pk)).pk == exhausted.pk
+    exhausted.refresh_from_db()
+    assert exhausted.status == Job.Status.FAILED
+    assert handlers == [{}]
+
+
+@pytest.mark.django_db
+def test_run_jobs_command_and_metrics(handlers):
+    for i in range(3):
+        enqueue("test.record", {"n": i})
+    enqueue("test.broken")
+    later, _ = enqueue("test.record", {"n": 9})
+    Job.objects.filter(pk=later.pk).update(
+        run_after=timezone.now() + timedelta(hours=1)
+    )
+
+    out = StringIO()
+    call_command("run_jobs", "--once", "--batch", "2", stdout=out)
+    assert "Processed 4 jobs, 3 succeeded." in out.getvalue()
+
+    metrics = get_job_metrics(window=60)
+    assert metrics["queued"] == 1 and metrics["running"] == 0
+    assert metrics["kinds"]["test.record"]["succeeded"] == 3
+    assert metrics["kinds"]["test.record"]["per_minute"] == 3
+    assert metrics["kinds"]["test.broken"]["failed"] == 1
+
+
+@pytest.mark.django_db
+def test_job_endpoints_are_admin_only(handlers):
+    job, _ = enqueue("test.record")
+    client = APIClient()
+    assert client.get(reverse("job-detail", args=[job.pk])).status_code == 401
+    client.force_authenticate(
+        user=User.objects.create_superuser(
+            username="admin", password="password", email="admin@example.com"
+        )
+    )
+    response = client.get(reverse("job-detail", args=[job.pk]))
+    assert response.status_code == 200
+    assert response.data["status"] == "queued"
+    response = client.get(reverse("job-metrics"), {"window": 60})
+    assert response.data["queued"] == 1
+    assert client.get(reverse("job-metrics"), {"window": "x"}).status_code == 400
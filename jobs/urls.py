@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import JobDetailAPIView, JobMetricsAPIView
+
+urlpatterns = [
+    path("<int:pk>/", JobDetailAPIView.as_view(), name="job-detail"),
+    path("metrics/", JobMetricsAPIView.as_view(), name="job-metrics"),
+]
@@ -0,0 +1,47 @@
+from typing import Any
+
+from django.urls import reverse
+from rest_framework import permissions, status
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Job
+from .queue import get_job_metrics
+from .serializers import JobSerializer
+
+
+def job_accepted(job: Job) -> Response:
+    """202 response for a queued job, pointing at its status URL."""
+    return Response(
+        JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": reverse("job-detail", args=[job.pk])},
+    )
+
+
+class JobDetailAPIView(APIView):
+    """Status of a background job; poll it until it has ``finished_at``."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Any, pk: int) -> Response:
+        return Response(JobSerializer(get_object_or_404(Job, pk=pk)).data)
+
+
+class JobMetricsAPIView(APIView):
+    """Queue depth and per-kind throughput over ``?window=`` seconds."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Any) -> Response:
+        try:
+            window = int(request.query_params.get("window", 300))
+        except ValueError:
+            window = 0
+        if window <= 0:
+            return Response(
+                {"error": "window must be a positive number of seconds"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_job_metrics(window))
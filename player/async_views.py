@@ -0,0 +1,85 @@
+"""Async GET of the player endpoints, served by ``core/asgi.py``."""
+
+from typing import Any, Dict
+
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from core.async_views import AsyncReadView
+from core.cache import arecord_cache_access
+from core.conditional import acached_response
+from core.streaming import wants_stream
+from user.models import Player
+from .serializers import PlayerSerializer
+from .views import PlayerDetailAPIView, PlayerListCreateAPIView
+
+
+class PlayerListView(AsyncReadView):
+    sync_view = PlayerListCreateAPIView
+
+    async def get(self, request: Any, *args: Any, **kwargs: Any) -> HttpResponse:
+        request = Request(request)
+        if wants_stream(request):
+            return await self.delegate(request._request)
+        try:
+            params = PlayerSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return self.error(str(exc))
+        # Filtering, search and ordering are the DRF view's.
+        view = self.sync_view(request=request, format_kwarg=None)
+        reader = PlayerSerializer.values_reader(**params)
+        ordering = OrderingFilter().get_ordering(request, Player.objects.none(), view)
+        queryset = reader.queryset(
+            view.filter_queryset(Player.objects.all()),
+            *[field.lstrip("-") for field in ordering or []],
+        )
+        cache_key, variant = self.pagination_class().get_cache_variant(
+            "players",
+            request,
+            {
+                **view.get_cache_params(request),
+                **PlayerSerializer.get_cache_params(params),
+            },
+        )
+        computed = False
+
+        def on_compute() -> None:
+            nonlocal computed
+            computed = True
+
+        response = await self.cached_page(
+            request,
+            cache_key,
+            queryset,
+            reader,
+            tags=["players:list"],
+            view=view,
+            on_compute=on_compute,
+        )
+        await arecord_cache_access("players", variant, hit=not computed)
+        return response
+
+
+class PlayerDetailView(AsyncReadView):
+    sync_view = PlayerDetailAPIView
+
+    async def get(
+        self, request: Any, pk: int, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        try:
+            params = PlayerSerializer.get_field_params(request.GET)
+        except ValueError as exc:
+            return self.error(str(exc))
+
+        async def compute() -> Dict[str, Any]:
+            reader = PlayerSerializer.values_reader(**params)
+            queryset = reader.queryset(Player.objects.all())
+            return reader.build(await aget_object_or_404(queryset, pk=pk))
+
+        return await acached_response(
+            request,
+            PlayerSerializer.get_cache_key(f"player_{pk}", params),
+            compute,
+            tags=[f"player:{pk}"],
+        )
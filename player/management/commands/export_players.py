@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from player.transfer import CHUNK_SIZE, FORMATS, export_players
+
+
+class Command(BaseCommand):
+    help = "Write every player as CSV or NDJSON (to stdout by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-")
+        parser.add_argument(
+            "--format", dest="file_format", choices=FORMATS, default="csv"
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = export_players(options["file_format"], options["chunk_size"])
+        if options["path"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["path"], "w", newline="") as output:
+            output.writelines(lines)
@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from player.transfer import (
+    CHUNK_SIZE,
+    FORMATS,
+    PlayerImportError,
+    import_players,
+    parse_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Upsert players from a CSV or NDJSON file (use - for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FORMATS,
+            help="Input format (default: from the file extension, else csv).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            result = import_players(
+                parse_rows(stream, file_format), options["chunk_size"]
+            )
+        except PlayerImportError as exc:
+            for error in exc.errors:
+                self.stderr.write(f"Row {error['row']}: {error['errors']}")
+            raise CommandError(f"Import aborted: {exc}.")
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created} and updated {result.updated} players."
+            )
+        )
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from core.serializers import ExpandableFieldsMixin
 from user.models import Player
 
-class PlayerSerializer(serializers.ModelSerializer):
+class PlayerSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    cache_tag = 'players:list'
+
     class Meta:
         model = Player
         fields = ['id', 'user', 'name', 'age', 'rating', 'country']
\ No newline at end of file
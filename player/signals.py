@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate_tags_on_commit
+from user.models import Player
+
+
+@receiver([post_save, post_delete], sender=Player)
+def invalidate_player(sender, instance, **kwargs):
+    # Leaderboards embed player details and are tagged with players:list.
+    invalidate_tags_on_commit(f"player:{instance.pk}", "players:list")
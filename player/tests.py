@@ -1,3 +1,462 @@
-from django.test import TestCase
+import io
+import json
 
-# Create your tests here.
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.cache import get_cache_stats
+from player.views import PlayerListCreateAPIView
+from tournament.models import HeadToHead, Match, PlayerGame, Tournament
+from user.models import Player
+
+
+@pytest.fixture
+def players():
+    return [
+        Player.objects.create(
+            user=User.objects.create_user(username=username, password="password"),
+            name=username.title(),
+            age=30,
+            rating=rating,
+            country=country,
+        )
+        for username, rating, country in [
+            ("magnus", 2830, "NOR"),
+            ("hikaru", 2800, "USA"),
+            ("fabiano", 2790, "USA"),
+        ]
+    ]
+
+
+def names(response):
+    return [row["name"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_player_list_caches_each_filter_variant(admin_client, players):
+    url = reverse("player-list-create")
+    assert names(admin_client.get(url, {"country": "NOR"})) == ["Magnus"]
+    assert names(admin_client.get(url, {"country": "USA", "ordering": "rating"})) == [
+        "Fabiano",
+        "Hikaru",
+    ]
+    assert names(admin_client.get(url, {"search": "hik"})) == ["Hikaru"]
+
+
+def walk(client, url, params):
+    """Ids of every page reached through ``next``, and the last response."""
+    ids, response = [], client.get(url, params)
+    while True:
+        ids.extend(row["id"] for row in response.data["results"])
+        if response.data["next"] is None:
+            return ids, response
+        response = client.get(response.data["next"])
+
+
+@pytest.mark.django_db
+def test_cursor_pages_through_tied_ratings(admin_client):
+    # More tied rows than DRF's offset cutoff (1000): the id breaks the ties.
+    users = User.objects.bulk_create(
+        User(username=f"tied{i}", password="!") for i in range(1500)
+    )
+    Player.objects.bulk_create(
+        Player(user=user, name=user.username, age=30, rating=1200, country="USA")
+        for user in users
+    )
+    url = reverse("player-list-create")
+
+    ids, last = walk(admin_client, url, {"ordering": "rating", "page_size": 100})
+    assert ids == sorted(Player.objects.values_list("id", flat=True))
+
+    previous = admin_client.get(last.data["previous"])
+    assert [row["id"] for row in previous.data["results"]] == ids[-200:-100]
+
+    ids, _ = walk(admin_client, url, {"ordering": "-rating", "page_size": 700})
+    assert ids == sorted(ids, reverse=True) and len(ids) == 1500
+
+
+@pytest.mark.django_db
+def test_cursor_ordering_keeps_the_requested_direction(admin_client, players):
+    url = reverse("player-list-create")
+    ids, _ = walk(admin_client, url, {"ordering": "-rating", "page_size": 1})
+    assert ids == [player.id for player in players]
+    response = admin_client.get(url, {"ordering": "rating", "page_size": 1})
+    assert names(response) == ["Fabiano"]
+    # A cursor of one ordering is not a position in another.
+    response = admin_client.get(response.data["next"].replace("rating", "id"))
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_equivalent_queries_share_a_variant(
+    admin_client, players, django_assert_num_queries
+):
+    url = reverse("player-list-create")
+    admin_client.get(url, {"search": "Hik", "country": "USA", "utm": "x"})
+    with django_assert_num_queries(0):
+        response = admin_client.get(url + "?country=USA&search=%20hik%20")
+    assert names(response) == ["Hikaru"]
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_are_cached_per_variant(admin_client, players):
+    url = reverse("player-list-create")
+    response = admin_client.get(url, {"country": "NOR", "fields": "rating,name"})
+    assert response.data["results"] == [{"name": "Magnus", "rating": 2830}]
+    response = admin_client.get(url, {"country": "NOR"})
+    assert set(response.data["results"][0]) == {
+        "id",
+        "user",
+        "name",
+        "age",
+        "rating",
+        "country",
+    }
+    response = admin_client.get(url, {"fields": "rank"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_hit_and_miss_counters_and_invalidation(admin_client, players):
+    view_url = reverse("player-list-create")
+    admin_client.get(view_url, {"country": "USA"})
+    admin_client.get(view_url, {"country": "USA"})
+
+    request = Request(APIRequestFactory().get(view_url, {"country": "USA"}))
+    view = PlayerListCreateAPIView()
+    paginator = view.pagination_class()
+    _, variant = paginator.get_cache_variant(
+        "players", request, view.get_cache_params(request)
+    )
+    assert get_cache_stats("players", variant) == {"hits": 1, "misses": 1}
+
+    admin_client.put(reverse("player-detail", args=[players[1].pk]), {"country": "NOR"})
+    assert names(admin_client.get(view_url, {"country": "USA"})) == ["Fabiano"]
+
+
+@pytest.mark.django_db
+def test_csv_import_upserts_players_and_users(admin_client, players, copy_path):
+    # New users are written as PostgreSQL's COPY reads them (NULL last_login).
+    body = (
+        "username,name,age,rating,country\n"
+        "magnus,Magnus Carlsen,33,2832,NOR\n"
+        "alireza,Alireza Firouzja,21,2760,FRA\n"
+    )
+    response = admin_client.post(
+        reverse("player-import"), body, content_type="text/csv"
+    )
+    assert response.status_code == 200
+    assert response.data == {"created": 1, "updated": 1}
+
+    magnus = Player.objects.get(user__username="magnus")
+    assert (magnus.name, magnus.rating) == ("Magnus Carlsen", 2832)
+    alireza = Player.objects.get(user__username="alireza")
+    assert alireza.country == "FRA"
+    assert not alireza.user.has_usable_password()
+    assert alireza.user.last_login is None
+
+
+@pytest.mark.django_db
+def test_ndjson_import_is_all_or_nothing(admin_client, players):
+    body = (
+        '{"username": "ding", "name": "Ding", "age": 31, "rating": 2780, '
+        '"country": "CHN"}\n'
+        '{"username": "gukesh", "name": "Gukesh", "age": "young", "rating": 2750, '
+        '"country": "IND"}\n'
+        "not json\n"
+    )
+    response = admin_client.post(
+        reverse("player-import"), body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 400
+    assert [error["row"] for error in response.data["errors"]] == [2, 3]
+    assert "age" in response.data["errors"][0]["errors"]
+    assert not User.objects.filter(username="ding").exists()
+
+
+@pytest.mark.django_db
+def test_export_round_trips_through_import(admin_client, players, tmp_path):
+    response = admin_client.get(reverse("player-export"), {"file_format": "ndjson"})
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])["username"] == "magnus"
+
+    path = tmp_path / "players.csv"
+    call_command("export_players", str(path))
+    Player.objects.filter(user__username="hikaru").update(rating=1000)
+    call_command("import_players", str(path), chunk_size=2, stdout=io.StringIO())
+    assert Player.objects.get(user__username="hikaru").rating == 2800
+
+
+def history_snapshot():
+    games = sorted(
+        PlayerGame.objects.values_list(
+            "player_id", "match_id", "opponent_id", "colour", "result"
+        )
+    )
+    records = sorted(
+        HeadToHead.objects.values_list(
+            "player_id", "opponent_id", "games", "wins", "losses", "last_match_id"
+        )
+    )
+    return games, records
+
+
+@pytest.fixture
+def games(players):
+    magnus, hikaru, fabiano = players
+    tournament = Tournament.objects.create(
+        name="History Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    matches = [
+        Match.objects.create(
+            tournament=tournament,
+            player1=white,
+            player2=black,
+            winner=winner,
+            round_number=round_number,
+        )
+        for round_number, white, black, winner in [
+            (1, magnus, hikaru, magnus),
+            (2, hikaru, magnus, hikaru),
+            (3, magnus, hikaru, None),
+            (3, fabiano, None, fabiano),
+        ]
+    ]
+    return tournament, matches
+
+
+@pytest.mark.django_db
+def test_history_is_kept_in_step_with_matches(admin_client, players, games):
+    magnus, hikaru, fabiano = players
+    tournament, matches = games
+    record = HeadToHead.objects.get(player=magnus, opponent=hikaru)
+    assert (record.games, record.wins, record.losses) == (3, 1, 1)
+    assert PlayerGame.objects.get(player=fabiano).result == "bye"
+
+    # Single result edit, bulk round results, a re-pairing and a deletion.
+    admin_client.put(
+        reverse("match-detail", args=[matches[1].pk]), {"winner": magnus.pk}
+    )
+    response = admin_client.post(
+        reverse("tournament-round-results", args=[tournament.pk, 3]),
+        {"results": [{"match": matches[2].pk, "winner": hikaru.pk}]},
+        format="json",
+    )
+    assert response.status_code == 200
+    record = HeadToHead.objects.get(player=hikaru, opponent=magnus)
+    assert (record.games, record.wins, record.losses) == (3, 1, 2)
+    admin_client.put(
+        reverse("match-detail", args=[matches[0].pk]), {"player2": fabiano.pk}
+    )
+    assert HeadToHead.objects.get(player=fabiano, opponent=magnus).games == 1
+    assert HeadToHead.objects.get(player=magnus, opponent=hikaru).games == 2
+    admin_client.delete(reverse("match-detail", args=[matches[0].pk]))
+    assert not HeadToHead.objects.filter(player=magnus, opponent=fabiano).exists()
+
+    # The incremental updates agree with a rebuild from the matches.
+    snapshot = history_snapshot()
+    call_command("rebuild_player_history", stdout=io.StringIO())
+    assert history_snapshot() == snapshot
+
+
+@pytest.mark.django_db
+def test_history_endpoint(admin_client, players, games, django_assert_max_num_queries):
+    magnus, hikaru, fabiano = players
+    tournament, matches = games
+    url = reverse("player-history", args=[magnus.pk])
+
+    with django_assert_max_num_queries(3):
+        response = admin_client.get(url, {"page_size": 2})
+    assert [row["match"] for row in response.data["results"]] == [
+        matches[2].pk,
+        matches[1].pk,
+    ]
+    assert response.data["results"][0] == {
+        "match": matches[2].pk,
+        "tournament": tournament.pk,
+        "round_number": 3,
+        "opponent": hikaru.pk,
+        "colour": "white",
+        "result": "pending",
+    }
+    assert response.data["summary"] == {
+        "games": 3,
+        "wins": 1,
+        "losses": 1,
+        "byes": 0,
+        "pending": 1,
+    }
+    response = admin_client.get(response.data["next"])
+    assert [row["match"] for row in response.data["results"]] == [matches[0].pk]
+    assert "summary" not in response.data
+
+    response = admin_client.get(
+        url, {"opponent": hikaru.pk, "expand": "opponent", "fields": "opponent"}
+    )
+    assert response.data["results"][0]["opponent"]["name"] == "Hikaru"
+    response = admin_client.get(
+        reverse("player-history", args=[fabiano.pk]), {"tournament": tournament.pk}
+    )
+    assert response.data["summary"]["byes"] == 1
+    assert admin_client.get(url, {"opponent": "x"}).status_code == 400
+    assert admin_client.get(reverse("player-history", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_versus_endpoint(admin_client, players, games, django_assert_num_queries):
+    magnus, hikaru, fabiano = players
+    tournament, matches = games
+    with django_assert_num_queries(1):
+        response = admin_client.get(
+            reverse("player-versus", args=[hikaru.pk, magnus.pk])
+        )
+    assert response.data == {
+        "player": hikaru.pk,
+        "opponent": magnus.pk,
+        "games": 3,
+        "wins": 1,
+        "losses": 1,
+        "last_match": matches[2].pk,
+    }
+    response = admin_client.get(reverse("player-versus", args=[magnus.pk, fabiano.pk]))
+    assert response.data["games"] == 0
+    assert (
+        admin_client.get(reverse("player-versus", args=[magnus.pk, 0])).status_code
+        == 404
+    )
+    assert (
+        admin_client.get(
+            reverse("player-versus", args=[magnus.pk, magnus.pk])
+        ).status_code
+        == 400
+    )
+
+
+@pytest.mark.django_db
+def test_history_of_a_large_round(admin_client):
+    boards = 600
+    users = User.objects.bulk_create(
+        [User(username=f"board-{i}", password="!") for i in range(boards * 2)]
+    )
+    field = Player.objects.bulk_create(
+        [Player(user=user, name=user.username, age=20, country="USA") for user in users]
+    )
+    tournament = Tournament.objects.create(
+        name="Large Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(field)
+    Match.objects.bulk_create(
+        [
+            Match(
+                tournament=tournament,
+                player1=field[i],
+                player2=field[i + 1],
+                round_number=1,
+            )
+            for i in range(0, len(field), 2)
+        ]
+    )
+    call_command("rebuild_player_history", stdout=io.StringIO())
+    matches = list(Match.objects.filter(tournament=tournament))
+
+    # More boards than SQLite allows terms in one expression.
+    response = admin_client.post(
+        reverse("tournament-round-results", args=[tournament.pk, 1]),
+        {
+            "results": [
+                {"match": match.pk, "winner": match.player1_id} for match in matches
+            ]
+        },
+        format="json",
+    )
+    assert response.status_code == 200
+    assert PlayerGame.objects.filter(result="win").count() == boards
+    record = HeadToHead.objects.get(player=field[1], opponent=field[0])
+    assert (record.games, record.wins, record.losses) == (1, 0, 1)
+
+    snapshot = history_snapshot()
+    call_command("rebuild_player_history", stdout=io.StringIO())
+    assert history_snapshot() == snapshot
+
+
+@pytest.mark.django_db
+def test_history_rebuild_writes_byes(copy_path, players, games):
+    magnus, hikaru, fabiano = players
+    PlayerGame.objects.all().delete()
+    HeadToHead.objects.all().delete()
+    call_command("rebuild_player_history", stdout=io.StringIO())
+
+    bye = PlayerGame.objects.get(player=fabiano)
+    assert (bye.opponent_id, bye.result) == (None, "bye")
+    assert PlayerGame.objects.count() == 7
+    record = HeadToHead.objects.get(player=magnus, opponent=hikaru)
+    assert (record.games, record.wins, record.losses) == (3, 1, 1)
+
+
+def create_field(name, count):
+    users = User.objects.bulk_create(
+        [User(username=f"{name}-{i}", password="!") for i in range(count)]
+    )
+    return Player.objects.bulk_create(
+        [Player(user=user, name=user.username, age=20, country="USA") for user in users]
+    )
+
+
+def create_rounds(name, field, rounds):
+    tournament = Tournament.objects.create(
+        name=name, start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(field)
+    Match.objects.bulk_create(
+        [
+            Match(
+                tournament=tournament,
+                player1=field[i],
+                player2=field[(i + round_number) % len(field)],
+                winner=field[i],
+                round_number=round_number,
+            )
+            for round_number in range(1, rounds + 1)
+            for i in range(0, len(field), 2)
+        ]
+    )
+    return tournament
+
+
+@pytest.mark.django_db
+def test_deleting_a_tournament_recounts_history_once(django_assert_max_num_queries):
+    field = create_field("cascade", 80)
+    deleted = create_rounds("Deleted Open", field, 3)
+    create_rounds("Kept Open", field[:20], 2)
+    call_command("rebuild_player_history", stdout=io.StringIO())
+
+    # 120 matches and 80 standings rows: a recount per match took 371.
+    with django_assert_max_num_queries(15):
+        deleted.delete()
+    snapshot = history_snapshot()
+    call_command("rebuild_player_history", stdout=io.StringIO())
+    assert history_snapshot() == snapshot
+    assert HeadToHead.objects.exists()
+
+
+@pytest.mark.django_db
+def test_deleting_a_player_drops_their_history_once(django_assert_max_num_queries):
+    field = create_field("leaver", 20)
+    create_rounds("Leaver Open", field, 5)
+    create_rounds("Second Open", field, 2)
+    call_command("rebuild_player_history", stdout=io.StringIO())
+
+    leaver = field[0].pk
+    # Includes recounting the participants of the player's tournaments.
+    with django_assert_max_num_queries(17):
+        field[0].delete()
+    assert not HeadToHead.objects.filter(opponent_id=leaver).exists()
+    snapshot = history_snapshot()
+    call_command("rebuild_player_history", stdout=io.StringIO())
+    assert history_snapshot() == snapshot
@@ -0,0 +1,181 @@
+"""Streaming player import and export (CSV and NDJSON).
+
+Imports read the input line by line and upsert players in chunks: users are
+matched by ``username`` and created without a usable password, players are
+matched by their user. Exports stream rows straight from a server-side
+iterator. Neither direction holds the whole file or table in memory.
+"""
+
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from rest_framework import serializers
+
+from core.bulk import bulk_insert, bulk_update_rows
+from core.cache import invalidate_tags_on_commit
+from tournament import rank_index
+from user.authentication import forget_users
+from user.models import Player
+
+FORMATS = ("csv", "ndjson")
+COLUMNS = ["username", "name", "age", "rating", "country"]
+PLAYER_FIELDS = COLUMNS[1:]
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+
+class PlayerImportError(Exception):
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+class PlayerRowSerializer(serializers.Serializer):
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()]
+    )
+    name = serializers.CharField(max_length=100)
+    age = serializers.IntegerField(min_value=0)
+    rating = serializers.IntegerField(min_value=0)
+    country = serializers.CharField(max_length=100)
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def format_for(content_type: str, default: str = "csv") -> str:
+    for name, known in CONTENT_TYPES.items():
+        if content_type.startswith(known):
+            return name
+    return default
+
+
+def parse_rows(lines: Iterable[bytes], file_format: str) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per record of a CSV (with header) or NDJSON stream."""
+    text = codecs.iterdecode(lines, "utf-8-sig")
+    if file_format == "csv":
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Reported by the row serializer as invalid data.
+                yield line
+
+
+def _upsert(rows: List[Dict[str, Any]], result: ImportResult) -> None:
+    usernames = [row["username"] for row in rows]
+    user_ids = dict(
+        User.objects.filter(username__in=usernames).values_list("username", "id")
+    )
+    missing = [name for name in usernames if name not in user_ids]
+    if missing:
+        # Imported accounts get no usable password until they reset it.
+        password = make_password(None)
+        bulk_insert(User, ["username", "password"], [(n, password) for n in missing])
+        user_ids.update(
+            User.objects.filter(username__in=missing).values_list("username", "id")
+        )
+
+    existing = dict(
+        Player.objects.filter(user_id__in=user_ids.values()).values_list(
+            "user_id", "id"
+        )
+    )
+    created, updated = [], []
+    for row in rows:
+        user_id = user_ids[row["username"]]
+        values = [row[name] for name in PLAYER_FIELDS]
+        if user_id in existing:
+            updated.append((existing[user_id], *values))
+        else:
+            created.append((user_id, *values))
+    bulk_insert(Player, ["user_id", *PLAYER_FIELDS], created)
+    bulk_update_rows(Player, ["id", *PLAYER_FIELDS], updated)
+    invalidate_tags_on_commit("players:list", *[f"player:{row[0]}" for row in updated])
+    # The rating breaks ties on the leaderboards they have entered.
+    rank_index.update_players_on_commit(row[0] for row in updated)
+    # The cached user of a request carries their player.
+    forget_users(user_ids.values())
+    result.created += len(created)
+    result.updated += len(updated)
+
+
+def import_players(
+    records: Iterable[Dict[str, Any]], chunk_size: int = CHUNK_SIZE
+) -> ImportResult:
+    """Validate and upsert ``records`` chunk by chunk, all in one transaction.
+
+    Invalid rows are collected (the first ``MAX_REPORTED_ERRORS``) while the
+    rest of the input is still checked; any error rolls the import back and
+    raises ``PlayerImportError``. Later rows win when a username repeats.
+    """
+    result = ImportResult()
+    records = iter(records)
+    line = 0  # Records read before the current chunk.
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            # One list serializer per chunk: per-row serializers would copy
+            # their fields for every row.
+            serializer = PlayerRowSerializer(data=chunk, many=True)
+            if not serializer.is_valid():
+                result.errors.extend(
+                    {"row": line + offset, "errors": errors}
+                    for offset, errors in enumerate(serializer.errors, 1)
+                    if errors
+                )
+            line += len(chunk)
+            if result.errors:
+                # Keep validating so the caller sees every problem at once.
+                if len(result.errors) >= MAX_REPORTED_ERRORS:
+                    break
+                continue
+            rows = {row["username"]: row for row in serializer.validated_data}
+            _upsert(list(rows.values()), result)
+        if result.errors:
+            raise PlayerImportError(result.errors[:MAX_REPORTED_ERRORS])
+    return result
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_players(
+    file_format: str = "csv", chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield the export line by line, reading players ``chunk_size`` at a time."""
+    rows = (
+        Player.objects.order_by("id")
+        .values_list("user__username", "name", "age", "rating", "country")
+        .iterator(chunk_size=chunk_size)
+    )
+    if file_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    for row in rows:
+        yield json.dumps(dict(zip(COLUMNS, row))) + "\n"
@@ -1,7 +1,33 @@
 from django.urls import path
-from .views import PlayerListCreateAPIView, PlayerDetailAPIView
+from . import async_views
+from .views import (
+    PlayerListCreateAPIView,
+    PlayerDetailAPIView,
+    PlayerExportAPIView,
+    PlayerHistoryAPIView,
+    PlayerImportAPIView,
+    PlayerVersusAPIView,
+)
 
 urlpatterns = [
     path("players/", PlayerListCreateAPIView.as_view(), name="player-list-create"),
     path("players/<int:pk>/", PlayerDetailAPIView.as_view(), name="player-detail"),
+    path(
+        "players/<int:pk>/history/",
+        PlayerHistoryAPIView.as_view(),
+        name="player-history",
+    ),
+    path(
+        "players/<int:pk>/vs/<int:other>/",
+        PlayerVersusAPIView.as_view(),
+        name="player-versus",
+    ),
+    path("players/import/", PlayerImportAPIView.as_view(), name="player-import"),
+    path("players/export/", PlayerExportAPIView.as_view(), name="player-export"),
+]
+
+# GET served by async views under ASGI (see core/asgi_urls.py).
+async_urlpatterns = [
+    path("players/", async_views.PlayerListView.as_view()),
+    path("players/<int:pk>/", async_views.PlayerDetailView.as_view()),
 ]
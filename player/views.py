@@ -3,13 +3,29 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import get_object_or_404
 from rest_framework.schemas.openapi import AutoSchema
-from django.core.cache import cache
-from django.db.models import Q
+from django.http import StreamingHttpResponse
+from core.cache import record_cache_access
+from core.conditional import cached_response
+from core.pagination import KeysetPagination
+from core.streaming import stream_list, wants_stream
+from django.db.models import Count, Q
+from tournament.models import HeadToHead, PlayerGame
+from tournament.serializers import PlayerGameSerializer
 from user.models import Player
 from .serializers import PlayerSerializer
-from typing import Any
+from .transfer import (
+    CONTENT_TYPES,
+    FORMATS,
+    PlayerImportError,
+    export_players,
+    format_for,
+    import_players,
+    parse_rows,
+)
+from typing import Any, Dict
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,24 +46,62 @@ class PlayerListCreateAPIView(APIView):
     ordering_fields = ['rating', 'points']
     schema = AutoSchema()
 
+    pagination_class = KeysetPagination
+
     def get(self, request: Any, *args: Any, **kwargs: Any) -> Response:
-        players = cache.get('players')
-        if players is None:
-            queryset = Player.objects.all()
-            queryset = self.filter_queryset(queryset)
-            serializer = PlayerSerializer(queryset, many=True)
-            players = serializer.data
-            cache.set('players', players, 60 * 5)
-        return Response(players)
+        try:
+            params = PlayerSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        reader = PlayerSerializer.values_reader(**params)
+        ordering = OrderingFilter().get_ordering(request, Player.objects.none(), self)
+        # Cursor positions are read from the rows, so they carry the ordering.
+        queryset = reader.queryset(
+            self.filter_queryset(Player.objects.all()),
+            *[field.lstrip('-') for field in ordering or []],
+        )
+        if wants_stream(request):
+            return stream_list(queryset, reader.render)
+        paginator = self.pagination_class()
+        cache_key, variant = paginator.get_cache_variant(
+            'players',
+            request,
+            {
+                **self.get_cache_params(request),
+                **PlayerSerializer.get_cache_params(params),
+            },
+        )
+        computed = False
+
+        def compute() -> Dict[str, Any]:
+            nonlocal computed
+            computed = True
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        response = cached_response(request, cache_key, compute, tags=['players:list'])
+        record_cache_access('players', variant, hit=not computed)
+        return response
 
     def post(self, request: Any, *args: Any, **kwargs: Any) -> Response:
         serializer = PlayerSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            cache.delete('players')
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def get_cache_params(self, request: Any) -> Dict[str, str]:
+        """Normalized filter, search and ordering parameters of a request."""
+        params = {
+            field: request.query_params.get(field, '').strip()
+            for field in self.filterset_fields
+        }
+        # SearchFilter matches case-insensitively, so the terms can be folded.
+        params['search'] = ' '.join(SearchFilter().get_search_terms(request)).lower()
+        ordering = OrderingFilter().get_ordering(request, Player.objects.none(), self)
+        params['ordering'] = ','.join(ordering or [])
+        return params
+
     def filter_queryset(self, queryset):
         filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
         for backend in list(filter_backends):
@@ -59,28 +113,177 @@ class PlayerDetailAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
     def get(self, request: Any, pk: int, *args: Any, **kwargs: Any) -> Response:
-        cache_key = f"player_{pk}"
-        player = cache.get(cache_key)
-        if player is None:
-            player = get_object_or_404(Player, pk=pk)
-            serializer = PlayerSerializer(player)
-            player = serializer.data
-            cache.set(cache_key, player, 60 * 5)
-        return Response(player)
+        try:
+            params = PlayerSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute() -> Dict[str, Any]:
+            reader = PlayerSerializer.values_reader(**params)
+            queryset = reader.queryset(Player.objects.all())
+            return reader.build(get_object_or_404(queryset, pk=pk))
+
+        return cached_response(
+            request,
+            PlayerSerializer.get_cache_key(f"player_{pk}", params),
+            compute,
+            tags=[f"player:{pk}"],
+        )
 
     def put(self, request: Any, pk: int, *args: Any, **kwargs: Any) -> Response:
         player = get_object_or_404(Player, pk=pk)
         serializer = PlayerSerializer(player, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            cache.delete(f"player_{pk}")
-            cache.delete("players")
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request: Any, pk: int, *args: Any, **kwargs: Any) -> Response:
         player = get_object_or_404(Player, pk=pk)
         player.delete()
-        cache.delete(f"player_{pk}")
-        cache.delete("players")
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class HistoryPagination(KeysetPagination):
+    """Newest games first; ``match`` is unique within one player's games."""
+
+    ordering = '-match'
+
+
+def summarize_games(games) -> Dict[str, int]:
+    """Game count and results of a ``PlayerGame`` queryset, in one query."""
+    result = PlayerGame.Result
+    return games.aggregate(
+        games=Count('id'),
+        wins=Count('id', filter=Q(result=result.WIN)),
+        losses=Count('id', filter=Q(result=result.LOSS)),
+        byes=Count('id', filter=Q(result=result.BYE)),
+        pending=Count('id', filter=Q(result=result.PENDING)),
+    )
+
+
+class PlayerHistoryAPIView(APIView):
+    """A player's games, newest first, from the ``PlayerGame`` table.
+
+    ``?tournament=`` and ``?opponent=`` narrow the games to one tournament
+    or one opponent. The first page also carries a ``summary`` of wins,
+    losses, byes and pending games of the same selection.
+    """
+
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    pagination_class = HistoryPagination
+
+    def get(self, request: Any, pk: int, *args: Any, **kwargs: Any) -> Response:
+        try:
+            params = PlayerGameSerializer.get_field_params(request.query_params)
+            filters = {
+                name: int(request.query_params[name])
+                for name in ('tournament', 'opponent')
+                if name in request.query_params
+            }
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = self.pagination_class()
+        first_page = paginator.cursor_query_param not in request.query_params
+
+        def compute() -> Dict[str, Any]:
+            if not Player.objects.filter(pk=pk).exists():
+                raise NotFound('Player not found')
+            games = PlayerGame.objects.filter(player_id=pk, **filters)
+            reader = PlayerGameSerializer.values_reader(**params)
+            page = paginator.paginate_queryset(
+                reader.queryset(games, 'match'), request, view=self
+            )
+            data = paginator.get_paginated_response(reader.render(page)).data
+            if first_page:
+                data['summary'] = summarize_games(games)
+            return data
+
+        return cached_response(
+            request,
+            paginator.get_cache_key(
+                f'history_{pk}',
+                request,
+                {
+                    **{name: str(value) for name, value in filters.items()},
+                    **PlayerGameSerializer.get_cache_params(params),
+                },
+            ),
+            compute,
+            tags=[f'history:{pk}', *PlayerGameSerializer.expansion_tags(params)],
+        )
+
+
+class PlayerVersusAPIView(APIView):
+    """Head-to-head record of a player against another (one indexed row)."""
+
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    def get(self, request: Any, pk: int, other: int, *args: Any, **kwargs: Any):
+        if pk == other:
+            return Response(
+                {'error': 'A player has no record against themselves'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        def compute() -> Dict[str, Any]:
+            record = (
+                HeadToHead.objects.filter(player_id=pk, opponent_id=other)
+                .values('games', 'wins', 'losses', 'last_match')
+                .first()
+            )
+            if record is None:
+                if Player.objects.filter(pk__in=[pk, other]).count() < 2:
+                    raise NotFound('Player not found')
+                record = {'games': 0, 'wins': 0, 'losses': 0, 'last_match': None}
+            return {'player': pk, 'opponent': other, **record}
+
+        return cached_response(
+            request, f'vs_{pk}_{other}', compute, tags=[f'history:{pk}']
+        )
+
+
+class PlayerImportAPIView(APIView):
+    """Upsert players from a CSV or NDJSON body, read as it streams in.
+
+    The format comes from ``?file_format=`` or the ``Content-Type``.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        file_format = request.query_params.get(
+            'file_format', format_for(request.content_type)
+        )
+        if file_format not in FORMATS:
+            return Response(
+                {'error': f"file_format must be one of {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        stream = request.stream
+        lines = iter(stream.readline, b'') if stream is not None else iter(())
+        try:
+            result = import_players(parse_rows(lines, file_format))
+        except PlayerImportError as exc:
+            return Response({'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': result.created, 'updated': result.updated})
+
+
+class PlayerExportAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Any, *args: Any, **kwargs: Any) -> StreamingHttpResponse:
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in FORMATS:
+            return Response(
+                {'error': f"file_format must be one of {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(
+            export_players(file_format), content_type=CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="players.{file_format}"'
+        )
+        return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TournamentConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tournament"
+
+    def ready(self) -> None:
+        from . import jobs, signals  # noqa: F401
@@ -0,0 +1,157 @@
+"""Async GET of the tournament, match, score and leaderboard endpoints.
+
+Served by the ASGI application (see ``core/asgi.py``); responses, cache
+entries and ETags are the same as the DRF views'.
+"""
+
+from typing import Any, Dict, List
+
+from django.http import HttpResponse
+from rest_framework.request import Request
+from core.async_views import AsyncReadView
+from core.conditional import acached_response
+from core.streaming import wants_stream
+from .models import Match, Score, Tournament
+from .serializers import (
+    LeaderboardSerializer,
+    MatchSerializer,
+    ScoreSerializer,
+    TournamentSerializer,
+)
+from .standings import get_standings
+from .views import (
+    MatchDetailAPIView,
+    MatchListCreateAPIView,
+    ScoreDetailAPIView,
+    ScoreListCreateAPIView,
+    TournamentDetailAPIView,
+    TournamentLeaderboardAPIView,
+    TournamentListCreateAPIView,
+    get_requested_tiebreaks,
+)
+
+
+class AsyncListView(AsyncReadView):
+    """Cached cursor pages of ``model`` rendered with ``serializer_class``."""
+
+    model: Any = None
+    serializer_class: Any = None
+    cache_name = ""
+    cache_tag = ""
+
+    async def get(self, request: Any) -> HttpResponse:
+        request = Request(request)
+        if wants_stream(request):
+            return await self.delegate(request._request)
+        serializer_class = self.serializer_class
+        try:
+            params = serializer_class.get_field_params(request.query_params)
+        except ValueError as exc:
+            return self.error(str(exc))
+        reader = serializer_class.values_reader(**params)
+        return await self.cached_page(
+            request,
+            self.pagination_class().get_cache_key(
+                self.cache_name, request, serializer_class.get_cache_params(params)
+            ),
+            reader.queryset(self.model.objects.all()),
+            reader,
+            tags=[self.cache_tag, *serializer_class.expansion_tags(params)],
+        )
+
+
+class AsyncDetailView(AsyncReadView):
+    """Cached detail of one ``model`` row, read with ``aget``."""
+
+    model: Any = None
+    serializer_class: Any = None
+    cache_name = ""
+
+    async def get(self, request: Any, pk: int) -> HttpResponse:
+        serializer_class = self.serializer_class
+        try:
+            params = serializer_class.get_field_params(request.GET)
+        except ValueError as exc:
+            return self.error(str(exc))
+
+        async def compute() -> Dict[str, Any]:
+            reader = serializer_class.values_reader(**params)
+            return reader.build(
+                await reader.queryset(self.model.objects.all()).aget(pk=pk)
+            )
+
+        return await acached_response(
+            request,
+            serializer_class.get_cache_key(f"{self.cache_name}_{pk}", params),
+            compute,
+            tags=[
+                f"{self.cache_name}:{pk}",
+                *serializer_class.expansion_tags(params),
+            ],
+        )
+
+
+class TournamentListView(AsyncListView):
+    sync_view = TournamentListCreateAPIView
+    model = Tournament
+    serializer_class = TournamentSerializer
+    cache_name = "tournaments"
+    cache_tag = "tournaments:list"
+
+
+class TournamentDetailView(AsyncDetailView):
+    sync_view = TournamentDetailAPIView
+    model = Tournament
+    serializer_class = TournamentSerializer
+    cache_name = "tournament"
+
+
+class MatchListView(AsyncListView):
+    sync_view = MatchListCreateAPIView
+    model = Match
+    serializer_class = MatchSerializer
+    cache_name = "matches"
+    cache_tag = "matches:list"
+
+
+class MatchDetailView(AsyncDetailView):
+    sync_view = MatchDetailAPIView
+    model = Match
+    serializer_class = MatchSerializer
+    cache_name = "match"
+
+
+class ScoreListView(AsyncListView):
+    sync_view = ScoreListCreateAPIView
+    model = Score
+    serializer_class = ScoreSerializer
+    cache_name = "scores"
+    cache_tag = "scores:list"
+
+
+class ScoreDetailView(AsyncDetailView):
+    sync_view = ScoreDetailAPIView
+    model = Score
+    serializer_class = ScoreSerializer
+    cache_name = "score"
+
+
+class TournamentLeaderboardView(AsyncReadView):
+    sync_view = TournamentLeaderboardAPIView
+
+    async def get(self, request: Any, pk: int) -> HttpResponse:
+        try:
+            tiebreaks = get_requested_tiebreaks(request.GET)
+        except ValueError as exc:
+            return self.error(str(exc))
+
+        async def compute() -> List[Dict[str, Any]]:
+            standings = [score async for score in get_standings(pk, tiebreaks)]
+            return LeaderboardSerializer(standings, many=True).data
+
+        return await acached_response(
+            request,
+            f"leaderboard_{pk}:{','.join(tiebreaks)}",
+            compute,
+            tags=[f"standings:{pk}", "players:list"],
+        )
@@ -0,0 +1,169 @@
+"""Live tournament events (pairings, results, standings deltas).
+
+Writers publish events through the configured backend once their
+transaction commits. Each process runs one ``Broadcaster`` that receives
+them (over Redis pub/sub in production) and fans them out to the in-memory
+queues of its open streams, so an event costs one Redis message per
+process however many spectators are connected, and no database queries.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "tournament-events"
+QUEUE_SIZE = 256
+HEARTBEAT_INTERVAL = 15
+
+Event = Dict[str, Any]
+
+
+def tournament_channel(tournament_id: int) -> str:
+    return f"{CHANNEL_PREFIX}:{tournament_id}"
+
+
+class LocalBackend:
+    """Delivers events within the current process; for tests and development."""
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Callable[[str, Event], None]] = None
+
+    def publish(self, channel: str, event: Event) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, event)
+
+    async def listen(self, deliver: Callable[[str, Event], None]) -> None:
+        self._deliver = deliver
+
+
+class RedisBackend:
+    """Publishes over Redis pub/sub; every process subscribes once."""
+
+    def __init__(self, url: Optional[str] = None) -> None:
+        self.url = url or getattr(
+            settings, "TOURNAMENT_EVENTS_REDIS_URL", "redis://127.0.0.1:6379/2"
+        )
+        self._client = None
+
+    def publish(self, channel: str, event: Event) -> None:
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, json.dumps(event))
+
+    async def listen(self, deliver: Callable[[str, Event], None]) -> None:
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+        async for message in pubsub.listen():
+            if message["type"] != "pmessage":
+                continue
+            deliver(message["channel"].decode(), json.loads(message["data"]))
+
+
+class Broadcaster:
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def publish(self, channel: str, event: Event) -> None:
+        self.backend.publish(channel, event)
+
+    def deliver(self, channel: str, event: Event) -> None:
+        """Hand an event to every local subscriber of ``channel``.
+
+        Safe to call from any thread; queues are filled on the event loop
+        that owns them.
+        """
+        if self._loop is None or not self.subscribers.get(channel):
+            return
+        self._loop.call_soon_threadsafe(self._fan_out, channel, event)
+
+    def _fan_out(self, channel: str, event: Event) -> None:
+        for queue in list(self.subscribers.get(channel, ())):
+            if queue.full():
+                # Slow client: drop its oldest event rather than block others.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _listen(self) -> None:
+        try:
+            await self.backend.listen(self.deliver)
+        except Exception:
+            # The next subscriber restarts the listener.
+            logger.exception("Tournament event listener stopped")
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        self._loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done():
+            self._listener = self._loop.create_task(self._listen())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[channel].discard(queue)
+            if not self.subscribers[channel]:
+                del self.subscribers[channel]
+
+
+_broadcaster: Optional[Broadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> Broadcaster:
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            backend = getattr(
+                settings, "TOURNAMENT_EVENTS_BACKEND", "tournament.events.LocalBackend"
+            )
+            _broadcaster = Broadcaster(import_string(backend)())
+        return _broadcaster
+
+
+def publish_event(tournament_id: int, event: Event) -> None:
+    """Publish ``event`` to the tournament's stream after the commit."""
+
+    def publish() -> None:
+        try:
+            get_broadcaster().publish(tournament_channel(tournament_id), event)
+        except Exception:
+            logger.exception("Could not publish tournament event")
+
+    transaction.on_commit(publish)
+
+
+def format_sse(event: Event) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(
+    tournament_id: int, heartbeat: float = HEARTBEAT_INTERVAL
+) -> AsyncIterator[str]:
+    """Server-Sent Events body for one spectator of a tournament."""
+    channel = tournament_channel(tournament_id)
+    async with get_broadcaster().subscribe(channel) as queue:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
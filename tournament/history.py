@@ -0,0 +1,338 @@
+"""Player game history and head-to-head records, derived from ``Match``.
+
+A match is stored once with its players in two columns, so "every game of
+a player" is an ``OR`` over ``player1`` and ``player2`` that no index
+serves. ``PlayerGame`` holds one row per player per game and
+``HeadToHead`` one row per ordered pair of opponents, both indexed by
+player, so profile reads are index range scans.
+
+``record_matches`` rewrites the rows of the given matches and recounts the
+records of their pairings inside the writing transaction; the model signals
+call it for single saves and pairing generation calls it directly.
+``record_results`` is the constant-statement form for bulk result entry, and
+``rebuild_history`` recomputes everything from ``Match``
+(``manage.py rebuild_player_history``).
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    Max,
+    OuterRef,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+
+from core.bulk import DEFAULT_BATCH_SIZE, bulk_insert, bulk_update_rows
+from core.cache import invalidate_tags_on_commit
+from .models import HeadToHead, Match, PlayerGame
+
+GAME_COLUMNS = [
+    "player_id",
+    "match_id",
+    "tournament_id",
+    "round_number",
+    "opponent_id",
+    "colour",
+    "result",
+]
+RECORD_FIELDS = ["games", "wins", "losses", "last_match"]
+
+Pair = Tuple[int, int]
+
+
+def history_tags(player_ids: Iterable[int]) -> List[str]:
+    return [f"history:{player_id}" for player_id in player_ids]
+
+
+def _result(player_id: int, winner_id: Optional[int]) -> str:
+    if winner_id is None:
+        return PlayerGame.Result.PENDING
+    if winner_id == player_id:
+        return PlayerGame.Result.WIN
+    return PlayerGame.Result.LOSS
+
+
+def game_rows(
+    match_id: int,
+    tournament_id: int,
+    round_number: int,
+    white_id: int,
+    black_id: Optional[int],
+    winner_id: Optional[int],
+) -> Iterator[tuple]:
+    """``GAME_COLUMNS`` values of both sides of a match (one for a bye)."""
+    if black_id is None:
+        yield (
+            white_id,
+            match_id,
+            tournament_id,
+            round_number,
+            None,
+            PlayerGame.Colour.WHITE,
+            PlayerGame.Result.BYE,
+        )
+        return
+    for player_id, opponent_id, colour in (
+        (white_id, black_id, PlayerGame.Colour.WHITE),
+        (black_id, white_id, PlayerGame.Colour.BLACK),
+    ):
+        yield (
+            player_id,
+            match_id,
+            tournament_id,
+            round_number,
+            opponent_id,
+            colour,
+            _result(player_id, winner_id),
+        )
+
+
+def _aggregate(games: QuerySet) -> QuerySet:
+    """Head-to-head counts of ``games`` per ``(player, opponent)``."""
+    return (
+        games.filter(opponent__isnull=False)
+        .order_by()
+        .values("player_id", "opponent_id")
+        .annotate(
+            games=Count("id"),
+            wins=Count("id", filter=Q(result=PlayerGame.Result.WIN)),
+            losses=Count("id", filter=Q(result=PlayerGame.Result.LOSS)),
+            last=Max("match_id"),
+        )
+    )
+
+
+def recount_head_to_head(pairs: Iterable[Pair]) -> None:
+    """Recount the records of ``(player, opponent)`` pairs, both ways round.
+
+    One aggregate query, one upsert, and a delete for pairs with no games
+    left.
+    """
+    pairs = {
+        pair
+        for player_id, opponent_id in pairs
+        if opponent_id is not None
+        for pair in ((player_id, opponent_id), (opponent_id, player_id))
+    }
+    if not pairs:
+        return
+    rows = _aggregate(
+        PlayerGame.objects.filter(
+            player_id__in={player_id for player_id, _ in pairs},
+            opponent_id__in={opponent_id for _, opponent_id in pairs},
+        )
+    )
+    records = [
+        HeadToHead(
+            player_id=row["player_id"],
+            opponent_id=row["opponent_id"],
+            games=row["games"],
+            wins=row["wins"],
+            losses=row["losses"],
+            last_match_id=row["last"],
+        )
+        for row in rows
+        if (row["player_id"], row["opponent_id"]) in pairs
+    ]
+    HeadToHead.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=["player", "opponent"],
+        update_fields=RECORD_FIELDS,
+    )
+    gone = pairs - {(record.player_id, record.opponent_id) for record in records}
+    if gone:
+        candidates = HeadToHead.objects.filter(
+            player_id__in={player_id for player_id, _ in gone},
+            opponent_id__in={opponent_id for _, opponent_id in gone},
+        ).values_list("id", "player_id", "opponent_id")
+        HeadToHead.objects.filter(
+            pk__in=[pk for pk, *pair in candidates if tuple(pair) in gone]
+        ).delete()
+
+
+def record_matches(matches: Iterable[Match]) -> None:
+    """Rewrite the history rows of ``matches`` and recount their pairings.
+
+    Must run in the transaction that writes the matches. Pairings the
+    matches had before (if their players changed) are recounted too.
+    """
+    matches = [match for match in matches if match.pk is not None]
+    if not matches:
+        return
+    match_ids = [match.pk for match in matches]
+    old = PlayerGame.objects.filter(match_id__in=match_ids)
+    pairs: Set[Pair] = set(old.values_list("player_id", "opponent_id"))
+    old.delete()
+    games = [
+        PlayerGame(**dict(zip(GAME_COLUMNS, row)))
+        for match in matches
+        for row in game_rows(
+            match.pk,
+            match.tournament_id,
+            match.round_number,
+            match.player1_id,
+            match.player2_id,
+            match.winner_id,
+        )
+    ]
+    PlayerGame.objects.bulk_create(games)
+    pairs.update((game.player_id, game.opponent_id) for game in games)
+    recount_head_to_head(pairs)
+    invalidate_tags_on_commit(*history_tags({player_id for player_id, _ in pairs}))
+
+
+def record_results(changes: Iterable[Tuple[Match, Optional[int]]]) -> None:
+    """Apply new winners of ``(match, old_winner_id)`` to the history rows.
+
+    The fast path for result entry, where the pairings stay the same: one
+    ``UPDATE`` of the games, reading the winners from ``Match``, and one
+    ``VALUES`` join per ``DEFAULT_BATCH_SIZE`` changed records, whatever the
+    number of boards. Must run after the matches are written.
+    """
+    changes = [(match, old) for match, old in changes if match.player2_id is not None]
+    if not changes:
+        return
+    result = PlayerGame.Result
+    played = Match.objects.filter(pk=OuterRef("match_id"))
+    PlayerGame.objects.filter(match_id__in=[match.pk for match, _ in changes]).update(
+        result=Case(
+            When(
+                Exists(played.filter(winner__isnull=True)), then=Value(result.PENDING)
+            ),
+            When(
+                Exists(played.filter(winner_id=OuterRef("player_id"))),
+                then=Value(result.WIN),
+            ),
+            default=Value(result.LOSS),
+        )
+    )
+
+    # Net change of (wins, losses) per (player, opponent).
+    deltas: Dict[Pair, Tuple[int, int]] = {}
+    for match, old_winner_id in changes:
+        for player_id, opponent_id in (
+            (match.player1_id, match.player2_id),
+            (match.player2_id, match.player1_id),
+        ):
+            wins, losses = deltas.get((player_id, opponent_id), (0, 0))
+            wins += (match.winner_id == player_id) - (old_winner_id == player_id)
+            losses += (match.winner_id == opponent_id) - (old_winner_id == opponent_id)
+            deltas[(player_id, opponent_id)] = (wins, losses)
+    deltas = {pair: delta for pair, delta in deltas.items() if any(delta)}
+    bulk_update_rows(
+        HeadToHead,
+        ["player_id", "opponent_id", "wins", "losses"],
+        (pair + delta for pair, delta in deltas.items()),
+        keys=2,
+        add=True,
+    )
+    invalidate_tags_on_commit(*history_tags({player_id for player_id, _ in deltas}))
+
+
+def forget_match(match: Match) -> None:
+    """Recount the pairing of a deleted match (its games go with it)."""
+    forget_games(
+        [(match.player1_id, match.player2_id)],
+        [player_id for player_id in (match.player1_id, match.player2_id) if player_id],
+    )
+
+
+def pairings_of(games: QuerySet) -> Tuple[Set[Pair], Set[int]]:
+    """The pairings and players of ``games``, in one query.
+
+    Read before a cascade deletes the games, for ``forget_games`` after it.
+    """
+    pairs = set(games.values_list("player_id", "opponent_id"))
+    return pairs, {player_id for player_id, _ in pairs}
+
+
+def forget_games(pairs: Iterable[Pair], player_ids: Iterable[int]) -> None:
+    """Recount ``pairs`` and drop the history of ``player_ids`` after their
+    games were deleted, in a constant number of statements."""
+    recount_head_to_head(pairs)
+    invalidate_tags_on_commit(*history_tags(player_ids))
+
+
+def _chunks(ids: List[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+@transaction.atomic
+def rebuild_history(
+    tournament_ids: Optional[Iterable[int]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """Recreate the history of the tournaments (default: all) from ``Match``.
+
+    Games are streamed into the table with ``core.bulk.bulk_insert`` and
+    the records of every player involved are recounted from them. Returns
+    the number of games and of head-to-head records written.
+    """
+    matches = Match.objects.all()
+    games = PlayerGame.objects.all()
+    if tournament_ids is not None:
+        tournament_ids = list(tournament_ids)
+        matches = matches.filter(tournament_id__in=tournament_ids)
+        games = games.filter(tournament_id__in=tournament_ids)
+    players = set(games.values_list("player_id", flat=True).distinct())
+    # A plain DELETE: ``delete()`` would load every row first.
+    games._raw_delete(games.db)
+    game_count = bulk_insert(
+        PlayerGame,
+        GAME_COLUMNS,
+        (
+            row
+            for match in matches.values_list(
+                "id",
+                "tournament_id",
+                "round_number",
+                "player1_id",
+                "player2_id",
+                "winner_id",
+            ).iterator()
+            for row in game_rows(*match)
+        ),
+        batch_size,
+    )
+    players.update(games.values_list("player_id", flat=True).distinct())
+
+    records = HeadToHead.objects.all()
+    if tournament_ids is None:
+        records._raw_delete(records.db)
+        chunks: Iterable[Optional[List[int]]] = [None]
+    else:
+        chunks = _chunks(sorted(players), 1000)
+    record_count = 0
+    for chunk in chunks:
+        scope = PlayerGame.objects.all()
+        if chunk is not None:
+            scope = scope.filter(player_id__in=chunk)
+            stale = records.filter(player_id__in=chunk)
+            stale._raw_delete(stale.db)
+        record_count += bulk_insert(
+            HeadToHead,
+            ["player_id", "opponent_id", "games", "wins", "losses", "last_match_id"],
+            (
+                (
+                    row["player_id"],
+                    row["opponent_id"],
+                    row["games"],
+                    row["wins"],
+                    row["losses"],
+                    row["last"],
+                )
+                for row in _aggregate(scope).iterator()
+            ),
+            batch_size,
+        )
+    invalidate_tags_on_commit(*history_tags(players))
+    return game_count, record_count
@@ -0,0 +1,125 @@
+"""Background jobs of tournaments, run by ``manage.py run_jobs``."""
+
+from typing import Any, Dict
+
+from django.dispatch import receiver
+
+from jobs.models import Job
+from jobs.queue import JobError, enqueue, job_finished, register
+
+from .events import publish_event
+from .models import Match, Tournament
+from .pairing import PairingError
+from .ratings import apply_round_ratings, recompute_all_ratings
+from .standings import rebuild_standings
+from .utils import generate_swiss_pairings
+
+GENERATE_PAIRINGS = "tournament.generate_pairings"
+REBUILD_STANDINGS = "tournament.rebuild_standings"
+RATE_ROUND = "tournament.rate_round"
+RECOMPUTE_RATINGS = "tournament.recompute_ratings"
+
+
+def enqueue_pairings(tournament_id: int, round_number: int):
+    """Queue pairing generation, once per ``(tournament, round)`` at a time."""
+    return enqueue(
+        GENERATE_PAIRINGS,
+        {"tournament_id": tournament_id, "round_number": round_number},
+        dedup_key=f"pairings:{tournament_id}:{round_number}",
+    )
+
+
+def enqueue_standings_rebuild(tournament_id: int):
+    return enqueue(
+        REBUILD_STANDINGS,
+        {"tournament_id": tournament_id},
+        dedup_key=f"standings:{tournament_id}",
+    )
+
+
+def enqueue_round_ratings(tournament_id: int, round_number: int):
+    return enqueue(
+        RATE_ROUND,
+        {"tournament_id": tournament_id, "round_number": round_number},
+        dedup_key=f"ratings:{tournament_id}:{round_number}",
+    )
+
+
+def enqueue_ratings_recompute():
+    return enqueue(RECOMPUTE_RATINGS, dedup_key="ratings:recompute")
+
+
+def schedule_ratings(
+    tournament_id: int, round_number: int, corrected: bool, complete: bool
+) -> None:
+    """Queue the rating update that new results in a round call for.
+
+    A changed result of an already rated match makes every rating computed
+    since then wrong, so ``corrected`` replays the whole history. Otherwise
+    the round is rated once it is ``complete`` (no board awaits a result).
+    """
+    if corrected:
+        enqueue_ratings_recompute()
+    elif complete:
+        enqueue_round_ratings(tournament_id, round_number)
+
+
+def round_complete(tournament_id: int, round_number: int) -> bool:
+    return not Match.objects.filter(
+        tournament_id=tournament_id,
+        round_number=round_number,
+        player2__isnull=False,
+        winner__isnull=True,
+    ).exists()
+
+
+@register(GENERATE_PAIRINGS)
+def generate_pairings(tournament_id: int, round_number: int) -> Dict[str, Any]:
+    try:
+        matches = generate_swiss_pairings(tournament_id, round_number)
+    except Tournament.DoesNotExist:
+        raise JobError("Tournament not found")
+    except PairingError as exc:
+        raise JobError(str(exc))
+    return {"round": round_number, "matches": [match.pk for match in matches]}
+
+
+@register(REBUILD_STANDINGS)
+def rebuild_tournament_standings(tournament_id: int) -> Dict[str, Any]:
+    try:
+        rows = rebuild_standings(tournament_id)
+    except Tournament.DoesNotExist:
+        raise JobError("Tournament not found")
+    return {"rows": rows}
+
+
+@register(RATE_ROUND)
+def rate_round(tournament_id: int, round_number: int) -> Dict[str, Any]:
+    return {"games": apply_round_ratings(tournament_id, round_number)}
+
+
+@register(RECOMPUTE_RATINGS)
+def recompute_ratings() -> Dict[str, Any]:
+    return {"games": recompute_all_ratings()}
+
+
+@receiver(job_finished)
+def announce_job(sender: Any, job: Job, **kwargs: Any) -> None:
+    """Tell the tournament's event stream subscribers that a job is done."""
+    tournament_id = job.payload.get("tournament_id")
+    if (
+        job.kind not in (GENERATE_PAIRINGS, REBUILD_STANDINGS, RATE_ROUND)
+        or not tournament_id
+    ):
+        return
+    publish_event(
+        tournament_id,
+        {
+            "type": "job",
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "result": job.result,
+            "error": job.error,
+        },
+    )
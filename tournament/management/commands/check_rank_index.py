@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tournament import rank_index
+from tournament.models import Tournament
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the Redis rank index of tournaments with their standings; "
+        "fails if they disagree unless --repair rebuilds them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tournament_ids",
+            nargs="*",
+            type=int,
+            help="Tournaments to check (default: all).",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild the index of tournaments that disagree.",
+        )
+
+    def handle(self, *args, **options):
+        tournament_ids = options["tournament_ids"] or list(
+            Tournament.objects.values_list("id", flat=True)
+        )
+        inconsistent = []
+        for tournament_id in tournament_ids:
+            report = rank_index.check(tournament_id)
+            if report is None:
+                self.stdout.write(f"Tournament {tournament_id}: not built")
+                continue
+            if not any(report.values()):
+                continue
+            inconsistent.append(tournament_id)
+            self.stdout.write(
+                f"Tournament {tournament_id}: "
+                + ", ".join(
+                    f"{len(ids)} {problem} ({', '.join(map(str, ids[:10]))})"
+                    for problem, ids in report.items()
+                    if ids
+                )
+            )
+            if options["repair"]:
+                rank_index.build(tournament_id)
+                self.stdout.write(f"Tournament {tournament_id}: rebuilt")
+        if inconsistent and not options["repair"]:
+            raise CommandError(
+                f"{len(inconsistent)} of {len(tournament_ids)} rank indexes "
+                "disagree with the standings; run with --repair to rebuild them."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {len(tournament_ids)} tournaments, "
+                f"{len(inconsistent)} repaired."
+                if options["repair"]
+                else f"Checked {len(tournament_ids)} tournaments, all consistent."
+            )
+        )
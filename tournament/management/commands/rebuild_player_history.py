@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from tournament.history import rebuild_history
+
+
+class Command(BaseCommand):
+    help = "Rebuild player game history and head-to-head records from the matches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tournament_ids",
+            nargs="*",
+            type=int,
+            help="Tournaments to rebuild (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        games, records = rebuild_history(options["tournament_ids"] or None)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Player history rebuilt: {games} games, "
+                f"{records} head-to-head records."
+            )
+        )
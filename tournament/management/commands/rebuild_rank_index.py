@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tournament import rank_index
+from tournament.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis rank index of tournaments from their standings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tournament_ids",
+            nargs="*",
+            type=int,
+            help="Tournaments to rebuild (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        tournament_ids = options["tournament_ids"] or list(
+            Tournament.objects.values_list("id", flat=True)
+        )
+        for tournament_id in tournament_ids:
+            players = rank_index.build(tournament_id)
+            self.stdout.write(f"Tournament {tournament_id}: {players} players ranked")
+        self.stdout.write(self.style.SUCCESS("Rank index rebuilt."))
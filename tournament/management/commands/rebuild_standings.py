@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tournament.models import Tournament
+from tournament.standings import rebuild_standings
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-tournament standings from the match history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tournament_ids",
+            nargs="*",
+            type=int,
+            help="Tournaments to rebuild (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        tournament_ids = options["tournament_ids"] or list(
+            Tournament.objects.values_list("id", flat=True)
+        )
+        for tournament_id in tournament_ids:
+            rows = rebuild_standings(tournament_id)
+            self.stdout.write(f"Tournament {tournament_id}: {rows} standings rows")
+        self.stdout.write(self.style.SUCCESS("Standings rebuilt."))
@@ -0,0 +1,201 @@
+import datetime
+import random
+import time
+from typing import Dict, List
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.bulk import DEFAULT_BATCH_SIZE, bulk_insert
+from core.cache import invalidate_tags
+from tournament.history import rebuild_history
+from tournament.models import HeadToHead, Match, PlayerGame, Score, Tournament
+from tournament.standings import POINTS_PER_WIN
+from tournament.tiebreaks import TIEBREAKS, build_opponent_index, compute_tiebreaks
+from user.models import Player
+
+COUNTRIES = ["USA", "NOR", "IND", "CHN", "RUS", "FRA", "GER", "NED", "ARM", "ESP"]
+FIRST_DATE = datetime.date(2020, 1, 1)
+
+
+class Command(BaseCommand):
+    help = "Insert deterministic synthetic players, tournaments and match histories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=10000)
+        parser.add_argument("--tournaments", type=int, default=100)
+        parser.add_argument(
+            "--participants", type=int, default=64, help="Players per tournament."
+        )
+        parser.add_argument("--rounds", type=int, default=7)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--prefix", help="Username and tournament name prefix (default: seed<N>)."
+        )
+        parser.add_argument("--password", default="password")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.prefix = options["prefix"] or f"seed{options['seed']}"
+        if User.objects.filter(username__startswith=f"{self.prefix}-").exists():
+            raise CommandError(
+                f"Rows with the prefix {self.prefix!r} exist; pick another --prefix."
+            )
+
+        started = time.perf_counter()
+        self.counts: Dict[str, int] = {}
+        with transaction.atomic():
+            players = self.seed_players(options["players"], options["password"])
+            self.seed_tournaments(
+                players,
+                options["tournaments"],
+                min(options["participants"], len(players)),
+                options["rounds"],
+            )
+            games, records = rebuild_history(
+                Tournament.objects.filter(
+                    name__startswith=f"{self.prefix} Open "
+                ).values_list("id", flat=True),
+                self.batch_size,
+            )
+            self.counts[PlayerGame._meta.label] = games
+            self.counts[HeadToHead._meta.label] = records
+        invalidate_tags(
+            "players:list", "tournaments:list", "matches:list", "scores:list"
+        )
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        for table, count in self.counts.items():
+            self.stdout.write(f"{table:>36}: {count} rows")
+        rate = total / elapsed
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {total} rows in {elapsed:.1f} s ({rate:,.0f} rows/s)."
+            )
+        )
+
+    def insert(self, model, attnames, rows) -> None:
+        count = bulk_insert(model, attnames, rows, self.batch_size)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + count
+
+    def seed_players(self, count: int, password: str) -> List[Dict[str, int]]:
+        # Hashing is deliberately slow, so every account shares one hash.
+        password_hash = make_password(password)
+        self.insert(
+            User,
+            ["username", "password"],
+            ((f"{self.prefix}-{i}", password_hash) for i in range(count)),
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith=f"{self.prefix}-")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        rng = self.rng
+        self.insert(
+            Player,
+            ["user_id", "name", "age", "rating", "country"],
+            (
+                (
+                    user_id,
+                    f"Player {i}",
+                    rng.randint(8, 80),
+                    max(100, min(2850, round(rng.gauss(1600, 350)))),
+                    rng.choice(COUNTRIES),
+                )
+                for i, user_id in enumerate(user_ids)
+            ),
+        )
+        return [
+            {"id": player_id, "rating": rating}
+            for player_id, rating in Player.objects.filter(
+                user__username__startswith=f"{self.prefix}-"
+            )
+            .order_by("id")
+            .values_list("id", "rating")
+        ]
+
+    def seed_tournaments(self, players, count: int, size: int, rounds: int) -> None:
+        name = f"{self.prefix} Open"
+        self.insert(
+            Tournament,
+            ["name", "start_date", "end_date", "participant_count"],
+            (
+                (
+                    f"{name} {i}",
+                    FIRST_DATE + datetime.timedelta(days=i * 3),
+                    FIRST_DATE + datetime.timedelta(days=i * 3 + rounds),
+                    size,
+                )
+                for i in range(count)
+            ),
+        )
+        tournament_ids = list(
+            Tournament.objects.filter(name__startswith=f"{name} ")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        entries, matches, scores = [], [], []
+        for tournament_id in tournament_ids:
+            field = self.rng.sample(players, size)
+            entries.extend((tournament_id, player["id"]) for player in field)
+            rows = self.play(field, rounds)
+            matches.extend((tournament_id, *row) for row in rows)
+            index = build_opponent_index(rows)
+            tiebreaks = compute_tiebreaks(index, [player["id"] for player in field])
+            scores.extend(
+                (
+                    tournament_id,
+                    player_id,
+                    sum(game.points for game in index[player_id]) * POINTS_PER_WIN,
+                    *[values[name] for name in TIEBREAKS],
+                )
+                for player_id, values in tiebreaks.items()
+            )
+            if len(matches) >= self.batch_size:
+                self.flush(entries, matches, scores)
+        self.flush(entries, matches, scores)
+
+    def flush(self, entries, matches, scores) -> None:
+        # The participants through table is written directly, skipping the
+        # m2m signals; the standings rows come with the matches instead.
+        self.insert(
+            Tournament.participants.through, ["tournament_id", "player_id"], entries
+        )
+        self.insert(
+            Match,
+            ["tournament_id", "round_number", "player1_id", "player2_id", "winner_id"],
+            matches,
+        )
+        self.insert(Score, ["tournament_id", "player_id", "points", *TIEBREAKS], scores)
+        for rows in (entries, matches, scores):
+            rows.clear()
+
+    def play(self, field, rounds: int):
+        """Play Swiss-like rounds as ``(round, white, black, winner)`` rows.
+
+        Neighbours in the score order meet, the odd player out gets a bye and
+        the Elo expectation decides each game.
+        """
+        rng = self.rng
+        score = {player["id"]: 0 for player in field}
+        rows = []
+        for round_number in range(1, rounds + 1):
+            order = sorted(field, key=lambda p: (-score[p["id"]], rng.random()))
+            if len(order) % 2:
+                bye = order.pop()
+                rows.append((round_number, bye["id"], None, bye["id"]))
+                score[bye["id"]] += 1
+            for white, black in zip(order[::2], order[1::2]):
+                expected = 1 / (1 + 10 ** ((black["rating"] - white["rating"]) / 400))
+                winner = white if rng.random() < expected else black
+                rows.append((round_number, white["id"], black["id"], winner["id"]))
+                score[winner["id"]] += 1
+        return rows
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tournament.models import Match
+from tournament.ratings import (
+    INITIAL_RATING,
+    apply_round_ratings,
+    recompute_all_ratings,
+)
+
+
+class Command(BaseCommand):
+    help = "Apply rated results to player ratings, or replay the full history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tournament", type=int, help="Tournament to rate.")
+        parser.add_argument(
+            "--round", type=int, help="Round to rate (default: every unrated round)."
+        )
+        parser.add_argument(
+            "--recompute",
+            action="store_true",
+            help="Reset all ratings and replay every decisive game in order.",
+        )
+        parser.add_argument("--initial-rating", type=int, default=INITIAL_RATING)
+
+    def handle(self, *args, **options):
+        if options["recompute"]:
+            games = recompute_all_ratings(options["initial_rating"])
+            self.stdout.write(self.style.SUCCESS(f"Replayed {games} games."))
+            return
+
+        if options["round"] is not None and options["tournament"] is None:
+            raise CommandError("--round requires --tournament.")
+        periods = Match.objects.filter(
+            rated=False, player2__isnull=False, winner__isnull=False
+        )
+        if options["tournament"] is not None:
+            periods = periods.filter(tournament_id=options["tournament"])
+        if options["round"] is not None:
+            periods = periods.filter(round_number=options["round"])
+        periods = (
+            periods.order_by("tournament__start_date", "tournament_id", "round_number")
+            .values_list("tournament_id", "round_number")
+            .distinct()
+        )
+        for tournament_id, round_number in periods:
+            games = apply_round_ratings(tournament_id, round_number)
+            self.stdout.write(
+                f"Tournament {tournament_id}, round {round_number}: {games} games"
+            )
+        self.stdout.write(self.style.SUCCESS("Ratings updated."))
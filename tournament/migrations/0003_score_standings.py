@@ -0,0 +1,26 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0002_alter_tournament_name_alter_tournament_participants"),
+        ("user", "0003_alter_player_user_delete_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="score",
+            index=models.Index(
+                fields=["tournament", "-points"], name="score_tournament_points_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="score",
+            constraint=models.UniqueConstraint(
+                fields=("tournament", "player"), name="unique_tournament_player_score"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0003_score_standings"),
+        ("user", "0003_alter_player_user_delete_user"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="match",
+            name="player2",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="player2",
+                to="user.player",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0004_match_player2_bye"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="rated",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0005_match_rated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="score",
+            name="buchholz",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="score",
+            name="median_buchholz",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="score",
+            name="progressive",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="score",
+            name="sonneborn_berger",
+            field=models.IntegerField(default=0),
+        ),
+    ]
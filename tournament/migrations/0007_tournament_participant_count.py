@@ -0,0 +1,33 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_participant_counts(apps, schema_editor):
+    Tournament = apps.get_model("tournament", "Tournament")
+    counts = (
+        Tournament.participants.through.objects.filter(tournament_id=OuterRef("pk"))
+        .order_by()
+        .values("tournament_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Tournament.objects.update(participant_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0006_score_tiebreaks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="participant_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_participant_counts, migrations.RunPython.noop),
+    ]
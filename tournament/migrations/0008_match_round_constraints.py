@@ -0,0 +1,99 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:37
+
+from django.db import migrations, models
+from django.db.models.functions import RowNumber
+
+
+def remove_duplicate_boards(apps, schema_editor):
+    """Delete the matches that the new constraints would reject.
+
+    Concurrent pairing requests could create a round twice. Within a round
+    the boards of a player, as white or as black, are ranked decided first
+    and then by id, and all but the first are deleted. Byes share the empty
+    black seat, so the same ranking keeps one bye per round. Matches of a
+    player against themselves are deleted too.
+
+    Only undecided matches may go, which leaves the standings as they are:
+    the migration stops if a duplicate has a result, so that an admin can
+    decide which result stands.
+    """
+    Match = apps.get_model("tournament", "Match")
+    matches = Match.objects.using(schema_editor.connection.alias)
+    ranking = [
+        models.Case(
+            models.When(winner__isnull=True, then=models.Value(1)),
+            default=models.Value(0),
+        ),
+        "id",
+    ]
+    seats = matches.exclude(player1=models.F("player2")).annotate(
+        **{
+            f"{seat}_board": models.Window(
+                RowNumber(),
+                partition_by=["tournament", "round_number", seat],
+                order_by=ranking,
+            )
+            for seat in ("player1", "player2")
+        }
+    )
+    duplicates = matches.filter(
+        models.Q(
+            id__in=seats.filter(
+                models.Q(player1_board__gt=1) | models.Q(player2_board__gt=1)
+            ).values("id")
+        )
+        | models.Q(player1=models.F("player2"))
+    )
+    decided = list(
+        duplicates.filter(winner__isnull=False)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if decided:
+        raise RuntimeError(
+            "Duplicate matches have results: "
+            f"{', '.join(map(str, decided))}. Delete the wrong ones and rebuild "
+            "the standings of their tournaments before migrating."
+        )
+    duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0007_tournament_participant_count"),
+        ("user", "0004_player_rated_games"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_boards, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.CheckConstraint(
+                check=models.Q(("player1", models.F("player2")), _negated=True),
+                name="match_distinct_players",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                fields=("tournament", "round_number", "player1"),
+                name="unique_round_player1",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                fields=("tournament", "round_number", "player2"),
+                name="unique_round_player2",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("player2__isnull", True)),
+                fields=("tournament", "round_number"),
+                name="unique_round_bye",
+            ),
+        ),
+    ]
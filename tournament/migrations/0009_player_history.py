@@ -0,0 +1,155 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournament", "0008_match_round_constraints"),
+        ("user", "0004_player_rated_games"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HeadToHead",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("games", models.PositiveIntegerField(default=0)),
+                ("wins", models.PositiveIntegerField(default=0)),
+                ("losses", models.PositiveIntegerField(default=0)),
+                (
+                    "last_match",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="tournament.match",
+                    ),
+                ),
+                (
+                    "opponent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="user.player",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="user.player",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PlayerGame",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round_number", models.IntegerField()),
+                (
+                    "colour",
+                    models.CharField(
+                        choices=[("white", "White"), ("black", "Black")], max_length=5
+                    ),
+                ),
+                (
+                    "result",
+                    models.CharField(
+                        choices=[
+                            ("win", "Win"),
+                            ("loss", "Loss"),
+                            ("bye", "Bye"),
+                            ("pending", "Pending"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="games",
+                        to="tournament.match",
+                    ),
+                ),
+                (
+                    "opponent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="user.player",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="games",
+                        to="user.player",
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="tournament.tournament",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="headtohead",
+            constraint=models.UniqueConstraint(
+                fields=("player", "opponent"), name="unique_head_to_head"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playergame",
+            index=models.Index(
+                fields=["player", "-match"], name="player_game_history_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playergame",
+            index=models.Index(
+                fields=["player", "opponent", "-match"], name="player_game_vs_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playergame",
+            index=models.Index(
+                fields=["player", "tournament", "-match"],
+                name="player_game_tournament_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="playergame",
+            constraint=models.UniqueConstraint(
+                fields=("match", "player"), name="unique_player_game"
+            ),
+        ),
+    ]
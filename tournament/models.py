@@ -9,6 +9,8 @@ class Tournament(models.Model):
     participants = models.ManyToManyField(
         Player, related_name="tournaments", blank=True
     )
+    # Denormalized size of ``participants`` (see ``refresh_participant_counts``).
+    participant_count = models.PositiveIntegerField(default=0)
 
     def __str__(self) -> str:
         return self.name
@@ -20,21 +22,141 @@ class Match(models.Model):
         Player, related_name="player1", on_delete=models.CASCADE
     )
     player2 = models.ForeignKey(
-        Player, related_name="player2", on_delete=models.CASCADE
+        Player, related_name="player2", on_delete=models.CASCADE, null=True, blank=True
     )
     winner = models.ForeignKey(
         Player, related_name="winner", on_delete=models.CASCADE, null=True, blank=True
     )
     round_number = models.IntegerField()
+    rated = models.BooleanField(default=False)
+
+    class Meta:
+        # A player sits at one board per round: these hold for concurrent
+        # writers too (``generate_swiss_pairings`` also locks the tournament).
+        constraints = [
+            models.CheckConstraint(
+                check=~models.Q(player1=models.F("player2")),
+                name="match_distinct_players",
+            ),
+            models.UniqueConstraint(
+                fields=["tournament", "round_number", "player1"],
+                name="unique_round_player1",
+            ),
+            models.UniqueConstraint(
+                fields=["tournament", "round_number", "player2"],
+                name="unique_round_player2",
+            ),
+            models.UniqueConstraint(
+                fields=["tournament", "round_number"],
+                condition=models.Q(player2__isnull=True),
+                name="unique_round_bye",
+            ),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.player1} vs {self.player2} - Round {self.round_number}"
+        opponent = self.player2 if self.player2_id else "bye"
+        return f"{self.player1} vs {opponent} - Round {self.round_number}"
 
 
 class Score(models.Model):
+    """Standings row of one player in one tournament.
+
+    Kept up to date incrementally by ``tournament.standings`` whenever a match
+    result is written, together with the tiebreaks of ``tournament.tiebreaks``,
+    so the leaderboard is a single ordered query.
+    """
+
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE)
     points = models.IntegerField(default=0)
+    buchholz = models.IntegerField(default=0)
+    median_buchholz = models.IntegerField(default=0)
+    sonneborn_berger = models.IntegerField(default=0)
+    progressive = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tournament", "player"], name="unique_tournament_player_score"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["tournament", "-points"], name="score_tournament_points_idx"
+            )
+        ]
 
     def __str__(self) -> str:
         return f"{self.player} - {self.points} points in {self.tournament}"
+
+
+class PlayerGame(models.Model):
+    """One player's side of a match, for player history reads.
+
+    Kept in step with ``Match`` by ``tournament.history`` so a player's
+    games are an indexed range of this table instead of an ``OR`` over both
+    player columns of ``Match``.
+    """
+
+    class Colour(models.TextChoices):
+        WHITE = "white"
+        BLACK = "black"
+
+    class Result(models.TextChoices):
+        WIN = "win"
+        LOSS = "loss"
+        BYE = "bye"
+        PENDING = "pending"
+
+    player = models.ForeignKey(Player, related_name="games", on_delete=models.CASCADE)
+    match = models.ForeignKey(Match, related_name="games", on_delete=models.CASCADE)
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE)
+    round_number = models.IntegerField()
+    opponent = models.ForeignKey(
+        Player, related_name="+", on_delete=models.CASCADE, null=True, blank=True
+    )
+    colour = models.CharField(max_length=5, choices=Colour.choices)
+    result = models.CharField(max_length=7, choices=Result.choices)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match", "player"], name="unique_player_game"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["player", "-match"], name="player_game_history_idx"),
+            models.Index(
+                fields=["player", "opponent", "-match"], name="player_game_vs_idx"
+            ),
+            models.Index(
+                fields=["player", "tournament", "-match"],
+                name="player_game_tournament_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.player} - {self.result} in {self.match}"
+
+
+class HeadToHead(models.Model):
+    """Record of ``player`` against ``opponent``; stored for both players."""
+
+    player = models.ForeignKey(Player, related_name="+", on_delete=models.CASCADE)
+    opponent = models.ForeignKey(Player, related_name="+", on_delete=models.CASCADE)
+    games = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    last_match = models.ForeignKey(
+        Match, related_name="+", on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["player", "opponent"], name="unique_head_to_head"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.player} vs {self.opponent}: +{self.wins} -{self.losses}"
@@ -0,0 +1,265 @@
+"""Round pairing strategies.
+
+The engine works on plain ``PairingPlayer`` records so it can be exercised
+without the database; ``tournament.utils`` loads them from the tournament's
+participants and match history. In every pair the first player gets white
+(``Match.player1``).
+"""
+
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+WHITE = 1
+BLACK = -1
+
+DEFAULT_PAIRING_STRATEGY = "tournament.pairing.SwissPairingStrategy"
+
+
+class PairingError(Exception):
+    """Raised when no pairing satisfies the strategy's hard constraints."""
+
+
+@dataclass
+class PairingPlayer:
+    id: int
+    rating: int
+    score: int = 0
+    opponents: Set[int] = field(default_factory=set)
+    colours: List[int] = field(default_factory=list)
+    had_bye: bool = False
+
+    @property
+    def colour_balance(self) -> int:
+        return sum(self.colours)
+
+    @property
+    def colour_preference(self) -> Tuple[int, bool]:
+        """Return ``(colour, absolute)``; colour is 0 when there is none."""
+        balance = self.colour_balance
+        if balance <= -2 or self.colours[-2:] == [BLACK, BLACK]:
+            return WHITE, True
+        if balance >= 2 or self.colours[-2:] == [WHITE, WHITE]:
+            return BLACK, True
+        if balance:
+            return -balance, False
+        if self.colours:
+            return -self.colours[-1], False
+        return 0, False
+
+
+@dataclass
+class PairingResult:
+    pairs: List[Tuple[int, int]]
+    bye: Optional[int] = None
+
+
+class PairingStrategy:
+    """Base class for pluggable pairing strategies."""
+
+    def pair(self, players: Sequence[PairingPlayer]) -> PairingResult:
+        raise NotImplementedError
+
+
+def get_pairing_strategy(path: Optional[str] = None) -> PairingStrategy:
+    path = path or getattr(settings, "PAIRING_STRATEGY", DEFAULT_PAIRING_STRATEGY)
+    return import_string(path)()
+
+
+def _rank_key(player: PairingPlayer) -> Tuple[int, int, int]:
+    return -player.score, -player.rating, player.id
+
+
+def _choose_bye(players: Sequence[PairingPlayer]) -> PairingPlayer:
+    # Lowest-ranked player who has not had a bye yet.
+    return min(players, key=lambda p: (p.had_bye, p.score, p.rating, -p.id))
+
+
+def _assign_colours(a: PairingPlayer, b: PairingPlayer) -> Tuple[int, int]:
+    colour_a, absolute_a = a.colour_preference
+    colour_b, absolute_b = b.colour_preference
+    if colour_a != colour_b:
+        if colour_a == WHITE or colour_b == BLACK:
+            return a.id, b.id
+        return b.id, a.id
+    # Same (or no) preference: the stronger claim wins it.
+    claim_a = (absolute_a, abs(a.colour_balance), -_rank_key(a)[0], a.rating)
+    claim_b = (absolute_b, abs(b.colour_balance), -_rank_key(b)[0], b.rating)
+    first, second = (a, b) if claim_a >= claim_b else (b, a)
+    if colour_a == BLACK:
+        return second.id, first.id
+    return first.id, second.id
+
+
+class RatingPairingStrategy(PairingStrategy):
+    """Pair neighbours by rating; the original behaviour, kept for reference."""
+
+    def pair(self, players: Sequence[PairingPlayer]) -> PairingResult:
+        ordered = sorted(players, key=lambda p: (-p.rating, p.id))
+        bye = ordered.pop().id if len(ordered) % 2 else None
+        pairs = [(ordered[i].id, ordered[i + 1].id) for i in range(0, len(ordered), 2)]
+        return PairingResult(pairs=pairs, bye=bye)
+
+
+class SwissPairingStrategy(PairingStrategy):
+    """Score-group Swiss pairing.
+
+    Players are split into score groups; each group (plus the players that
+    floated down from the group above) is split into a top and bottom half
+    which are paired with a maximum bipartite matching, preferring the
+    "mirror" opponent. Rematches and pairs with the same absolute colour
+    preference are never allowed; players left over float to the next
+    group. If the last group cannot be completed, groups are merged upwards
+    until it can.
+    """
+
+    def pair(self, players: Sequence[PairingPlayer]) -> PairingResult:
+        players = list(players)
+        bye = None
+        if len(players) % 2:
+            bye = _choose_bye(players)
+            players.remove(bye)
+
+        players.sort(key=_rank_key)
+        brackets: List[List[Tuple[PairingPlayer, PairingPlayer]]] = []
+        floaters: List[PairingPlayer] = []
+        for _, group in groupby(players, key=lambda p: p.score):
+            pairs, floaters = self._pair_pool(floaters + list(group))
+            brackets.append(pairs)
+
+        pending = floaters
+        while pending:
+            if not brackets:
+                raise PairingError("No pairing avoids rematches for this round.")
+            pool = pending + [player for pair in brackets.pop() for player in pair]
+            pool.sort(key=_rank_key)
+            pairs, leftover = self._pair_pool(pool)
+            if leftover:
+                pending = pool
+            else:
+                brackets.append(pairs)
+                pending = []
+
+        return PairingResult(
+            pairs=[_assign_colours(a, b) for pairs in brackets for a, b in pairs],
+            bye=bye.id if bye else None,
+        )
+
+    def _pair_pool(
+        self, pool: List[PairingPlayer]
+    ) -> Tuple[List[Tuple[PairingPlayer, PairingPlayer]], List[PairingPlayer]]:
+        pairs: List[Tuple[PairingPlayer, PairingPlayer]] = []
+        remaining = pool
+        while len(remaining) > 1:
+            half = len(remaining) // 2
+            top, bottom = remaining[:half], remaining[half:]
+            matched = _BracketMatching(top, bottom).solve()
+            if not matched:
+                break
+            pairs.extend((top[i], bottom[j]) for i, j in matched.items())
+            paired = {top[i].id for i in matched} | {
+                bottom[j].id for j in matched.values()
+            }
+            remaining = [p for p in remaining if p.id not in paired]
+        return pairs, remaining
+
+
+class _BracketMatching:
+    """Maximum bipartite matching of a bracket's top half onto its bottom half.
+
+    Two players are compatible unless they already met or share the same
+    absolute colour preference. A greedy pass gives each top player the
+    closest free compatible opponent to its mirror position, which settles
+    almost everyone; the rest are placed with augmenting paths (Kuhn).
+    Unvisited bottom players are bucketed by absolute colour so a search
+    never rescans opponents it can't be paired with, and the visited set is
+    kept across failed searches, since a failure leaves the matching
+    unchanged.
+    """
+
+    GREEDY_WINDOW = 32
+
+    def __init__(self, top: List[PairingPlayer], bottom: List[PairingPlayer]):
+        self.top = top
+        self.bottom = bottom
+        self.top_preference = [player.colour_preference for player in top]
+        self.bottom_colour = [
+            colour if absolute else 0
+            for colour, absolute in (player.colour_preference for player in bottom)
+        ]
+        self.top_match: Dict[int, int] = {}
+        self.bottom_match: Dict[int, int] = {}
+
+    def compatible(self, i: int, j: int) -> bool:
+        colour, absolute = self.top_preference[i]
+        if absolute and self.bottom_colour[j] == colour:
+            return False
+        return self.bottom[j].id not in self.top[i].opponents
+
+    def solve(self) -> Dict[int, int]:
+        size = len(self.bottom)
+        for i in range(len(self.top)):
+            mirror = min(i, size - 1)
+            for step in range(self.GREEDY_WINDOW):
+                for j in (mirror + step, mirror - step) if step else (mirror,):
+                    if 0 <= j < size and j not in self.bottom_match:
+                        if self.compatible(i, j):
+                            self.top_match[i] = j
+                            self.bottom_match[j] = i
+                            break
+                else:
+                    continue
+                break
+
+        self.unvisited: Dict[int, Set[int]] = {WHITE: set(), BLACK: set(), 0: set()}
+        self.visited: List[int] = []
+        for j, colour in enumerate(self.bottom_colour):
+            self.unvisited[colour].add(j)
+        for i in range(len(self.top)):
+            if i not in self.top_match:
+                self._augment(i)
+        return self.top_match
+
+    def _next_unvisited(self, i: int) -> Optional[int]:
+        colour, absolute = self.top_preference[i]
+        opponents = self.top[i].opponents
+        for bucket_colour, bucket in self.unvisited.items():
+            if absolute and bucket_colour == colour:
+                continue
+            for j in bucket:
+                if self.bottom[j].id not in opponents:
+                    bucket.remove(j)
+                    self.visited.append(j)
+                    return j
+        return None
+
+    def _augment(self, root: int) -> bool:
+        parent: Dict[int, int] = {}
+        stack = [root]
+        while stack:
+            j = self._next_unvisited(stack[-1])
+            if j is None:
+                stack.pop()
+                continue
+            parent[j] = stack[-1]
+            if j in self.bottom_match:
+                stack.append(self.bottom_match[j])
+                continue
+            # Flip the matching along the path back to the root; the new
+            # matching may open paths through every player visited so far.
+            while True:
+                i = parent[j]
+                previous = self.top_match.get(i)
+                self.top_match[i] = j
+                self.bottom_match[j] = i
+                if previous is None:
+                    break
+                j = previous
+            for j in self.visited:
+                self.unvisited[self.bottom_colour[j]].add(j)
+            self.visited = []
+            return True
+        return False
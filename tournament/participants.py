@@ -0,0 +1,76 @@
+"""Bulk enrollment of tournament participants.
+
+Adding and removing players writes the participants through table
+directly: one ``INSERT ... ON CONFLICT DO NOTHING`` (``bulk_create`` with
+``ignore_conflicts``) or one ``DELETE`` instead of the per-row diff of
+``participants.set()``. The matching standings rows and the denormalized
+``Tournament.participant_count`` are updated in the same transaction.
+"""
+
+from typing import Iterable, List
+
+from django.db import transaction
+
+from core.cache import invalidate_tags_on_commit
+from . import rank_index
+from .models import Score, Tournament
+from .signals import tournament_tags
+from .standings import ensure_scores, refresh_participant_counts
+
+Participant = Tournament.participants.through
+
+
+def get_participant_count(tournament_id: int) -> int:
+    return Tournament.objects.values_list("participant_count", flat=True).get(
+        pk=tournament_id
+    )
+
+
+@transaction.atomic
+def add_participants(tournament_id: int, player_ids: Iterable[int]) -> List[int]:
+    """Enroll the players; returns the ids that were not enrolled yet.
+
+    ``player_ids`` must exist. Players already enrolled are skipped.
+    """
+    player_ids = list(dict.fromkeys(player_ids))
+    enrolled = set(
+        Participant.objects.filter(
+            tournament_id=tournament_id, player_id__in=player_ids
+        ).values_list("player_id", flat=True)
+    )
+    added = [player_id for player_id in player_ids if player_id not in enrolled]
+    if not added:
+        return added
+    # Conflicts only come from concurrent enrollments of the same players.
+    Participant.objects.bulk_create(
+        [
+            Participant(tournament_id=tournament_id, player_id=player_id)
+            for player_id in added
+        ],
+        ignore_conflicts=True,
+    )
+    ensure_scores(tournament_id, added)
+    refresh_participant_counts([tournament_id])
+    invalidate_tags_on_commit(*tournament_tags(tournament_id))
+    return added
+
+
+@transaction.atomic
+def remove_participants(tournament_id: int, player_ids: Iterable[int]) -> int:
+    """Withdraw the players and drop their standings rows; returns the count."""
+    player_ids = list(dict.fromkeys(player_ids))
+    removed, _ = Participant.objects.filter(
+        tournament_id=tournament_id, player_id__in=player_ids
+    ).delete()
+    if not removed:
+        return removed
+    scores = Score.objects.filter(tournament_id=tournament_id, player_id__in=player_ids)
+    score_ids = list(scores.values_list("id", flat=True))
+    # A plain DELETE: ``delete()`` would load every row to send its signals.
+    scores._raw_delete(scores.db)
+    rank_index.update_on_commit(tournament_id, player_ids)
+    refresh_participant_counts([tournament_id])
+    invalidate_tags_on_commit(
+        *tournament_tags(tournament_id), *[f"score:{pk}" for pk in score_ids]
+    )
+    return removed
@@ -0,0 +1,281 @@
+"""Per-tournament rank index in Redis, for rank and "around me" reads.
+
+Each tournament's standings are mirrored in a sorted set whose members all
+have score 0 and encode the leaderboard sort key (points, the
+``LEADERBOARD_TIEBREAKS``, rating, player id) as fixed-width digits, so
+Redis's lexicographic order of members is exactly the order of
+``get_standings``. Floats cannot hold that many keys without collisions,
+which is why the composite key lives in the member rather than the score.
+A hash maps each player to their current member, so ``ZRANK`` (rank of a
+player) and ``ZRANGE`` by index (top K, window around a player) are
+O(log n) however large the tournament.
+
+Writers update the changed players once their transaction commits; an
+index that does not exist yet (or expired after ``RANK_INDEX_TTL``) is
+built from the database on the next read. ``manage.py check_rank_index``
+compares the index with the database and can repair it.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Score
+from .tiebreaks import get_tiebreak_order
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rank"
+WIDTH = 10
+# Added to values before inverting them, so negative values still sort.
+BIAS = 5 * 10 ** (WIDTH - 1)
+MAX_VALUE = 10**WIDTH - 1 - BIAS
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(
+            getattr(settings, "RANK_INDEX_REDIS_URL", "redis://127.0.0.1:6379/3"),
+            decode_responses=True,
+        )
+    return _client
+
+
+def get_ttl() -> int:
+    return getattr(settings, "RANK_INDEX_TTL", 60 * 60 * 24 * 7)
+
+
+def index_keys(tournament_id: int) -> Tuple[str, str]:
+    """The sorted set and the player -> member hash of a tournament."""
+    return f"{KEY_PREFIX}:{tournament_id}", f"{KEY_PREFIX}:{tournament_id}:members"
+
+
+def sort_fields() -> List[str]:
+    """Score columns of the sort key, best first; the player id breaks ties."""
+    return ["points", *get_tiebreak_order(), "player__rating"]
+
+
+def encode_member(values: Sequence[int], player_id: int) -> str:
+    """Encode descending ``values`` then ascending ``player_id`` as a member."""
+    parts = []
+    for value in values:
+        if not -BIAS <= value <= MAX_VALUE:
+            raise ValueError(f"{value} does not fit the rank index")
+        parts.append(f"{MAX_VALUE - value:0{WIDTH}d}")
+    parts.append(f"{player_id:0{WIDTH}d}")
+    return ":".join(parts)
+
+
+def decode_member(member: str) -> Tuple[List[int], int]:
+    *parts, player_id = member.split(":")
+    return [MAX_VALUE - int(part) for part in parts], int(player_id)
+
+
+@dataclass
+class RankedPlayer:
+    rank: int
+    player_id: int
+    values: List[int]
+
+    def as_dict(self) -> Dict[str, Any]:
+        names = ["points", *get_tiebreak_order(), "rating"]
+        return {
+            "rank": self.rank,
+            "id": self.player_id,
+            **dict(zip(names, self.values)),
+        }
+
+
+def load_members(tournament_id: int, player_ids: Optional[Iterable[int]] = None):
+    """Yield ``(player_id, member)`` of the standings rows in the database."""
+    rows = Score.objects.filter(tournament_id=tournament_id)
+    if player_ids is not None:
+        rows = rows.filter(player_id__in=list(player_ids))
+    for player_id, *values in rows.values_list("player_id", *sort_fields()).iterator():
+        yield player_id, encode_member(values, player_id)
+
+
+def build(tournament_id: int) -> int:
+    """Replace the index of a tournament with one built from the database.
+
+    The new index is written under temporary keys and renamed over the old
+    one, so readers never see it half built. Returns the number of players.
+    """
+    members = dict(load_members(tournament_id))
+    client = get_client()
+    keys = index_keys(tournament_id)
+    if not members:
+        client.delete(*keys)
+        return 0
+    building = [f"{key}:building" for key in keys]
+    pipe = client.pipeline()
+    pipe.delete(*building)
+    pipe.zadd(building[0], {member: 0 for member in members.values()})
+    pipe.hset(building[1], mapping=members)
+    for temporary, key in zip(building, keys):
+        pipe.rename(temporary, key)
+        pipe.expire(key, get_ttl())
+    pipe.execute()
+    return len(members)
+
+
+def update(tournament_id: int, player_ids: Iterable[int]) -> None:
+    """Rewrite the entries of ``player_ids`` from their standings rows.
+
+    Players without a row are removed. Nothing is written while the index
+    does not exist: the next read builds it whole.
+    """
+    player_ids = {int(player_id) for player_id in player_ids}
+    if not player_ids:
+        return
+    members = dict(load_members(tournament_id, player_ids))
+    zset, hash_key = index_keys(tournament_id)
+    fields = [str(player_id) for player_id in player_ids]
+
+    def replace(pipe) -> None:
+        if not pipe.exists(zset):
+            pipe.multi()
+            return
+        old = [member for member in pipe.hmget(hash_key, fields) if member]
+        pipe.multi()
+        if old:
+            pipe.zrem(zset, *old)
+        if members:
+            pipe.zadd(zset, {member: 0 for member in members.values()})
+            pipe.hset(hash_key, mapping=members)
+        removed = [field for field in fields if int(field) not in members]
+        if removed:
+            pipe.hdel(hash_key, *removed)
+        pipe.expire(zset, get_ttl())
+        pipe.expire(hash_key, get_ttl())
+
+    # Retried if another writer touches the index between the read and the
+    # write, so concurrent updates cannot leave stale members behind.
+    get_client().transaction(replace, zset, hash_key)
+
+
+def update_on_commit(tournament_id: int, player_ids: Iterable[int]) -> None:
+    """Update the index once the current transaction has committed."""
+    player_ids = list(player_ids)
+
+    def run() -> None:
+        try:
+            update(tournament_id, player_ids)
+        except Exception:
+            # The index is a cache: a later write, rebuild or repair fixes it.
+            logger.exception("Could not update the rank index of %s", tournament_id)
+
+    transaction.on_commit(run)
+
+
+def update_players_on_commit(player_ids: Iterable[int]) -> None:
+    """Update every tournament entry of ``player_ids`` (after a rating change)."""
+    player_ids = list(player_ids)
+
+    def run() -> None:
+        tournaments: Dict[int, List[int]] = {}
+        for tournament_id, player_id in Score.objects.filter(
+            player_id__in=player_ids
+        ).values_list("tournament_id", "player_id"):
+            tournaments.setdefault(tournament_id, []).append(player_id)
+        for tournament_id, ids in tournaments.items():
+            try:
+                update(tournament_id, ids)
+            except Exception:
+                logger.exception("Could not update the rank index of %s", tournament_id)
+
+    transaction.on_commit(run)
+
+
+def build_on_commit(tournament_id: int) -> None:
+    def run() -> None:
+        try:
+            build(tournament_id)
+        except Exception:
+            logger.exception("Could not rebuild the rank index of %s", tournament_id)
+
+    transaction.on_commit(run)
+
+
+def _ensure_built(tournament_id: int) -> None:
+    if not get_client().exists(index_keys(tournament_id)[0]):
+        build(tournament_id)
+
+
+def _ranked(members: Sequence[str], first_rank: int) -> List[RankedPlayer]:
+    players = []
+    for offset, member in enumerate(members):
+        values, player_id = decode_member(member)
+        players.append(RankedPlayer(first_rank + offset, player_id, values))
+    return players
+
+
+def top(tournament_id: int, limit: int) -> List[RankedPlayer]:
+    """The first ``limit`` players of the standings."""
+    _ensure_built(tournament_id)
+    members = get_client().zrange(index_keys(tournament_id)[0], 0, limit - 1)
+    return _ranked(members, 1)
+
+
+def rank_of(tournament_id: int, player_id: int) -> Optional[RankedPlayer]:
+    """The 1-based rank of a player, or ``None`` if they are not ranked."""
+    _ensure_built(tournament_id)
+    zset, hash_key = index_keys(tournament_id)
+    member = get_client().hget(hash_key, str(player_id))
+    if member is None:
+        return None
+    rank = get_client().zrank(zset, member)
+    if rank is None:
+        return None
+    return _ranked([member], rank + 1)[0]
+
+
+def around(tournament_id: int, player_id: int, size: int) -> List[RankedPlayer]:
+    """Up to ``size`` players either side of ``player_id``, with them."""
+    player = rank_of(tournament_id, player_id)
+    if player is None:
+        return []
+    start = max(player.rank - 1 - size, 0)
+    members = get_client().zrange(
+        index_keys(tournament_id)[0], start, player.rank - 1 + size
+    )
+    return _ranked(members, start + 1)
+
+
+def check(tournament_id: int) -> Optional[Dict[str, List[int]]]:
+    """Players whose index entry disagrees with the database.
+
+    ``missing`` are ranked in the database only, ``extra`` in the index only
+    and ``stale`` in both with a different sort key (hence rank). Returns
+    ``None`` if the index is not built (the next read builds it).
+    """
+    zset, hash_key = index_keys(tournament_id)
+    client = get_client()
+    if not client.exists(zset, hash_key):
+        return None
+    expected = dict(load_members(tournament_id))
+    indexed = {int(field): member for field, member in client.hgetall(hash_key).items()}
+    ranked = set(client.zrange(zset, 0, -1))
+    report: Dict[str, List[int]] = {"missing": [], "extra": [], "stale": []}
+    for player_id, member in expected.items():
+        if player_id not in indexed:
+            report["missing"].append(player_id)
+        elif indexed[player_id] != member or member not in ranked:
+            report["stale"].append(player_id)
+    # Entries of players without a standings row, and members left behind.
+    extra = set(indexed) - set(expected)
+    extra.update(
+        decode_member(member)[1]
+        for member in ranked - set(expected.values())
+        if decode_member(member)[1] not in report["stale"]
+    )
+    report["extra"] = sorted(extra)
+    return report
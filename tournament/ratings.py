@@ -0,0 +1,182 @@
+"""Vectorized Elo rating updates.
+
+Results are applied per rating period (one tournament round): every game
+of the period is scored against the ratings at the start of the period,
+so the whole period is a handful of NumPy operations instead of a Python
+loop per game. Only decisive games between two players are rated; byes
+and matches without a winner are skipped.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from django.db import transaction
+
+from core.cache import invalidate_tags_on_commit
+from user.authentication import forget_users
+from user.models import Player
+
+from . import rank_index
+from .models import Match
+
+INITIAL_RATING = 1200
+PROVISIONAL_GAMES = 30
+MASTER_RATING = 2400
+# Player rows read before a rating update, as given to ``_write_back``.
+PLAYER_COLUMNS = ["id", "user_id", "rating", "rated_games"]
+
+
+def k_factors(ratings: np.ndarray, games: np.ndarray) -> np.ndarray:
+    """FIDE-style K: 40 while provisional, 10 from 2400, otherwise 20."""
+    return np.where(
+        games < PROVISIONAL_GAMES, 40.0, np.where(ratings >= MASTER_RATING, 10.0, 20.0)
+    )
+
+
+def rate_period(
+    ratings: np.ndarray,
+    games: np.ndarray,
+    white: np.ndarray,
+    black: np.ndarray,
+    white_score: np.ndarray,
+) -> None:
+    """Apply one rating period in place.
+
+    ``white``/``black`` index into ``ratings`` and ``games``; ``white_score``
+    is 1.0 for a white win and 0.0 for a black win.
+    """
+    expected = 1.0 / (1.0 + 10.0 ** ((ratings[black] - ratings[white]) / 400.0))
+    k = k_factors(ratings, games)
+    surprise = white_score - expected
+    deltas = np.zeros_like(ratings)
+    np.add.at(deltas, white, k[white] * surprise)
+    np.add.at(deltas, black, -k[black] * surprise)
+    ratings += deltas
+    np.add.at(games, white, 1)
+    np.add.at(games, black, 1)
+
+
+def replay(
+    ratings: np.ndarray,
+    games: np.ndarray,
+    periods: np.ndarray,
+    white: np.ndarray,
+    black: np.ndarray,
+    white_score: np.ndarray,
+) -> None:
+    """Apply a sorted game history in place, one period at a time.
+
+    ``periods`` holds a non-decreasing period number per game.
+    """
+    if not len(periods):
+        return
+    boundaries = np.flatnonzero(np.diff(periods)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(periods)]))
+    for start, end in zip(starts, ends):
+        rate_period(
+            ratings, games, white[start:end], black[start:end], white_score[start:end]
+        )
+
+
+def _rated_games(matches) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = np.array(list(matches), dtype=np.int64).reshape(-1, 3)
+    white, black, winner = rows[:, 0], rows[:, 1], rows[:, 2]
+    return white, black, (winner == white).astype(np.float64)
+
+
+def _write_back(players: np.ndarray, ratings: np.ndarray, games: np.ndarray) -> None:
+    """Store the new ratings of the players whose values changed.
+
+    ``players`` has one ``(id, user_id, rating, rated_games)`` row per
+    player, read before the update. Unchanged players are neither written
+    nor invalidated, so a replay that changes little stays cheap.
+    """
+    ratings = np.rint(ratings).astype(np.int64)
+    changed = (ratings != players[:, 2]) | (games != players[:, 3])
+    player_ids = players[changed, 0].tolist()
+    if not player_ids:
+        return
+    Player.objects.bulk_update(
+        [
+            Player(id=pid, rating=rating, rated_games=count)
+            for pid, rating, count in zip(
+                player_ids, ratings[changed].tolist(), games[changed].tolist()
+            )
+        ],
+        ["rating", "rated_games"],
+        batch_size=1000,
+    )
+    invalidate_tags_on_commit("players:list", *[f"player:{pid}" for pid in player_ids])
+    rank_index.update_players_on_commit(player_ids)
+    # Authenticated users are cached with their player's rating.
+    forget_users(players[changed, 1].tolist())
+
+
+@transaction.atomic
+def apply_round_ratings(tournament_id: int, round_number: int) -> int:
+    """Rate the not yet rated results of one round; returns the games rated."""
+    matches = Match.objects.select_for_update().filter(
+        tournament_id=tournament_id,
+        round_number=round_number,
+        rated=False,
+        player2__isnull=False,
+        winner__isnull=False,
+    )
+    rows = list(matches.values_list("id", "player1_id", "player2_id", "winner_id"))
+    if not rows:
+        return 0
+    match_ids = [row[0] for row in rows]
+    white, black, white_score = _rated_games(row[1:] for row in rows)
+
+    player_ids, index = np.unique(np.concatenate((white, black)), return_inverse=True)
+    players = np.array(
+        list(
+            Player.objects.select_for_update()
+            .filter(id__in=player_ids.tolist())
+            .order_by("id")
+            .values_list(*PLAYER_COLUMNS)
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    ratings = players[:, 2].astype(np.float64)
+    games = players[:, 3].copy()
+
+    rate_period(ratings, games, index[: len(white)], index[len(white) :], white_score)
+    _write_back(players, ratings, games)
+    Match.objects.filter(id__in=match_ids).update(rated=True)
+    return len(rows)
+
+
+@transaction.atomic
+def recompute_all_ratings(initial_rating: int = INITIAL_RATING) -> int:
+    """Reset every player and replay the whole rated history in order."""
+    players = np.array(
+        list(Player.objects.order_by("id").values_list(*PLAYER_COLUMNS)),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    player_ids = players[:, 0]
+    matches = (
+        Match.objects.filter(player2__isnull=False, winner__isnull=False)
+        .order_by("tournament__start_date", "tournament_id", "round_number", "id")
+        .values_list(
+            "tournament_id", "round_number", "player1_id", "player2_id", "winner_id"
+        )
+    )
+    rows = np.array(list(matches.iterator(chunk_size=10000)), dtype=np.int64)
+    rows = rows.reshape(-1, 5)
+    ratings = np.full(len(player_ids), float(initial_rating))
+    games = np.zeros(len(player_ids), dtype=np.int64)
+
+    if len(rows):
+        # One period per (tournament, round), numbered in history order.
+        changed = np.diff(rows[:, :2], axis=0).any(axis=1)
+        periods = np.concatenate(([0], np.cumsum(changed)))
+        white = np.searchsorted(player_ids, rows[:, 2])
+        black = np.searchsorted(player_ids, rows[:, 3])
+        white_score = (rows[:, 4] == rows[:, 2]).astype(np.float64)
+        replay(ratings, games, periods, white, black, white_score)
+
+    _write_back(players, ratings, games)
+    Match.objects.filter(player2__isnull=False, winner__isnull=False).update(rated=True)
+    return len(rows)
@@ -1,31 +1,290 @@
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import serializers
+from core.cache import invalidate_tags_on_commit
+from core.serializers import BulkManyRelatedField, ExpandableFieldsMixin
+from player.serializers import PlayerSerializer
 from user.models import Player
-from .models import Tournament, Match, Score
+from .models import Tournament, Match, PlayerGame, Score
+from .events import publish_event
+from .history import record_results
+from .jobs import round_complete, schedule_ratings
+from .signals import match_event, match_tags
+from .standings import apply_result_change, apply_result_changes
 
 
-class TournamentSerializer(serializers.ModelSerializer):
-    participants = serializers.PrimaryKeyRelatedField(
-        queryset=Player.objects.all(), many=True
+class TournamentSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    """Tournament with its ``participant_count``.
+
+    ``participants`` can still be given on writes; reads and bulk changes go
+    through the participants sub-resource (``ParticipantsSerializer``).
+    """
+
+    cache_tag = "tournaments:list"
+
+    participants = BulkManyRelatedField(
+        child_relation=serializers.PrimaryKeyRelatedField(
+            queryset=Player.objects.all()
+        ),
+        write_only=True,
     )
 
     class Meta:
         model = Tournament
-        fields = ["id", "name", "start_date", "end_date", "participants"]
+        fields = [
+            "id",
+            "name",
+            "start_date",
+            "end_date",
+            "participant_count",
+            "participants",
+        ]
+        read_only_fields = ["participant_count"]
+
+    def create(self, validated_data):
+        participants = {player.pk for player in validated_data.get("participants", [])}
+        tournament = super().create(validated_data)
+        # The count the participants signal wrote to the row, without reading
+        # it back.
+        tournament.participant_count = len(participants)
+        return tournament
+
+    def update(self, instance, validated_data):
+        recount = "participants" in validated_data
+        tournament = super().update(instance, validated_data)
+        if recount:
+            tournament.refresh_from_db(fields=["participant_count"])
+        return tournament
+
+
+class ParticipantsSerializer(serializers.Serializer):
+    """Player ids to enroll or withdraw, all resolved with one ``IN`` query."""
+
+    players = BulkManyRelatedField(
+        child_relation=serializers.PrimaryKeyRelatedField(
+            queryset=Player.objects.only("id")
+        ),
+        allow_empty=False,
+    )
 
 
-class MatchSerializer(serializers.ModelSerializer):
+class MatchSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "tournament": TournamentSerializer,
+        "player1": PlayerSerializer,
+        "player2": PlayerSerializer,
+        "winner": PlayerSerializer,
+    }
+
     class Meta:
         model = Match
         fields = ["id", "tournament", "player1", "player2", "winner", "round_number"]
+        # The round constraints on ``Match`` are checked in ``validate``, which
+        # also covers a player appearing once as player1 and once as player2.
+        validators = []
+
+    def validate(self, attrs):
+        player1 = attrs.get("player1", getattr(self.instance, "player1", None))
+        player2 = attrs.get("player2", getattr(self.instance, "player2", None))
+        winner = attrs.get("winner", getattr(self.instance, "winner", None))
+        if winner is not None and winner not in (player1, player2):
+            raise serializers.ValidationError(
+                {"winner": "Winner must be one of the match players."}
+            )
+        if player1 is not None and player1 == player2:
+            raise serializers.ValidationError(
+                {"player2": "A player cannot be paired against themselves."}
+            )
+        if self.instance is None or attrs.keys() & {
+            "tournament",
+            "round_number",
+            "player1",
+            "player2",
+        }:
+            self.validate_round(attrs, player1, player2)
+        return attrs
+
+    def validate_round(self, attrs, player1, player2):
+        """Reject a second board for a player, or a second bye, in a round."""
+        tournament = attrs.get("tournament", getattr(self.instance, "tournament", None))
+        round_number = attrs.get(
+            "round_number", getattr(self.instance, "round_number", None)
+        )
+        players = [player for player in (player1, player2) if player is not None]
+        conflict = Q(player1__in=players) | Q(player2__in=players)
+        if player2 is None:
+            conflict |= Q(player2__isnull=True)
+        others = Match.objects.filter(tournament=tournament, round_number=round_number)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.filter(conflict).exists():
+            raise serializers.ValidationError(
+                {"round_number": "A player already has a match in this round."}
+            )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        match = super().create(validated_data)
+        apply_result_change(match.tournament_id, None, match.winner_id)
+        if match.winner_id is not None:
+            self.schedule_ratings(match, corrected=False)
+        return match
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        old_tournament_id = instance.tournament_id
+        old_winner_id = instance.winner_id
+        old_result = result_key(instance)
+        match = super().update(instance, validated_data)
+        if match.tournament_id != old_tournament_id:
+            apply_result_change(old_tournament_id, old_winner_id, None)
+            old_winner_id = None
+        apply_result_change(match.tournament_id, old_winner_id, match.winner_id)
+        if result_key(match) != old_result:
+            # The ratings still hold the old result until they are replayed.
+            corrected = match.rated
+            if corrected:
+                match.rated = False
+                Match.objects.filter(pk=match.pk).update(rated=False)
+            self.schedule_ratings(match, corrected)
+        return match
+
+    @staticmethod
+    def schedule_ratings(match, corrected):
+        schedule_ratings(
+            match.tournament_id,
+            match.round_number,
+            corrected,
+            complete=not corrected
+            and round_complete(match.tournament_id, match.round_number),
+        )
+
+
+def result_key(match):
+    """What rating a match depends on: its round, players and winner."""
+    return (
+        match.tournament_id,
+        match.round_number,
+        match.player1_id,
+        match.player2_id,
+        match.winner_id,
+    )
+
+
+class MatchResultSerializer(serializers.Serializer):
+    match = serializers.IntegerField()
+    winner = serializers.IntegerField(allow_null=True)
+
+
+class RoundResultsSerializer(serializers.Serializer):
+    """Results for a whole round, checked against ``context["matches"]``.
+
+    ``matches`` maps match id to the round's ``Match`` rows, loaded by the
+    view in one query.
+    """
+
+    results = MatchResultSerializer(many=True, allow_empty=False)
+
+    def validate_results(self, results):
+        matches = self.context["matches"]
+        errors = []
+        seen = set()
+        for result in results:
+            match = matches.get(result["match"])
+            if match is None:
+                errors.append({"match": "Match is not part of this round."})
+            elif result["match"] in seen:
+                errors.append({"match": "Duplicate result for this match."})
+            elif result["winner"] not in (None, match.player1_id, match.player2_id):
+                errors.append({"winner": "Winner must be one of the match players."})
+            else:
+                errors.append({})
+            seen.add(result["match"])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return results
+
+    @transaction.atomic
+    def create(self, validated_data):
+        matches = self.context["matches"]
+        changes = []
+        updated = []
+        corrected = False
+        for result in validated_data["results"]:
+            match = matches[result["match"]]
+            if match.winner_id == result["winner"]:
+                continue
+            changes.append((match.winner_id, result["winner"]))
+            match.winner_id = result["winner"]
+            # The ratings still hold the old result until they are replayed.
+            corrected |= match.rated
+            match.rated = False
+            updated.append(match)
+        Match.objects.bulk_update(updated, ["winner", "rated"])
+        record_results(
+            (match, old_winner_id)
+            for match, (old_winner_id, _) in zip(updated, changes)
+        )
+        if updated:
+            tournament_id = updated[0].tournament_id
+            apply_result_changes(tournament_id, changes)
+            invalidate_tags_on_commit(
+                *match_tags(tournament_id),
+                *[f"match:{match.pk}" for match in updated],
+            )
+            publish_event(
+                tournament_id,
+                {"type": "results", "matches": [match_event(m) for m in updated]},
+            )
+            schedule_ratings(
+                tournament_id,
+                updated[0].round_number,
+                corrected,
+                complete=all(
+                    match.winner_id is not None or match.player2_id is None
+                    for match in matches.values()
+                ),
+            )
+        return updated
 
 
-class ScoreSerializer(serializers.ModelSerializer):
+class PlayerGameSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    """One game of a player's history, from their side of the board."""
+
+    expandable_fields = {
+        "tournament": TournamentSerializer,
+        "opponent": PlayerSerializer,
+    }
+
+    class Meta:
+        model = PlayerGame
+        fields = ["match", "tournament", "round_number", "opponent", "colour", "result"]
+
+
+class ScoreSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"player": PlayerSerializer, "tournament": TournamentSerializer}
+
     class Meta:
         model = Score
         fields = "__all__"
 
 
 class LeaderboardSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="player.id", read_only=True)
+    name = serializers.CharField(source="player.name", read_only=True)
+    rating = serializers.IntegerField(source="player.rating", read_only=True)
+    country = serializers.CharField(source="player.country", read_only=True)
+
     class Meta:
-        model = Player
-        fields = ["id", "name", "rating", "points", "country"]
+        model = Score
+        fields = [
+            "id",
+            "name",
+            "rating",
+            "points",
+            "buchholz",
+            "median_buchholz",
+            "sonneborn_berger",
+            "progressive",
+            "country",
+        ]
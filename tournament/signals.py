@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional
+
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache import invalidate_tags_on_commit
+from user.models import Player
+from . import history, rank_index
+from .events import publish_event
+from .models import Match, PlayerGame, Score, Tournament
+from .standings import ensure_scores, refresh_participant_counts
+
+
+def tournament_tags(tournament_id: int) -> List[str]:
+    return [
+        f"tournament:{tournament_id}",
+        f"standings:{tournament_id}",
+        "tournaments:list",
+        "scores:list",
+    ]
+
+
+def match_tags(tournament_id: int, match_id: Optional[int] = None) -> List[str]:
+    """Tags touched by writing a match result, including the standings."""
+    tags = [
+        f"tournament:{tournament_id}",
+        f"standings:{tournament_id}",
+        "matches:list",
+        "scores:list",
+    ]
+    if match_id is not None:
+        tags.append(f"match:{match_id}")
+    return tags
+
+
+def cascaded(sender, origin) -> bool:
+    """Whether a ``sender`` row is deleted because another model's row was.
+
+    ``origin`` is what ``delete()`` was called on. The matches and scores
+    of a deleted tournament or player are handled once, in bulk, by the
+    receivers of that model instead of one row at a time.
+    """
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return not issubclass(model, sender)
+
+
+@receiver([post_save, post_delete], sender=Tournament)
+def invalidate_tournament(sender, instance, **kwargs):
+    invalidate_tags_on_commit(*tournament_tags(instance.pk))
+
+
+@receiver(pre_delete, sender=Tournament)
+def collect_tournament_games(sender, instance, **kwargs):
+    # Read before the cascade deletes the games; see ``forget_tournament``.
+    instance.deleted_games = history.pairings_of(
+        PlayerGame.objects.filter(tournament_id=instance.pk)
+    )
+
+
+@receiver(post_delete, sender=Tournament)
+def forget_tournament(sender, instance, **kwargs):
+    history.forget_games(*instance.deleted_games)
+    invalidate_tags_on_commit("matches:list")
+    # With no standings rows left, the rebuild drops the index.
+    rank_index.build_on_commit(instance.pk)
+
+
+@receiver(pre_delete, sender=Player)
+def collect_player_games(sender, instance, **kwargs):
+    games = set(
+        PlayerGame.objects.filter(player_id=instance.pk).values_list(
+            "opponent_id", "tournament_id"
+        )
+    )
+    tournament_ids = set(
+        Score.objects.filter(player_id=instance.pk).values_list(
+            "tournament_id", flat=True
+        )
+    )
+    instance.deleted_games = (
+        {opponent_id for opponent_id, _ in games if opponent_id is not None},
+        tournament_ids | {tournament_id for _, tournament_id in games},
+    )
+
+
+@receiver(post_delete, sender=Player)
+def forget_player_games(sender, instance, **kwargs):
+    # The player's head-to-head records went with it, both ways round.
+    opponents, tournament_ids = instance.deleted_games
+    invalidate_tags_on_commit(
+        *history.history_tags(opponents | {instance.pk}), "matches:list"
+    )
+    for tournament_id in tournament_ids:
+        rank_index.update_on_commit(tournament_id, [instance.pk])
+        invalidate_tags_on_commit(*tournament_tags(tournament_id))
+
+
+@receiver(pre_delete, sender=Player)
+def collect_player_entries(sender, instance, **kwargs):
+    # The cascade deletes the player's participants rows without sending
+    # m2m_changed, so ``sync_participant_scores`` never sees them.
+    instance.entered_tournaments = list(
+        Tournament.participants.through.objects.filter(
+            player_id=instance.pk
+        ).values_list("tournament_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Player)
+def sync_withdrawn_counts(sender, instance, **kwargs):
+    refresh_participant_counts(instance.entered_tournaments)
+    for tournament_id in instance.entered_tournaments:
+        invalidate_tags_on_commit(*tournament_tags(tournament_id))
+
+
+@receiver([post_save, post_delete], sender=Match)
+def invalidate_match(sender, instance, origin=None, **kwargs):
+    if cascaded(sender, origin):
+        invalidate_tags_on_commit(f"match:{instance.pk}")
+    else:
+        invalidate_tags_on_commit(*match_tags(instance.tournament_id, instance.pk))
+
+
+@receiver(post_save, sender=Match)
+def record_match_history(sender, instance, **kwargs):
+    history.record_matches([instance])
+
+
+@receiver(post_delete, sender=Match)
+def forget_match_history(sender, instance, origin=None, **kwargs):
+    if not cascaded(sender, origin):
+        history.forget_match(instance)
+
+
+@receiver(post_save, sender=Match)
+def publish_match(sender, instance, **kwargs):
+    publish_event(instance.tournament_id, {"type": "result", **match_event(instance)})
+
+
+def match_event(match: Match) -> Dict[str, Optional[int]]:
+    return {
+        "match": match.pk,
+        "round": match.round_number,
+        "player1": match.player1_id,
+        "player2": match.player2_id,
+        "winner": match.winner_id,
+    }
+
+
+@receiver([post_save, post_delete], sender=Score)
+def invalidate_score(sender, instance, origin=None, **kwargs):
+    if cascaded(sender, origin):
+        invalidate_tags_on_commit(f"score:{instance.pk}")
+    else:
+        invalidate_tags_on_commit(
+            f"score:{instance.pk}", f"standings:{instance.tournament_id}", "scores:list"
+        )
+
+
+@receiver([post_save, post_delete], sender=Score)
+def update_rank_index(sender, instance, origin=None, **kwargs):
+    if not cascaded(sender, origin):
+        rank_index.update_on_commit(instance.tournament_id, [instance.player_id])
+
+
+@receiver(post_save, sender=Player)
+def update_player_ranks(sender, instance, created, **kwargs):
+    # The rating is the last tiebreak of the standings.
+    if not created:
+        rank_index.update_players_on_commit([instance.pk])
+
+
+@receiver(m2m_changed, sender=Tournament.participants.through)
+def sync_participant_scores(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        tournament_ids = (
+            pk_set
+            if pk_set is not None
+            else list(
+                Score.objects.filter(player_id=instance.pk).values_list(
+                    "tournament_id", flat=True
+                )
+            )
+        )
+    else:
+        tournament_ids = [instance.pk]
+
+    if action == "post_add":
+        if reverse:
+            for tournament_id in pk_set:
+                ensure_scores(tournament_id, [instance.pk])
+        else:
+            ensure_scores(instance.pk, pk_set)
+    elif action == "post_remove":
+        if reverse:
+            Score.objects.filter(
+                player_id=instance.pk, tournament_id__in=pk_set
+            ).delete()
+        else:
+            Score.objects.filter(
+                tournament_id=instance.pk, player_id__in=pk_set
+            ).delete()
+    elif action == "post_clear":
+        if reverse:
+            Score.objects.filter(player_id=instance.pk).delete()
+        else:
+            Score.objects.filter(tournament_id=instance.pk).delete()
+
+    refresh_participant_counts(tournament_ids)
+    for tournament_id in tournament_ids:
+        invalidate_tags_on_commit(*tournament_tags(tournament_id))
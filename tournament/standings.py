@@ -0,0 +1,175 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from core.cache import invalidate_tags_on_commit
+from . import rank_index
+from .events import publish_event
+from .models import Match, Score, Tournament
+from .tiebreaks import (
+    compute_tiebreaks,
+    get_tiebreak_order,
+    load_opponent_index,
+    player_value_case,
+    refresh_tiebreaks,
+)
+
+POINTS_PER_WIN = 1
+
+
+def ensure_scores(tournament_id: int, player_ids: Iterable[int]) -> None:
+    """Create missing zero-point standings rows for the given players."""
+    player_ids = list(player_ids)
+    Score.objects.bulk_create(
+        [
+            Score(tournament_id=tournament_id, player_id=player_id)
+            for player_id in player_ids
+        ],
+        ignore_conflicts=True,
+    )
+    rank_index.update_on_commit(tournament_id, player_ids)
+
+
+def refresh_participant_counts(tournament_ids: Iterable[int]) -> None:
+    """Recount the participants of the tournaments in one ``UPDATE``."""
+    counts = (
+        Tournament.participants.through.objects.filter(tournament_id=OuterRef("pk"))
+        .order_by()
+        .values("tournament_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Tournament.objects.filter(pk__in=list(tournament_ids)).update(
+        participant_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+def adjust_points(tournament_id: int, player_id: int, delta: int) -> None:
+    updated = Score.objects.filter(
+        tournament_id=tournament_id, player_id=player_id
+    ).update(points=F("points") + delta)
+    if not updated:
+        ensure_scores(tournament_id, [player_id])
+        Score.objects.filter(tournament_id=tournament_id, player_id=player_id).update(
+            points=F("points") + delta
+        )
+
+
+def apply_result_change(
+    tournament_id: int, old_winner_id: Optional[int], new_winner_id: Optional[int]
+) -> None:
+    """Move the points of one match from its previous winner to the new one.
+
+    Must be called inside the transaction that writes the match so the
+    standings never disagree with the stored results.
+    """
+    if old_winner_id == new_winner_id:
+        return
+    deltas = {}
+    if old_winner_id is not None:
+        adjust_points(tournament_id, old_winner_id, -POINTS_PER_WIN)
+        deltas[old_winner_id] = -POINTS_PER_WIN
+    if new_winner_id is not None:
+        adjust_points(tournament_id, new_winner_id, POINTS_PER_WIN)
+        deltas[new_winner_id] = POINTS_PER_WIN
+    rank_index.update_on_commit(tournament_id, refresh_tiebreaks(tournament_id, deltas))
+    publish_standings_deltas(tournament_id, deltas)
+
+
+def apply_result_changes(
+    tournament_id: int, changes: Iterable[Tuple[Optional[int], Optional[int]]]
+) -> None:
+    """Batch form of ``apply_result_change`` for ``(old, new)`` winner pairs.
+
+    Net point deltas are folded per player and written with a single
+    ``UPDATE ... CASE`` statement, whatever the number of boards.
+    """
+    deltas: Counter = Counter()
+    for old_winner_id, new_winner_id in changes:
+        if old_winner_id == new_winner_id:
+            continue
+        if old_winner_id is not None:
+            deltas[old_winner_id] -= POINTS_PER_WIN
+        if new_winner_id is not None:
+            deltas[new_winner_id] += POINTS_PER_WIN
+    deltas = {player_id: delta for player_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    ensure_scores(tournament_id, deltas)
+    Score.objects.filter(tournament_id=tournament_id, player_id__in=deltas).update(
+        points=F("points") + player_value_case(deltas)
+    )
+    rank_index.update_on_commit(tournament_id, refresh_tiebreaks(tournament_id, deltas))
+    publish_standings_deltas(tournament_id, deltas)
+
+
+def publish_standings_deltas(tournament_id: int, deltas: Dict[int, int]) -> None:
+    publish_event(
+        tournament_id,
+        {
+            "type": "standings",
+            "deltas": {str(player_id): delta for player_id, delta in deltas.items()},
+        },
+    )
+
+
+def get_standings(
+    tournament_id: int, tiebreaks: Optional[Sequence[str]] = None
+) -> QuerySet:
+    """Order by points, then ``tiebreaks`` (default ``LEADERBOARD_TIEBREAKS``)."""
+    if tiebreaks is None:
+        tiebreaks = get_tiebreak_order()
+    return (
+        Score.objects.filter(tournament_id=tournament_id)
+        .select_related("player")
+        .order_by(
+            "-points",
+            *[f"-{name}" for name in tiebreaks],
+            "-player__rating",
+            "player_id",
+        )
+    )
+
+
+def rebuild_standings(tournament_id: int) -> int:
+    """Recompute the standings and tiebreaks of a tournament from its matches."""
+    tournament = Tournament.objects.get(id=tournament_id)
+    points = {
+        player_id: 0
+        for player_id in tournament.participants.values_list("id", flat=True)
+    }
+    wins = (
+        Match.objects.filter(tournament_id=tournament_id, winner__isnull=False)
+        .values("winner_id")
+        .annotate(wins=Count("id"))
+    )
+    for row in wins:
+        points[row["winner_id"]] = row["wins"] * POINTS_PER_WIN
+    tiebreaks = compute_tiebreaks(load_opponent_index(tournament_id), points)
+
+    with transaction.atomic():
+        scores = Score.objects.filter(tournament_id=tournament_id)
+        score_ids = list(scores.values_list("id", flat=True))
+        # A plain DELETE: ``delete()`` would load every row to send its signals.
+        scores._raw_delete(scores.db)
+        Score.objects.bulk_create(
+            [
+                Score(
+                    tournament_id=tournament_id,
+                    player_id=player_id,
+                    points=value,
+                    **tiebreaks[player_id],
+                )
+                for player_id, value in points.items()
+            ]
+        )
+        invalidate_tags_on_commit(
+            f"standings:{tournament_id}",
+            "scores:list",
+            *[f"score:{pk}" for pk in score_ids],
+        )
+        rank_index.build_on_commit(tournament_id)
+    return len(points)
@@ -0,0 +1,159 @@
+from io import BytesIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from django.urls import Resolver404, resolve, reverse
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.asgi import ASGI_URLCONF, application
+from core.async_views import AsyncReadView
+from tournament.models import Match, Tournament
+from tournament.views import tournament_events
+from user.models import Player
+
+
+@pytest.fixture
+def tournament():
+    cache.clear()
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20 + i,
+            rating=1500 + i,
+            country="USA",
+        )
+        for i in range(3)
+    ]
+    tournament = Tournament.objects.create(
+        name="Async Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    Match.objects.create(
+        tournament=tournament,
+        player1=players[0],
+        player2=players[1],
+        winner=players[0],
+        round_number=1,
+    )
+    return tournament
+
+
+def read_urls(tournament):
+    match = tournament.match_set.get()
+    score = tournament.score_set.order_by("id").first()
+    player = tournament.participants.order_by("id").first()
+    return [
+        reverse("tournament-list-create"),
+        reverse("tournament-detail", args=[tournament.pk]),
+        reverse("tournament-leaderboard", args=[tournament.pk]),
+        reverse("match-list-create") + "?expand=player1,winner",
+        reverse("match-detail", args=[match.pk]),
+        reverse("score-list-create") + "?fields=player,points",
+        reverse("score-detail", args=[score.pk]),
+        reverse("player-list-create") + "?ordering=-rating&page_size=2",
+        reverse("player-detail", args=[player.pk]) + "?fields=id,name",
+    ]
+
+
+@pytest.fixture(autouse=True)
+def asgi_urls(settings):
+    settings.ROOT_URLCONF = ASGI_URLCONF
+
+
+def aget(url, **headers):
+    return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+
+def drf_get(url):
+    """The same request to the DRF view, as served by ``core/wsgi.py``."""
+    with override_settings(ROOT_URLCONF="core.urls"):
+        return APIClient().get(url)
+
+
+def test_asgi_application_routes_with_asgi_urls():
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    request, _ = application.create_request(scope, BytesIO())
+    assert request.urlconf == ASGI_URLCONF
+
+
+def test_event_stream_is_only_routed_under_asgi():
+    url = reverse("tournament-events", args=[1])
+    assert resolve(url).func is tournament_events
+    with pytest.raises(Resolver404):
+        resolve(url, urlconf="core.urls")
+
+
+@pytest.mark.django_db
+def test_async_reads_match_the_drf_views(tournament):
+    for url in read_urls(tournament):
+        sync_response = drf_get(url)
+        response = aget(url)
+        assert response.status_code == 200, url
+        assert issubclass(response.resolver_match.func.view_class, AsyncReadView)
+        assert response["Content-Type"] == "application/json"
+        assert response.content == sync_response.content, url
+        # Both answer from the same cache entry, with the same validators.
+        assert response["ETag"] == sync_response["ETag"], url
+
+
+@pytest.mark.django_db
+def test_not_modified_without_queries(tournament, django_assert_num_queries):
+    for url in read_urls(tournament):
+        etag = aget(url)["ETag"]
+        with django_assert_num_queries(0):
+            response = aget(url, If_None_Match=etag)
+        assert response.status_code == 304, url
+
+
+@pytest.mark.django_db
+def test_writes_go_to_the_drf_views(tournament):
+    admin = User.objects.create_superuser(
+        username="admin", password="password", email="admin@example.com"
+    )
+    url = reverse("tournament-detail", args=[tournament.pk])
+    etag = aget(url)["ETag"]
+    auth = {"Authorization": f"Bearer {AccessToken.for_user(admin)}"}
+    response = async_to_sync(AsyncClient().put)(
+        url,
+        {"name": "Async Masters"},
+        content_type="application/json",
+        headers=auth,
+    )
+    assert response.status_code == 200
+    # Answered by the DRF view.
+    assert isinstance(response, Response)
+    response = aget(url, If_None_Match=etag)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Async Masters"
+    response = async_to_sync(AsyncClient().post)(
+        reverse("tournament-list-create"), {}, headers=auth
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_errors_are_rendered_like_drf(tournament):
+    response = aget(reverse("tournament-list-create"), Authorization="Bearer nope")
+    assert response.status_code == 401
+    assert response.has_header("WWW-Authenticate")
+    assert "detail" in response.json()
+
+    response = aget(reverse("match-list-create") + "?expand=nope")
+    assert response.status_code == 400
+    assert response.json() == {"error": "Unknown expansions: nope"}
+
+    response = aget(reverse("player-detail", args=[0]))
+    assert response.status_code == 404
+    assert response.json() == drf_get(reverse("player-detail", args=[0])).data
+
+
+@pytest.mark.django_db
+def test_streamed_lists_go_to_the_drf_views(tournament):
+    response = aget(reverse("match-list-create") + "?stream=true")
+    assert response.status_code == 200
+    assert response.streaming
@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Match
+from user.models import Player
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500, 1501]
+
+
+@pytest.fixture
+def match(tournament, players):
+    return Match.objects.create(
+        tournament=tournament, player1=players[0], player2=players[1], round_number=1
+    )
+
+
+@pytest.mark.django_db
+def test_orm_edits_invalidate_cached_detail(admin_client, match):
+    tournament = match.tournament
+    url = reverse("tournament-detail", args=[tournament.pk])
+    assert admin_client.get(url).data["name"] == "Test Open"
+
+    # An admin-site style edit that never goes through the API views.
+    tournament.name = "Renamed Open"
+    tournament.save()
+    assert admin_client.get(url).data["name"] == "Renamed Open"
+
+
+@pytest.mark.django_db
+def test_match_result_invalidates_leaderboard_and_scores(
+    admin_client, match, django_assert_num_queries
+):
+    leaderboard_url = reverse("tournament-leaderboard", args=[match.tournament_id])
+    scores_url = reverse("score-list-create")
+    admin_client.get(leaderboard_url)
+    admin_client.get(scores_url)
+    with django_assert_num_queries(0):
+        admin_client.get(leaderboard_url)
+
+    admin_client.put(
+        reverse("match-detail", args=[match.pk]), {"winner": match.player1_id}
+    )
+
+    assert admin_client.get(leaderboard_url).data[0]["points"] == 1
+    points = {
+        row["player"]: row["points"]
+        for row in admin_client.get(scores_url).data["results"]
+    }
+    assert points[match.player1_id] == 1
+
+
+@pytest.mark.django_db
+def test_player_edit_invalidates_leaderboard(admin_client, match):
+    url = reverse("tournament-leaderboard", args=[match.tournament_id])
+    admin_client.get(url)
+    player = Player.objects.get(pk=match.player1_id)
+    player.name = "Renamed"
+    player.save()
+    assert "Renamed" in [row["name"] for row in admin_client.get(url).data]
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from core import conditional
+from core.cache import invalidate_tags
+from tournament.models import Match
+
+
+@pytest.fixture
+def match(tournament, players):
+    return Match.objects.create(
+        tournament=tournament, player1=players[0], player2=players[1], round_number=1
+    )
+
+
+@pytest.mark.django_db
+def test_unchanged_payload_is_a_304_without_reading_it(
+    admin_client, match, monkeypatch, django_assert_num_queries
+):
+    url = reverse("match-list-create")
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert etag.startswith('"') and response.has_header("Last-Modified")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached value was read")
+
+    monkeypatch.setattr(conditional, "get_or_compute_entry", fail)
+    with django_assert_num_queries(0):
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert response.content == b""
+    response = admin_client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert response.status_code == 304
+    monkeypatch.undo()
+
+    # Other variants of the list have their own validators.
+    response = admin_client.get(url, {"fields": "id"}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_writes_change_the_etag(admin_client, match):
+    url = reverse("match-detail", args=[match.pk])
+    etag = admin_client.get(url)["ETag"]
+
+    admin_client.put(url, {"winner": match.player1_id}, format="json")
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["winner"] == match.player1_id
+    assert response["ETag"] != etag
+    assert admin_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+
+@pytest.mark.django_db
+def test_stale_bodies_keep_the_etag_they_were_computed_at(admin_client, match):
+    url = reverse("match-detail", args=[match.pk])
+    etag = admin_client.get(url)["ETag"]
+    invalidate_tags(f"match:{match.pk}")
+
+    # Another worker is refreshing: the stale body comes with its old ETag,
+    # so the client is not told that it already has the new version.
+    cache.add(f"lock:match_{match.pk}", "other-worker", 10)
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert response["ETag"] == etag
+    assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    cache.delete(f"lock:match_{match.pk}")
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
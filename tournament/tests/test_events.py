@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from tournament import events
+from tournament.events import Broadcaster, LocalBackend, event_stream
+from tournament.models import Tournament, Match
+from tournament.serializers import MatchSerializer
+from user.models import Player
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    broadcaster = Broadcaster(LocalBackend())
+    monkeypatch.setattr(events, "_broadcaster", broadcaster)
+    return broadcaster
+
+
+def test_one_event_fans_out_to_every_subscriber(broadcaster):
+    async def scenario():
+        async with broadcaster.subscribe("tournament-events:1") as first:
+            async with broadcaster.subscribe("tournament-events:1") as second:
+                async with broadcaster.subscribe("tournament-events:2") as other:
+                    await asyncio.sleep(0)
+                    broadcaster.publish("tournament-events:1", {"type": "result"})
+                    await asyncio.sleep(0)
+                    return first.qsize(), second.qsize(), other.qsize()
+
+    assert asyncio.run(scenario()) == (1, 1, 0)
+    assert broadcaster.subscribers == {}
+
+
+def test_stream_sends_heartbeats_and_events(broadcaster):
+    async def scenario():
+        stream = event_stream(1, heartbeat=0.01)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        broadcaster.publish("tournament-events:1", {"type": "pairings", "round": 2})
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        return chunks
+
+    connected, keep_alive, event = asyncio.run(scenario())
+    assert connected == ": connected\n\n"
+    assert keep_alive == ": keep-alive\n\n"
+    assert event.startswith("event: pairings\n")
+    assert json.loads(event.split("data: ")[1]) == {"type": "pairings", "round": 2}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_result_write_streams_result_and_standings(broadcaster):
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20,
+            rating=1500,
+            country="USA",
+        )
+        for i in range(2)
+    ]
+    tournament = Tournament.objects.create(
+        name="Live Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    match = Match.objects.create(
+        tournament=tournament, player1=players[0], player2=players[1], round_number=1
+    )
+
+    def write_result():
+        serializer = MatchSerializer(
+            match, data={"winner": players[1].id}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    async def scenario():
+        channel = events.tournament_channel(tournament.id)
+        async with broadcaster.subscribe(channel) as queue:
+            await asyncio.sleep(0)
+            await sync_to_async(write_result)()
+            return [await asyncio.wait_for(queue.get(), 1) for _ in range(2)]
+
+    received = {event["type"]: event for event in asyncio.run(scenario())}
+    assert received["result"]["winner"] == players[1].id
+    assert received["standings"]["deltas"] == {str(players[1].id): 1}
@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Match
+from user.models import Player
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500, 1501, 1502, 1503]
+
+
+@pytest.fixture
+def tournament(tournament, players):
+    for i in (0, 2):
+        Match.objects.create(
+            tournament=tournament,
+            player1=players[i],
+            player2=players[i + 1],
+            winner=players[i] if i else None,
+            round_number=1,
+        )
+    return tournament
+
+
+@pytest.mark.django_db
+def test_expanded_matches_are_loaded_with_one_query(
+    admin_client, tournament, django_assert_num_queries
+):
+    url = reverse("match-list-create")
+    params = {"fields": "id,player1,winner", "expand": "player1,winner"}
+    with django_assert_num_queries(1):
+        response = admin_client.get(url, params)
+    rows = response.json()["results"]
+    assert [sorted(row) for row in rows] == [["id", "player1", "winner"]] * 2
+    assert [row["player1"]["name"] for row in rows] == ["Player 0", "Player 2"]
+    assert rows[0]["winner"] is None
+    assert rows[1]["winner"]["rating"] == 1502
+
+    # Expanded players are tagged with players:list, so renames show up.
+    player = Player.objects.get(pk=rows[0]["player1"]["id"])
+    player.name = "Renamed"
+    player.save()
+    rows = admin_client.get(url, params).json()["results"]
+    assert rows[0]["player1"]["name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_sparse_and_expanded_scores(
+    admin_client, tournament, django_assert_num_queries
+):
+    url = reverse("tournament-detail", args=[tournament.pk])
+    response = admin_client.get(url, {"fields": "name,participant_count"})
+    assert response.json() == {"name": "Test Open", "participant_count": 4}
+
+    params = {"fields": "player,points", "expand": "player,tournament"}
+    with django_assert_num_queries(1):
+        response = admin_client.get(reverse("score-list-create"), params)
+    rows = response.json()["results"]
+    assert sorted(row["player"]["name"] for row in rows) == [
+        f"Player {i}" for i in range(4)
+    ]
+    # Only the requested fields are rendered, expanded or not.
+    assert {key for row in rows for key in row} == {"player", "points"}
+
+
+@pytest.mark.django_db
+def test_unknown_fields_and_expansions_are_rejected(admin_client, tournament):
+    url = reverse("score-list-create")
+    response = admin_client.get(url, {"fields": "id,elo"})
+    assert response.status_code == 400
+    assert response.json() == {"error": "Unknown fields: elo"}
+    response = admin_client.get(url, {"expand": "points"})
+    assert response.json() == {"error": "Unknown expansions: points"}
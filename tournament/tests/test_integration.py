@@ -3,6 +3,7 @@ from rest_framework.test import APIClient
 from django.urls import reverse
 from django.contrib.auth.models import User
 from tournament.models import Tournament, Match
+from tournament.serializers import TournamentSerializer
 from user.models import Player
 
 
@@ -27,3 +28,32 @@ def test_tournament_and_match_integration():
         },
     )
     assert response.status_code == 201
+
+
+@pytest.mark.django_db
+def test_tournament_participants_resolve_in_one_query(django_assert_num_queries):
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20,
+            rating=1500,
+            country="USA",
+        )
+        for i in range(5)
+    ]
+    data = {
+        "name": "Bulk Participants",
+        "start_date": "2024-07-01",
+        "end_date": "2024-07-10",
+        "participants": [player.id for player in players],
+    }
+    serializer = TournamentSerializer(data=data)
+    # One query for the unique name, one for all the participants.
+    with django_assert_num_queries(2):
+        assert serializer.is_valid(), serializer.errors
+    assert serializer.validated_data["participants"] == players
+
+    serializer = TournamentSerializer(data={**data, "participants": [0]})
+    assert not serializer.is_valid()
+    assert "participants" in serializer.errors
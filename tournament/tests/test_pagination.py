@@ -0,0 +1,51 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Tournament
+
+
+def create_tournaments(count, offset=0):
+    return [
+        Tournament.objects.create(
+            name=f"Open {offset + i}", start_date="2024-07-01", end_date="2024-07-10"
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_cursor_pages_walk_the_whole_list(admin_client):
+    tournaments = create_tournaments(5)
+    url = reverse("tournament-list-create") + "?page_size=2"
+
+    seen = []
+    while url:
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data["results"]) <= 2
+        seen.extend(row["id"] for row in response.data["results"])
+        url = response.data["next"]
+    assert seen == [t.id for t in tournaments]
+
+
+@pytest.mark.django_db
+def test_pages_are_cached_and_invalidated_on_write(
+    admin_client, django_assert_num_queries
+):
+    create_tournaments(3)
+    url = reverse("tournament-list-create") + "?page_size=10"
+    first = admin_client.get(url)
+    assert len(first.data["results"]) == 3
+
+    with django_assert_num_queries(0):
+        assert admin_client.get(url).data == first.data
+
+    admin_client.post(
+        reverse("tournament-list-create"),
+        {
+            "name": "Late Entry",
+            "start_date": "2024-07-01",
+            "end_date": "2024-07-10",
+            "participants": [],
+        },
+    )
+    assert len(admin_client.get(url).data["results"]) == 4
@@ -0,0 +1,99 @@
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from tournament.models import Match, Score
+from tournament.pairing import (
+    BLACK,
+    WHITE,
+    PairingPlayer,
+    SwissPairingStrategy,
+)
+
+
+def play_round(players, result, rng):
+    by_id = {player.id: player for player in players}
+    for white_id, black_id in result.pairs:
+        white, black = by_id[white_id], by_id[black_id]
+        white.opponents.add(black_id)
+        black.opponents.add(white_id)
+        white.colours.append(WHITE)
+        black.colours.append(BLACK)
+        rng.choice([white, black]).score += 1
+    if result.bye is not None:
+        by_id[result.bye].had_bye = True
+        by_id[result.bye].score += 1
+
+
+def test_swiss_rounds_respect_constraints():
+    rng = random.Random(7)
+    players = [PairingPlayer(id=i, rating=rng.randint(1000, 2800)) for i in range(41)]
+    strategy = SwissPairingStrategy()
+    byes = []
+
+    for _ in range(7):
+        result = strategy.pair(players)
+        by_id = {player.id: player for player in players}
+        seen = [pid for pair in result.pairs for pid in pair] + [result.bye]
+        assert sorted(seen) == sorted(by_id)
+        for white_id, black_id in result.pairs:
+            assert black_id not in by_id[white_id].opponents
+        byes.append(result.bye)
+        play_round(players, result, rng)
+
+    assert len(set(byes)) == len(byes)
+    for player in players:
+        assert abs(player.colour_balance) <= 2
+
+
+def test_first_round_pairs_top_half_against_bottom_half():
+    players = [PairingPlayer(id=i, rating=2000 - i) for i in range(8)]
+    result = SwissPairingStrategy().pair(players)
+    assert sorted(tuple(sorted(pair)) for pair in result.pairs) == [
+        (0, 4),
+        (1, 5),
+        (2, 6),
+        (3, 7),
+    ]
+
+
+def test_second_round_pairs_within_score_groups():
+    players = [PairingPlayer(id=i, rating=2000 - i) for i in range(8)]
+    strategy = SwissPairingStrategy()
+    play_round(players, strategy.pair(players), random.Random(0))
+    for player in players:
+        player.score = 1 if player.id < 4 else 0
+
+    result = strategy.pair(players)
+    for white_id, black_id in result.pairs:
+        assert (white_id < 4) == (black_id < 4)
+
+
+@pytest.fixture
+def player_ratings():
+    # An odd field, so the lowest rated player gets the bye.
+    return [1500 + i for i in range(5)]
+
+
+@pytest.mark.django_db
+def test_generate_pairings_endpoint_gives_bye(admin_client, tournament, players):
+    response = admin_client.post(
+        reverse("match-generate-pairings"),
+        {"tournament_id": tournament.id, "round_number": 1},
+    )
+    assert response.status_code == 202
+    assert response["Location"] == reverse("job-detail", args=[response.data["id"]])
+    assert response.data["status"] == "queued"
+    assert not Match.objects.filter(tournament=tournament).exists()
+
+    call_command("run_jobs", "--once", stdout=StringIO())
+    job = admin_client.get(response["Location"]).data
+    assert job["status"] == "succeeded"
+    assert len(job["result"]["matches"]) == 3
+
+    bye = Match.objects.get(tournament=tournament, player2__isnull=True)
+    assert bye.player1 == players[0]
+    assert bye.winner == players[0]
+    assert Score.objects.get(tournament=tournament, player=players[0]).points == 1
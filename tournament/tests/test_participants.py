@@ -0,0 +1,109 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Score, Tournament
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500 + i for i in range(6)]
+
+
+@pytest.fixture
+def participants():
+    # The tests enroll the players themselves.
+    return []
+
+
+def participant_ids(client, tournament, **params):
+    response = client.get(
+        reverse("tournament-participants", args=[tournament.pk]), params
+    )
+    assert response.status_code == 200
+    return [row["id"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_bulk_enroll_and_withdraw(
+    admin_client, tournament, players, django_assert_max_num_queries
+):
+    url = reverse("tournament-participants", args=[tournament.pk])
+    ids = [player.id for player in players]
+    # Existence check, one IN lookup, enrolled check, insert, standings rows,
+    # recount and the returned count, whatever the number of players.
+    with django_assert_max_num_queries(9):
+        response = admin_client.post(url, {"players": ids[:4]}, format="json")
+    assert response.json() == {"added": 4, "participant_count": 4}
+    assert participant_ids(admin_client, tournament) == ids[:4]
+
+    response = admin_client.post(url, {"players": ids}, format="json")
+    assert response.json() == {"added": 2, "participant_count": 6}
+    assert Score.objects.filter(tournament=tournament).count() == 6
+    detail = admin_client.get(reverse("tournament-detail", args=[tournament.pk]))
+    assert detail.json()["participant_count"] == 6
+    assert "participants" not in detail.json()
+
+    response = admin_client.delete(url, {"players": ids[1:3]}, format="json")
+    assert response.json() == {"removed": 2, "participant_count": 4}
+    assert participant_ids(admin_client, tournament, page_size=3) == [
+        ids[0],
+        ids[3],
+        ids[4],
+    ]
+    assert set(
+        Score.objects.filter(tournament=tournament).values_list("player", flat=True)
+    ) == {ids[0], *ids[3:]}
+
+
+@pytest.mark.django_db
+def test_enrollment_rejects_unknown_players(admin_client, tournament, players):
+    url = reverse("tournament-participants", args=[tournament.pk])
+    response = admin_client.post(url, {"players": [players[0].id, 0]}, format="json")
+    assert response.status_code == 400
+    assert "players" in response.json()
+    assert tournament.participants.count() == 0
+
+    missing = reverse("tournament-participants", args=[0])
+    assert admin_client.get(missing).status_code == 404
+    response = admin_client.post(missing, {"players": [players[0].id]}, format="json")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_participant_count_follows_orm_changes(admin_client, players):
+    response = admin_client.post(
+        reverse("tournament-list-create"),
+        {
+            "name": "Created Open",
+            "start_date": "2024-07-01",
+            "end_date": "2024-07-10",
+            "participants": [player.id for player in players[:3]],
+        },
+        format="json",
+    )
+    assert response.json()["participant_count"] == 3
+    tournament = Tournament.objects.get(pk=response.json()["id"])
+    tournament.participants.remove(players[0])
+    tournament.refresh_from_db()
+    assert tournament.participant_count == 2
+
+
+@pytest.mark.django_db
+def test_deleting_a_player_updates_participant_counts(admin_client, players):
+    first, second = (
+        Tournament.objects.create(
+            name=name, start_date="2024-07-01", end_date="2024-07-10"
+        )
+        for name in ("First Open", "Second Open")
+    )
+    first.participants.set(players[:3])
+    second.participants.set(players[:2])
+    url = reverse("tournament-detail", args=[first.pk])
+    assert admin_client.get(url).data["participant_count"] == 3
+
+    # The cascade deletes the participants rows without m2m_changed.
+    players[0].delete()
+    for tournament in (first, second):
+        tournament.refresh_from_db()
+        assert tournament.participant_count == tournament.participants.count()
+    assert (first.participant_count, second.participant_count) == (2, 1)
+    assert admin_client.get(url).data["participant_count"] == 2
@@ -0,0 +1,239 @@
+import random
+from io import StringIO
+
+import fakeredis
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from player.transfer import import_players
+from tournament import rank_index
+from tournament.models import Tournament, Match
+from tournament.standings import get_standings, rebuild_standings
+from user.models import Player
+
+
+@pytest.fixture
+def redis_index(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(rank_index, "_client", client)
+    return client
+
+
+@pytest.fixture
+def tournament():
+    rng = random.Random(7)
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20,
+            # Few distinct ratings, so some ties go down to the player id.
+            rating=1500 + rng.choice([0, 50, 100]),
+            country="USA",
+        )
+        for i in range(12)
+    ]
+    tournament = Tournament.objects.create(
+        name="Rank Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    for round_number in range(1, 4):
+        order = players[:]
+        rng.shuffle(order)
+        for white, black in zip(order[::2], order[1::2]):
+            Match.objects.create(
+                tournament=tournament,
+                player1=white,
+                player2=black,
+                winner=rng.choice([white, black]),
+                round_number=round_number,
+            )
+    rebuild_standings(tournament.id)
+    return tournament
+
+
+def standings_ids(tournament):
+    return list(get_standings(tournament.id).values_list("player_id", flat=True))
+
+
+def test_members_sort_like_the_standings():
+    rows = [(3, 10, 1500, 7), (3, 10, 1500, 2), (3, 12, 1400, 9), (4, 0, 0, 5)]
+    rows.append((-1, 0, 1200, 1))
+    members = sorted(rank_index.encode_member(row[:3], row[3]) for row in rows)
+    assert [rank_index.decode_member(member)[1] for member in members] == [
+        5,
+        9,
+        2,
+        7,
+        1,
+    ]
+    assert rank_index.decode_member(members[-1]) == ([-1, 0, 1200], 1)
+
+
+@pytest.mark.django_db
+def test_index_matches_the_leaderboard(redis_index, tournament):
+    expected = standings_ids(tournament)
+    assert [player.player_id for player in rank_index.top(tournament.id, 100)] == (
+        expected
+    )
+    assert [player.rank for player in rank_index.top(tournament.id, 3)] == [1, 2, 3]
+
+    player_id = expected[5]
+    assert rank_index.rank_of(tournament.id, player_id).rank == 6
+    window = rank_index.around(tournament.id, player_id, 2)
+    assert [player.player_id for player in window] == expected[3:8]
+    # The window is cut at the top of the standings.
+    window = rank_index.around(tournament.id, expected[0], 2)
+    assert [player.player_id for player in window] == expected[:3]
+    assert rank_index.rank_of(tournament.id, 0) is None
+
+
+@pytest.mark.django_db
+def test_result_writes_update_the_index(
+    admin_client, redis_index, tournament, django_capture_on_commit_callbacks
+):
+    rank_index.build(tournament.id)
+    last = standings_ids(tournament)[-1]
+    match = Match.objects.filter(tournament=tournament, player1_id=last).first() or (
+        Match.objects.filter(tournament=tournament, player2_id=last).first()
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.put(
+            reverse("match-detail", args=[match.pk]), {"winner": last}
+        )
+    assert response.status_code == 200
+    assert rank_index.check(tournament.id) == {"missing": [], "extra": [], "stale": []}
+    assert [player.player_id for player in rank_index.top(tournament.id, 100)] == (
+        standings_ids(tournament)
+    )
+
+    withdrawn = standings_ids(tournament)[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.delete(
+            reverse("tournament-participants", args=[tournament.pk]),
+            {"players": [withdrawn]},
+            format="json",
+        )
+    assert rank_index.rank_of(tournament.id, withdrawn) is None
+    assert rank_index.check(tournament.id) == {"missing": [], "extra": [], "stale": []}
+
+
+@pytest.mark.django_db
+def test_imported_ratings_reorder_the_index(
+    redis_index, django_capture_on_commit_callbacks
+):
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Player {i}",
+            age=20,
+            rating=1500 + 100 * i,
+            country="USA",
+        )
+        for i in range(4)
+    ]
+    tournament = Tournament.objects.create(
+        name="Unplayed Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    rebuild_standings(tournament.id)
+    rank_index.build(tournament.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        # Nobody has played yet: the ratings alone decide the order.
+        import_players(
+            {
+                "username": player.user.username,
+                "name": player.name,
+                "age": player.age,
+                "rating": 3000 - player.rating,
+                "country": player.country,
+            }
+            for player in players
+        )
+    expected = [player.id for player in players]
+    assert standings_ids(tournament) == expected
+    assert [player.player_id for player in rank_index.top(tournament.id, 10)] == (
+        expected
+    )
+    assert rank_index.check(tournament.id) == {"missing": [], "extra": [], "stale": []}
+
+
+@pytest.mark.django_db
+def test_deletes_update_the_index_once(
+    redis_index, tournament, django_capture_on_commit_callbacks
+):
+    rank_index.build(tournament.id)
+    leaver = standings_ids(tournament)[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        Player.objects.get(pk=leaver).delete()
+    assert rank_index.rank_of(tournament.id, leaver) is None
+    assert rank_index.check(tournament.id) == {"missing": [], "extra": [], "stale": []}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tournament.delete()
+    assert not redis_index.exists(*rank_index.index_keys(tournament.id))
+
+
+@pytest.mark.django_db
+def test_rank_endpoints(redis_index, tournament):
+    client = APIClient()
+    expected = standings_ids(tournament)
+    url = reverse("tournament-ranks", args=[tournament.pk])
+
+    response = client.get(url, {"limit": 3})
+    assert [row["id"] for row in response.data] == expected[:3]
+    first = response.data[0]
+    assert first["rank"] == 1
+    assert first["name"] == Player.objects.get(pk=expected[0]).name
+    assert set(first) == {
+        "rank",
+        "id",
+        "name",
+        "points",
+        "buchholz",
+        "median_buchholz",
+        "sonneborn_berger",
+        "progressive",
+        "rating",
+    }
+    assert client.get(url, {"limit": "all"}).status_code == 400
+
+    url = reverse("tournament-player-rank", args=[tournament.pk, expected[4]])
+    assert client.get(url).data["rank"] == 5
+    response = client.get(url, {"around": 1})
+    assert [row["id"] for row in response.data] == expected[3:6]
+    assert [row["rank"] for row in response.data] == [4, 5, 6]
+    response = client.get(reverse("tournament-player-rank", args=[tournament.pk, 0]))
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_check_and_rebuild_commands(redis_index, tournament):
+    out = StringIO()
+    call_command("check_rank_index", tournament.id, stdout=out)
+    assert "not built" in out.getvalue()
+
+    call_command("rebuild_rank_index", tournament.id, stdout=StringIO())
+    call_command("check_rank_index", tournament.id, stdout=StringIO())
+
+    zset, members = rank_index.index_keys(tournament.id)
+    ids = standings_ids(tournament)
+    redis_index.zrem(zset, redis_index.hget(members, ids[0]))
+    redis_index.hdel(members, ids[1])
+    redis_index.hset(members, "0", rank_index.encode_member([0, 0, 0, 0, 0, 0], 0))
+    with pytest.raises(CommandError):
+        call_command("check_rank_index", stdout=StringIO())
+    assert rank_index.check(tournament.id) == {
+        "missing": [ids[1]],
+        "extra": [0],
+        "stale": [ids[0]],
+    }
+
+    out = StringIO()
+    call_command("check_rank_index", "--repair", stdout=out)
+    assert "rebuilt" in out.getvalue()
+    assert rank_index.check(tournament.id) == {"missing": [], "extra": [], "stale": []}
@@ -0,0 +1,190 @@
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from tournament import ratings as ratings_module
+from tournament.jobs import RATE_ROUND, RECOMPUTE_RATINGS
+from tournament.models import Match
+from tournament.ratings import (
+    apply_round_ratings,
+    k_factors,
+    rate_period,
+    recompute_all_ratings,
+)
+from user.models import Player
+
+
+def elo(rating, opponent, score, k):
+    return rating + k * (score - 1 / (1 + 10 ** ((opponent - rating) / 400)))
+
+
+@pytest.fixture
+def player_ratings():
+    return [2500, 2100, 1800, 1500, 1400]
+
+
+def run_queued_jobs():
+    for job in claim_jobs("worker-1"):
+        run_job(job)
+
+
+def ratings(players):
+    return dict(Player.objects.values_list("id", "rating"))
+
+
+def test_k_factors():
+    result = k_factors(np.array([2500.0, 2500.0, 2000.0]), np.array([10, 50, 50]))
+    assert result.tolist() == [40.0, 10.0, 20.0]
+
+
+def test_period_uses_start_of_period_ratings():
+    ratings = np.array([1500.0, 1500.0, 1500.0])
+    games = np.array([50, 50, 50])
+    # Player 0 beats 1 and 2 in the same period.
+    rate_period(ratings, games, np.array([0, 0]), np.array([1, 2]), np.ones(2))
+    assert ratings.tolist() == [1520.0, 1490.0, 1490.0]
+    assert games.tolist() == [52, 51, 51]
+
+
+@pytest.mark.django_db
+def test_round_ratings_match_scalar_elo(tournament, players):
+    a, b, c, d, e = players
+    Match.objects.create(
+        tournament=tournament, player1=a, player2=b, winner=b, round_number=1
+    )
+    Match.objects.create(
+        tournament=tournament, player1=c, player2=d, winner=c, round_number=1
+    )
+    # Byes and unfinished games are not rated.
+    Match.objects.create(tournament=tournament, player1=e, winner=e, round_number=1)
+
+    assert apply_round_ratings(tournament.id, 1) == 2
+
+    after = ratings(players)
+    assert after[a.id] == round(elo(2500, 2100, 0, 40))
+    assert after[b.id] == round(elo(2100, 2500, 1, 40))
+    assert after[c.id] == round(elo(1800, 1500, 1, 40))
+    assert after[d.id] == round(elo(1500, 1800, 0, 40))
+    assert after[e.id] == 1400
+    assert Player.objects.get(id=a.id).rated_games == 1
+    assert Player.objects.get(id=e.id).rated_games == 0
+
+    assert apply_round_ratings(tournament.id, 1) == 0
+    assert ratings(players) == after
+
+
+@pytest.mark.django_db
+def test_recompute_replays_history_in_order(tournament, players):
+    a, b, c = players[:3]
+    Match.objects.create(
+        tournament=tournament, player1=a, player2=b, winner=a, round_number=1
+    )
+    Match.objects.create(
+        tournament=tournament, player1=c, player2=a, winner=c, round_number=2
+    )
+
+    assert recompute_all_ratings(initial_rating=1500) == 2
+
+    a1, b1 = elo(1500, 1500, 1, 40), elo(1500, 1500, 0, 40)
+    c2, a2 = elo(1500, a1, 1, 40), elo(a1, 1500, 0, 40)
+    after = ratings(players)
+    assert after[a.id] == round(a2)
+    assert after[b.id] == round(b1)
+    assert after[c.id] == round(c2)
+    assert after[players[3].id] == 1500
+    assert not Match.objects.filter(rated=False).exists()
+
+
+@pytest.mark.django_db
+def test_only_changed_players_are_written_and_invalidated(
+    tournament, players, monkeypatch
+):
+    a, b = players[:2]
+    Match.objects.create(
+        tournament=tournament, player1=a, player2=b, winner=a, round_number=1
+    )
+    bumped = []
+    monkeypatch.setattr(
+        ratings_module, "invalidate_tags_on_commit", lambda *tags: bumped.extend(tags)
+    )
+
+    recompute_all_ratings(initial_rating=1500)
+    # Player 3 already has 1500 and played no game: it is left alone.
+    assert sorted(bumped) == sorted(
+        ["players:list"] + [f"player:{p.id}" for p in players if p != players[3]]
+    )
+    bumped.clear()
+
+    # Replaying the same history changes nothing.
+    recompute_all_ratings(initial_rating=1500)
+    assert bumped == []
+
+
+@pytest.mark.django_db
+def test_update_ratings_command_rates_pending_rounds(tournament, players):
+    a, b = players[:2]
+    Match.objects.create(
+        tournament=tournament, player1=a, player2=b, winner=a, round_number=1
+    )
+    Match.objects.create(
+        tournament=tournament, player1=b, player2=a, winner=b, round_number=2
+    )
+
+    call_command("update_ratings")
+
+    assert not Match.objects.filter(rated=False).exists()
+    assert Player.objects.get(id=a.id).rated_games == 2
+
+
+@pytest.mark.django_db
+def test_completing_a_round_queues_its_ratings(admin_client, tournament, players):
+    a, b, c, d = players[:4]
+    first = Match.objects.create(
+        tournament=tournament, player1=a, player2=b, round_number=1
+    )
+    second = Match.objects.create(
+        tournament=tournament, player1=c, player2=d, round_number=1
+    )
+    url = reverse("tournament-round-results", args=[tournament.id, 1])
+
+    admin_client.post(
+        url, {"results": [{"match": first.id, "winner": a.id}]}, format="json"
+    )
+    assert not Job.objects.exists()
+
+    admin_client.post(
+        url, {"results": [{"match": second.id, "winner": d.id}]}, format="json"
+    )
+    assert list(Job.objects.values_list("kind", flat=True)) == [RATE_ROUND]
+
+    run_queued_jobs()
+    assert not Match.objects.filter(rated=False).exists()
+    assert all(p.rated_games == 1 for p in Player.objects.filter(id__in=[a.id, d.id]))
+
+
+@pytest.mark.django_db
+def test_changing_a_rated_result_replays_the_ratings(admin_client, tournament, players):
+    a, b, c = players[:3]
+    changed = Match.objects.create(
+        tournament=tournament, player1=a, player2=b, winner=a, round_number=1
+    )
+    Match.objects.create(
+        tournament=tournament, player1=a, player2=c, winner=c, round_number=2
+    )
+    recompute_all_ratings()
+
+    response = admin_client.put(
+        reverse("match-detail", args=[changed.id]), {"winner": b.id}, format="json"
+    )
+    assert response.status_code == 200
+    assert not Match.objects.get(id=changed.id).rated
+    assert list(Job.objects.values_list("kind", flat=True)) == [RECOMPUTE_RATINGS]
+
+    run_queued_jobs()
+    replayed = ratings(players)
+    assert not Match.objects.filter(rated=False).exists()
+    # The same as replaying the corrected history from scratch.
+    recompute_all_ratings()
+    assert ratings(players) == replayed
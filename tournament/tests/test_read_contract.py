@@ -0,0 +1,75 @@
+"""The values() read path must render exactly what the serializers do."""
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+from player.serializers import PlayerSerializer
+from tournament.models import Match, Tournament
+from tournament.serializers import (
+    MatchSerializer,
+    ScoreSerializer,
+    TournamentSerializer,
+)
+from user.models import Player
+
+CASES = [
+    (PlayerSerializer, {}),
+    (PlayerSerializer, {"fields": ["country", "name"]}),
+    (TournamentSerializer, {}),
+    (TournamentSerializer, {"fields": ["end_date", "participant_count"]}),
+    (MatchSerializer, {}),
+    (MatchSerializer, {"expand": ["player1", "player2", "tournament", "winner"]}),
+    (MatchSerializer, {"fields": ["player2", "winner"], "expand": ["player2"]}),
+    (ScoreSerializer, {}),
+    (ScoreSerializer, {"fields": ["player", "points"], "expand": ["player"]}),
+]
+
+
+@pytest.fixture
+def tournament():
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(username=f"player{i}", password="password"),
+            name=f"Plåyer {i}",
+            age=20 + i,
+            rating=1500 + i,
+            country="NOR",
+        )
+        for i in range(3)
+    ]
+    tournament = Tournament.objects.create(
+        name="Contract Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    Match.objects.create(
+        tournament=tournament,
+        player1=players[0],
+        player2=players[1],
+        winner=players[1],
+        round_number=1,
+    )
+    # A bye and an undecided game: expanded relations render as null.
+    Match.objects.create(
+        tournament=tournament, player1=players[2], winner=players[2], round_number=1
+    )
+    Match.objects.create(
+        tournament=tournament, player1=players[2], player2=players[0], round_number=2
+    )
+    return tournament
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "serializer_class, params",
+    CASES,
+    ids=[f"{cls.__name__}-{'-'.join(map(str, p.values()))}" for cls, p in CASES],
+)
+def test_values_reader_matches_serializer(serializer_class, params, tournament):
+    model = serializer_class.Meta.model
+    queryset = model.objects.order_by("id")
+    expected = serializer_class(queryset, many=True, **params).data
+    reader = serializer_class.values_reader(**params)
+    rendered = reader.render(reader.queryset(queryset))
+    assert len(rendered) == model.objects.count()
+    # Compare the rendered JSON so key order and value types count too.
+    assert JSONRenderer().render(rendered) == JSONRenderer().render(expected)
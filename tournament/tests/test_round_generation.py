@@ -0,0 +1,260 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from tournament.models import Tournament, Match, Score
+from tournament.serializers import MatchSerializer
+from tournament.utils import generate_swiss_pairings
+from user.models import Player
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="needs row locks (PostgreSQL)"
+)
+
+
+def create_tournament(name, size=5):
+    players = [
+        Player.objects.create(
+            user=User.objects.create_user(
+                username=f"{name}-{i}".lower().replace(" ", "-"), password="password"
+            ),
+            name=f"{name} {i}",
+            age=20,
+            rating=1500 + i,
+            country="USA",
+        )
+        for i in range(size)
+    ]
+    tournament = Tournament.objects.create(
+        name=name, start_date="2024-07-01", end_date="2024-07-10"
+    )
+    tournament.participants.set(players)
+    return tournament, players
+
+
+def pairings(tournament_id, round_number=1):
+    return sorted(
+        Match.objects.filter(
+            tournament_id=tournament_id, round_number=round_number
+        ).values_list("player1_id", "player2_id")
+    )
+
+
+@pytest.mark.django_db
+def test_generating_a_round_again_returns_the_existing_pairings():
+    tournament, players = create_tournament("Retry Open")
+    first = generate_swiss_pairings(tournament.id, 1)
+    again = generate_swiss_pairings(tournament.id, 1)
+
+    assert [match.pk for match in again] == [match.pk for match in first]
+    assert Match.objects.filter(tournament=tournament).count() == 3
+    # The bye was only scored once.
+    assert Score.objects.get(tournament=tournament, player=players[0]).points == 1
+
+
+@pytest.mark.django_db
+def test_a_player_has_one_board_per_round():
+    tournament, players = create_tournament("Constraint Open", size=4)
+    Match.objects.create(
+        tournament=tournament, player1=players[0], player2=players[1], round_number=1
+    )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Match.objects.create(
+            tournament=tournament,
+            player1=players[0],
+            player2=players[2],
+            round_number=1,
+        )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Match.objects.create(
+            tournament=tournament,
+            player1=players[2],
+            player2=players[2],
+            round_number=1,
+        )
+    Match.objects.create(tournament=tournament, player1=players[2], round_number=1)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Match.objects.create(tournament=tournament, player1=players[3], round_number=1)
+
+    # The API also catches a player switching columns.
+    serializer = MatchSerializer(
+        data={
+            "tournament": tournament.id,
+            "player1": players[3].id,
+            "player2": players[1].id,
+            "round_number": 1,
+        }
+    )
+    assert not serializer.is_valid()
+    assert "round_number" in serializer.errors
+    serializer = MatchSerializer(
+        data={
+            "tournament": tournament.id,
+            "player1": players[3].id,
+            "player2": players[1].id,
+            "round_number": 2,
+        }
+    )
+    assert serializer.is_valid(), serializer.errors
+
+
+@postgres_only
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_generation_creates_each_round_once():
+    tournaments = [create_tournament(f"Stress Open {i}", size=9)[0] for i in range(3)]
+    requests = [tournament.id for tournament in tournaments for _ in range(8)]
+    barrier = threading.Barrier(len(requests))
+
+    def generate(tournament_id):
+        try:
+            barrier.wait()
+            return tournament_id, sorted(
+                match.pk for match in generate_swiss_pairings(tournament_id, 1)
+            )
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(len(requests)) as pool:
+        results = list(pool.map(generate, requests))
+
+    for tournament in tournaments:
+        returned = {tuple(pks) for tid, pks in results if tid == tournament.id}
+        # Every request saw the same five matches.
+        assert len(returned) == 1
+        assert len(returned.pop()) == 5
+        assert len(pairings(tournament.id)) == 5
+        bye_player = Match.objects.get(
+            tournament=tournament, player2__isnull=True
+        ).player1_id
+        assert (
+            Score.objects.get(tournament=tournament, player_id=bye_player).points == 1
+        )
+
+
+@postgres_only
+@pytest.mark.django_db(transaction=True)
+def test_generation_only_waits_for_its_own_tournament():
+    locked, _ = create_tournament("Locked Open")
+    other, _ = create_tournament("Other Open")
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        try:
+            with transaction.atomic():
+                Tournament.objects.select_for_update().get(pk=locked.pk)
+                holding.set()
+                release.wait(10)
+        finally:
+            connection.close()
+
+    def generate(tournament_id):
+        try:
+            return generate_swiss_pairings(tournament_id, 1)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(3) as pool:
+        holder = pool.submit(hold_lock)
+        assert holding.wait(10)
+        blocked = pool.submit(generate, locked.id)
+        # Another tournament is paired while the first one is locked.
+        assert len(pool.submit(generate, other.id).result(timeout=10)) == 3
+        assert not blocked.done()
+        release.set()
+        holder.result(timeout=10)
+        assert len(blocked.result(timeout=10)) == 3
+
+
+@contextmanager
+def before_round_constraints():
+    """Historical models of a database migrated back to before 0008."""
+    before = [("tournament", "0007_tournament_participant_count")]
+    executor = MigrationExecutor(connection)
+    executor.migrate(before)
+    try:
+        # Other apps stay migrated.
+        state = before + executor.loader.graph.leaf_nodes("user")
+        yield executor.loader.project_state(state).apps
+    finally:
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+def migrate_round_constraints():
+    executor = MigrationExecutor(connection)
+    executor.migrate([("tournament", "0008_match_round_constraints")])
+
+
+def create_boards(apps):
+    """A round generated twice, plus a second round, before 0008."""
+    OldUser = apps.get_model("auth", "User")
+    OldPlayer = apps.get_model("user", "Player")
+    OldTournament = apps.get_model("tournament", "Tournament")
+    OldMatch = apps.get_model("tournament", "Match")
+    a, b, c, d, e = [
+        OldPlayer.objects.create(
+            user=OldUser.objects.create(username=f"dup-{i}"),
+            name=f"Dup {i}",
+            age=20,
+            country="USA",
+        )
+        for i in range(5)
+    ]
+    tournament = OldTournament.objects.create(
+        name="Duplicate Open", start_date="2024-07-01", end_date="2024-07-10"
+    )
+
+    def board(white, black=None, winner=None, round_number=1):
+        return OldMatch.objects.create(
+            tournament=tournament,
+            player1=white,
+            player2=black,
+            winner=winner,
+            round_number=round_number,
+        ).pk
+
+    # Only the second copy of the round has a result.
+    kept = [board(a, b), board(e)]
+    duplicates = [board(b, c), board(d, c, winner=d), board(e), board(e, e)]
+    kept.append(duplicates.pop(1))
+    kept.append(board(b, a, round_number=2))
+    return (a, b, c, d, e), kept, duplicates
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_removes_duplicate_boards():
+    with before_round_constraints() as apps:
+        _, kept, _ = create_boards(apps)
+
+        migrate_round_constraints()
+        OldMatch = apps.get_model("tournament", "Match")
+        assert sorted(OldMatch.objects.values_list("pk", flat=True)) == sorted(kept)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_stops_at_decided_duplicates():
+    with before_round_constraints() as apps:
+        (_, _, c, d, _), kept, duplicates = create_boards(apps)
+        OldMatch = apps.get_model("tournament", "Match")
+        # d vs c already has a result, and this one contradicts it.
+        conflict = OldMatch.objects.create(
+            tournament_id=OldMatch.objects.get(pk=kept[0]).tournament_id,
+            player1=d,
+            player2=c,
+            winner=c,
+            round_number=1,
+        ).pk
+
+        with pytest.raises(RuntimeError, match=f"results: {conflict}\\."):
+            migrate_round_constraints()
+        assert OldMatch.objects.filter(pk__in=duplicates).count() == 3
+
+        # Resolved by hand, the migration goes through.
+        OldMatch.objects.filter(pk=conflict).delete()
+        migrate_round_constraints()
+        assert sorted(OldMatch.objects.values_list("pk", flat=True)) == sorted(kept)
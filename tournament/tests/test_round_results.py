@@ -0,0 +1,63 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Match, Score
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500] * 6
+
+
+@pytest.fixture
+def round_matches(tournament, players):
+    return [
+        Match.objects.create(
+            tournament=tournament,
+            player1=players[i],
+            player2=players[i + 1],
+            round_number=1,
+        )
+        for i in range(0, 6, 2)
+    ]
+
+
+def results_url(match):
+    return reverse("tournament-round-results", args=[match.tournament_id, 1])
+
+
+@pytest.mark.django_db
+def test_round_results_apply_in_bulk(
+    admin_client, round_matches, django_assert_max_num_queries
+):
+    payload = {
+        "results": [
+            {"match": match.id, "winner": match.player2_id} for match in round_matches
+        ]
+    }
+    # Completing the round also queues its rating update (4 statements).
+    with django_assert_max_num_queries(18):
+        response = admin_client.post(
+            results_url(round_matches[0]), payload, format="json"
+        )
+    assert response.status_code == 200
+    assert response.data["updated"] == 3
+
+    winners = {match.player2_id for match in round_matches}
+    scores = Score.objects.filter(tournament_id=round_matches[0].tournament_id)
+    assert {s.player_id for s in scores if s.points == 1} == winners
+    assert Match.objects.filter(winner__isnull=False).count() == 3
+
+
+@pytest.mark.django_db
+def test_round_results_reject_invalid_rows(admin_client, round_matches):
+    payload = {
+        "results": [
+            {"match": round_matches[0].id, "winner": round_matches[1].player1_id},
+            {"match": 999999, "winner": None},
+        ]
+    }
+    response = admin_client.post(results_url(round_matches[0]), payload, format="json")
+    assert response.status_code == 400
+    assert "winner" in response.data["results"][0]
+    assert "match" in response.data["results"][1]
+    assert not Match.objects.filter(winner__isnull=False).exists()
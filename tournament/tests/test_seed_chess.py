@@ -0,0 +1,75 @@
+from operator import itemgetter
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from tournament.models import Match, Score, Tournament
+from tournament.standings import rebuild_standings
+from tournament.tiebreaks import TIEBREAKS
+from user.models import Player
+
+
+def seed(prefix, seed=7):
+    call_command(
+        "seed_chess",
+        players=40,
+        tournaments=3,
+        participants=9,
+        rounds=4,
+        seed=seed,
+        prefix=prefix,
+        batch_size=25,
+    )
+
+
+def history(prefix):
+    matches = Match.objects.filter(tournament__name__startswith=prefix).order_by("id")
+    return [
+        (
+            match.tournament.name.removeprefix(prefix),
+            match.round_number,
+            match.player1.name,
+            match.player2.name if match.player2 else None,
+            match.winner.name,
+        )
+        for match in matches.select_related(
+            "tournament", "player1", "player2", "winner"
+        )
+    ]
+
+
+@pytest.mark.django_db
+def test_seed_chess_inserts_consistent_tournaments(copy_path):
+    # Byes and ``last_login`` are NULLs written through the COPY encoding.
+    seed("a")
+
+    assert User.objects.filter(username__startswith="a-").count() == 40
+    assert not User.objects.filter(last_login__isnull=False).exists()
+    assert Player.objects.count() == 40
+    assert User.objects.get(username="a-0").check_password("password")
+    tournaments = Tournament.objects.filter(name__startswith="a ")
+    assert tournaments.count() == 3
+    for tournament in tournaments:
+        assert tournament.participants.count() == 9
+        assert tournament.participant_count == 9
+        # Four rounds of four boards plus a bye.
+        assert Match.objects.filter(tournament=tournament).count() == 20
+
+        fields = ["player_id", "points", *TIEBREAKS]
+        seeded = list(Score.objects.filter(tournament=tournament).values(*fields))
+        rebuild_standings(tournament.id)
+        rebuilt = list(Score.objects.filter(tournament=tournament).values(*fields))
+        assert sorted(seeded, key=itemgetter("player_id")) == sorted(
+            rebuilt, key=itemgetter("player_id")
+        )
+
+
+@pytest.mark.django_db
+def test_seed_chess_is_deterministic():
+    seed("a")
+    seed("b")
+    assert history("a") == history("b")
+
+    with pytest.raises(CommandError):
+        seed("a")
@@ -0,0 +1,110 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from tournament.models import Match, Score
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500 - i * 100 for i in range(3)]
+
+
+def points(tournament):
+    return dict(
+        Score.objects.filter(tournament=tournament).values_list("player_id", "points")
+    )
+
+
+@pytest.mark.django_db
+def test_adding_participants_creates_standings_rows(tournament, players):
+    assert points(tournament) == {player.id: 0 for player in players}
+
+
+@pytest.mark.django_db
+def test_match_result_updates_standings(admin_client, tournament, players):
+    match = Match.objects.create(
+        tournament=tournament, player1=players[0], player2=players[1], round_number=1
+    )
+    url = reverse("match-detail", args=[match.pk])
+
+    response = admin_client.put(url, {"winner": players[1].id})
+    assert response.status_code == 200
+    assert points(tournament)[players[1].id] == 1
+
+    response = admin_client.put(url, {"winner": players[0].id})
+    assert response.status_code == 200
+    assert points(tournament)[players[0].id] == 1
+    assert points(tournament)[players[1].id] == 0
+
+    response = admin_client.put(url, {"winner": players[2].id})
+    assert response.status_code == 400
+
+    admin_client.delete(url)
+    assert points(tournament)[players[0].id] == 0
+
+
+@pytest.mark.django_db
+def test_leaderboard_is_one_query(
+    admin_client, tournament, players, django_assert_num_queries
+):
+    Match.objects.create(
+        tournament=tournament,
+        player1=players[1],
+        player2=players[2],
+        winner=players[2],
+        round_number=1,
+    )
+    call_command("rebuild_standings", tournament.id)
+
+    url = reverse("tournament-leaderboard", args=[tournament.pk])
+    with django_assert_num_queries(1):
+        response = admin_client.get(url)
+    # players[1] outranks the higher rated players[0] on Buchholz.
+    assert [row["id"] for row in response.data] == [
+        players[2].id,
+        players[1].id,
+        players[0].id,
+    ]
+    assert response.data[0]["points"] == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_endpoint_queues_a_job(admin_client, tournament, players, monkeypatch):
+    published = []
+    monkeypatch.setattr(
+        "tournament.jobs.publish_event",
+        lambda tournament_id, event: published.append((tournament_id, event)),
+    )
+    Match.objects.create(
+        tournament=tournament,
+        player1=players[0],
+        player2=players[1],
+        winner=players[1],
+        round_number=1,
+    )
+    Score.objects.filter(tournament=tournament).update(points=5)
+
+    url = reverse("tournament-leaderboard-rebuild", args=[tournament.pk])
+    response = admin_client.post(url)
+    assert response.status_code == 202
+    # Asking again while it is queued returns the same job.
+    assert admin_client.post(url).data["id"] == response.data["id"]
+    assert (
+        admin_client.post(
+            reverse("tournament-leaderboard-rebuild", args=[0])
+        ).status_code
+        == 404
+    )
+
+    call_command("run_jobs", "--once", stdout=StringIO())
+    assert points(tournament) == {
+        players[0].id: 0,
+        players[1].id: 1,
+        players[2].id: 0,
+    }
+    ((tournament_id, event),) = published
+    assert tournament_id == tournament.pk
+    assert (event["type"], event["id"]) == ("job", response.data["id"])
+    assert event["status"] == "succeeded"
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from django.urls import reverse
+from tournament.models import Match
+
+
+@pytest.fixture
+def player_ratings():
+    return [1500 + i for i in range(8)]
+
+
+@pytest.fixture
+def matches(tournament, players):
+    return [
+        Match.objects.create(
+            tournament=tournament,
+            player1=players[i],
+            player2=players[(i + 1) % 8],
+            winner=players[i],
+            round_number=1 + i % 2,
+        )
+        for i in range(7)
+    ]
+
+
+def streamed(response):
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.mark.django_db
+def test_streamed_list_matches_the_paginated_one(admin_client, matches, settings):
+    # Seven rows over chunks of three: two full chunks and a partial one.
+    settings.API_STREAM_CHUNK_SIZE = 3
+    for name in ("match-list-create", "tournament-list-create", "score-list-create"):
+        url = reverse(name)
+        paginated = admin_client.get(url, {"page_size": 100}).json()["results"]
+        assert streamed(admin_client.get(url, {"stream": "true"})) == paginated
+
+
+@pytest.mark.django_db
+def test_streamed_list_is_an_empty_array_without_rows(admin_client):
+    response = admin_client.get(reverse("match-list-create"), {"stream": "1"})
+    assert streamed(response) == []
+
+
+@pytest.mark.django_db
+def test_streamed_player_list_applies_filters(admin_client, matches):
+    response = admin_client.get(
+        reverse("player-list-create"),
+        {"stream": "true", "ordering": "-rating", "search": "player 1"},
+    )
+    assert [row["name"] for row in streamed(response)] == ["Player 1"]
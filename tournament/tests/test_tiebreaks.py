@@ -0,0 +1,128 @@
+import pytest
+from django.urls import reverse
+from tournament.models import Match, Score
+from tournament.standings import rebuild_standings
+from tournament.tiebreaks import TIEBREAKS, load_neighbourhood
+
+
+@pytest.fixture
+def player_ratings():
+    # The fourth player is rated highest, so only tiebreaks can rank it lower.
+    return [1500, 1500, 1500, 2000]
+
+
+def play_round(client, tournament, round_number, games):
+    matches = [
+        Match.objects.create(
+            tournament=tournament,
+            player1=white,
+            player2=black,
+            round_number=round_number,
+        )
+        for white, black, _ in games
+    ]
+    url = reverse("tournament-round-results", args=[tournament.pk, round_number])
+    payload = {
+        "results": [
+            {"match": match.id, "winner": winner.id}
+            for match, (_, _, winner) in zip(matches, games)
+        ]
+    }
+    assert client.post(url, payload, format="json").status_code == 200
+
+
+def tiebreaks(tournament):
+    return {
+        score.player_id: {name: getattr(score, name) for name in TIEBREAKS}
+        for score in Score.objects.filter(tournament=tournament)
+    }
+
+
+@pytest.mark.django_db
+def test_tiebreaks_follow_each_result(admin_client, tournament, players):
+    a, b, c, d = players
+    play_round(admin_client, tournament, 1, [(a, b, a), (c, d, c)])
+    play_round(admin_client, tournament, 2, [(a, c, a), (d, b, d)])
+    play_round(admin_client, tournament, 3, [(c, b, c), (a, d, a)])
+
+    # Final points: a 3, b 0, c 2, d 1.
+    expected = {
+        a.id: {
+            "buchholz": 3,
+            "median_buchholz": 1,
+            "sonneborn_berger": 3,
+            "progressive": 6,
+        },
+        b.id: {
+            "buchholz": 6,
+            "median_buchholz": 2,
+            "sonneborn_berger": 0,
+            "progressive": 0,
+        },
+        c.id: {
+            "buchholz": 4,
+            "median_buchholz": 1,
+            "sonneborn_berger": 1,
+            "progressive": 4,
+        },
+        d.id: {
+            "buchholz": 5,
+            "median_buchholz": 2,
+            "sonneborn_berger": 0,
+            "progressive": 2,
+        },
+    }
+    assert tiebreaks(tournament) == expected
+
+    rebuild_standings(tournament.id)
+    assert tiebreaks(tournament) == expected
+
+
+@pytest.mark.django_db
+def test_corrections_update_the_neighbourhood(admin_client, tournament, players):
+    a, b, c, d = players
+    play_round(admin_client, tournament, 1, [(a, b, a), (c, d, c)])
+    play_round(admin_client, tournament, 2, [(a, c, a), (d, b, d)])
+
+    # a met b and c, who met d: the opponents' opponents are read too.
+    index, points, last_round = load_neighbourhood(tournament.id, [a.id])
+    assert set(index) == {a.id, b.id, c.id, d.id}
+    assert (points, last_round) == ({a.id: 2, c.id: 1, d.id: 1}, 2)
+
+    match = Match.objects.get(tournament=tournament, round_number=1, player1=a)
+    response = admin_client.put(
+        reverse("match-detail", args=[match.pk]), {"winner": b.id}, format="json"
+    )
+    assert response.status_code == 200
+    incremental = tiebreaks(tournament)
+    rebuild_standings(tournament.id)
+    assert tiebreaks(tournament) == incremental
+
+
+@pytest.mark.django_db
+def test_neighbourhood_skips_unrelated_games(admin_client, tournament, players):
+    a, b, c, d = players
+    play_round(admin_client, tournament, 1, [(a, b, a), (c, d, c)])
+
+    index, points, last_round = load_neighbourhood(tournament.id, [a.id])
+    assert set(index) == {a.id, b.id}
+    assert (points, last_round) == ({a.id: 1}, 1)
+
+
+@pytest.mark.django_db
+def test_leaderboard_orders_ties_by_configured_rules(admin_client, tournament, players):
+    a, b, c, d = players
+    play_round(admin_client, tournament, 1, [(a, b, a), (c, d, c)])
+    play_round(admin_client, tournament, 2, [(a, c, a), (d, b, d)])
+    url = reverse("tournament-leaderboard", args=[tournament.pk])
+
+    # c and d share one point; c faced stronger opposition.
+    response = admin_client.get(url)
+    assert [row["id"] for row in response.data] == [a.id, c.id, d.id, b.id]
+    assert response.data[1]["buchholz"] == 3
+
+    response = admin_client.get(url, {"tiebreaks": ""})
+    assert [row["id"] for row in response.data] == [a.id, d.id, c.id, b.id]
+
+    response = admin_client.get(url, {"tiebreaks": "progressive,koya"})
+    assert response.status_code == 400
@@ -0,0 +1,205 @@
+"""Buchholz-family tiebreaks, computed from an opponent index.
+
+The index is built from one pass over a tournament's matches (or, after a
+result, over the games of the players it affects) and maps each player to
+the games they were paired in. Only decided games count towards
+the tiebreaks; a bye scores its point but adds no opponent to Buchholz or
+Sonneborn-Berger.
+
+- ``buchholz``: sum of the opponents' points.
+- ``median_buchholz``: Buchholz without the best and worst opponent (from
+  three opponents on).
+- ``sonneborn_berger``: sum of the points of the opponents beaten (there are
+  no draws).
+- ``progressive``: sum of the player's running score after each round.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+
+from .models import Match, Score
+
+TIEBREAKS = ("buchholz", "median_buchholz", "sonneborn_berger", "progressive")
+
+
+def get_tiebreak_order() -> Tuple[str, ...]:
+    return tuple(getattr(settings, "LEADERBOARD_TIEBREAKS", ()))
+
+
+@dataclass
+class Game:
+    round_number: int
+    opponent_id: Optional[int]
+    # 1 for a win, 0 for a loss, ``None`` while undecided.
+    points: Optional[int]
+
+
+OpponentIndex = Dict[int, List[Game]]
+
+
+def build_opponent_index(
+    rows: Iterable[Tuple[int, int, Optional[int], Optional[int]]]
+) -> OpponentIndex:
+    """Index ``(round_number, player1, player2, winner)`` rows by player."""
+    index: OpponentIndex = defaultdict(list)
+    for round_number, white_id, black_id, winner_id in rows:
+        decided = winner_id is not None
+        index[white_id].append(
+            Game(
+                round_number, black_id, int(winner_id == white_id) if decided else None
+            )
+        )
+        if black_id is not None:
+            index[black_id].append(
+                Game(
+                    round_number,
+                    white_id,
+                    int(winner_id == black_id) if decided else None,
+                )
+            )
+    return index
+
+
+def load_opponent_index(tournament_id: int) -> OpponentIndex:
+    """Map every paired player to their games, in one query."""
+    return build_opponent_index(
+        Match.objects.filter(tournament_id=tournament_id)
+        .order_by("round_number", "id")
+        .values_list("round_number", "player1_id", "player2_id", "winner_id")
+    )
+
+
+def load_neighbourhood(
+    tournament_id: int, player_ids: Iterable[int]
+) -> Tuple[OpponentIndex, Dict[int, int], int]:
+    """What the tiebreaks of ``player_ids`` and their opponents depend on.
+
+    Returns the games of those players, the points of everyone they were
+    paired with and the last round of the tournament, in three queries that
+    only read the matches of the players involved.
+    """
+    player_ids = list(player_ids)
+    matches = Match.objects.filter(tournament_id=tournament_id)
+    opponents = [
+        matches.filter(player1_id__in=player_ids).values("player2_id"),
+        matches.filter(player2_id__in=player_ids).values("player1_id"),
+    ]
+    paired = Q()
+    for ids in [player_ids, *opponents]:
+        paired |= Q(player1_id__in=ids) | Q(player2_id__in=ids)
+    index = build_opponent_index(
+        matches.filter(paired)
+        .order_by("round_number", "id")
+        .values_list("round_number", "player1_id", "player2_id", "winner_id")
+    )
+    points = dict(
+        matches.filter(winner_id__in=list(index))
+        .values_list("winner_id")
+        .annotate(Count("id"))
+        .order_by()
+    )
+    last_round = matches.aggregate(last_round=Max("round_number"))["last_round"]
+    return index, points, last_round or 0
+
+
+def compute_tiebreaks(
+    index: OpponentIndex,
+    player_ids: Iterable[int],
+    points: Optional[Dict[int, int]] = None,
+    last_round: Optional[int] = None,
+) -> Dict[int, Dict[str, int]]:
+    """Tiebreaks of ``player_ids``, whose games must all be in ``index``.
+
+    ``points`` and ``last_round`` default to what the index holds, which is
+    only right for an index of the whole tournament.
+    """
+    if points is None:
+        points = {
+            player_id: sum(game.points or 0 for game in games)
+            for player_id, games in index.items()
+        }
+    if last_round is None:
+        last_round = max(
+            (game.round_number for games in index.values() for game in games),
+            default=0,
+        )
+    values = {}
+    for player_id in player_ids:
+        games = [game for game in index.get(player_id, ()) if game.points is not None]
+        opponents = [
+            points.get(game.opponent_id, 0)
+            for game in games
+            if game.opponent_id is not None
+        ]
+        median = sorted(opponents)[1:-1] if len(opponents) > 2 else opponents
+        by_round: Dict[int, int] = defaultdict(int)
+        for game in games:
+            by_round[game.round_number] += game.points
+        running = progressive = 0
+        for round_number in range(1, last_round + 1):
+            running += by_round[round_number]
+            progressive += running
+        values[player_id] = {
+            "buchholz": sum(opponents),
+            "median_buchholz": sum(median),
+            "sonneborn_berger": sum(
+                points.get(game.opponent_id, 0)
+                for game in games
+                if game.opponent_id is not None and game.points
+            ),
+            "progressive": progressive,
+        }
+    return values
+
+
+def player_value_case(values: Dict[int, int]) -> Case:
+    """``CASE`` giving each player's value, with one branch per distinct value.
+
+    Grouping the players by value keeps the statement linear in the number
+    of rows; one ``WHEN`` per player makes the database test every branch
+    for every row.
+    """
+    players_by_value: Dict[int, List[int]] = defaultdict(list)
+    for player_id, value in values.items():
+        players_by_value[value].append(player_id)
+    return Case(
+        *[
+            When(player_id__in=player_ids, then=Value(value))
+            for value, player_ids in players_by_value.items()
+        ],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def refresh_tiebreaks(tournament_id: int, player_ids: Iterable[int]) -> Set[int]:
+    """Recompute the tiebreaks touched by a points change of ``player_ids``.
+
+    Those players and everyone they were paired with are rewritten with one
+    ``UPDATE ... CASE`` statement; the rest of the standings are neither read
+    nor written. Returns the players whose rows were rewritten.
+    """
+    affected = set(player_ids)
+    if not affected:
+        return affected
+    index, points, last_round = load_neighbourhood(tournament_id, affected)
+    for player_id in list(affected):
+        affected.update(
+            game.opponent_id
+            for game in index.get(player_id, ())
+            if game.opponent_id is not None
+        )
+    values = compute_tiebreaks(index, affected, points, last_round)
+    Score.objects.filter(tournament_id=tournament_id, player_id__in=affected).update(
+        **{
+            name: player_value_case(
+                {player_id: value[name] for player_id, value in values.items()}
+            )
+            for name in TIEBREAKS
+        }
+    )
+    return affected
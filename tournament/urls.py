@@ -1,11 +1,20 @@
 from django.urls import path
+from . import async_views
 from .views import (
     TournamentListCreateAPIView,
     TournamentDetailAPIView,
+    TournamentLeaderboardAPIView,
+    LeaderboardRebuildAPIView,
+    TournamentRanksAPIView,
+    PlayerRankAPIView,
+    TournamentParticipantsAPIView,
+    RoundResultsAPIView,
     MatchListCreateAPIView,
+    GeneratePairingsAPIView,
     MatchDetailAPIView,
     ScoreListCreateAPIView,
     ScoreDetailAPIView,
+    tournament_events,
 )
 
 urlpatterns = [
@@ -19,8 +28,64 @@ urlpatterns = [
         TournamentDetailAPIView.as_view(),
         name="tournament-detail",
     ),
+    path(
+        "tournaments/<int:pk>/participants/",
+        TournamentParticipantsAPIView.as_view(),
+        name="tournament-participants",
+    ),
+    path(
+        "tournaments/<int:pk>/leaderboard/",
+        TournamentLeaderboardAPIView.as_view(),
+        name="tournament-leaderboard",
+    ),
+    path(
+        "tournaments/<int:pk>/leaderboard/rebuild/",
+        LeaderboardRebuildAPIView.as_view(),
+        name="tournament-leaderboard-rebuild",
+    ),
+    path(
+        "tournaments/<int:pk>/ranks/",
+        TournamentRanksAPIView.as_view(),
+        name="tournament-ranks",
+    ),
+    path(
+        "tournaments/<int:pk>/ranks/<int:player_id>/",
+        PlayerRankAPIView.as_view(),
+        name="tournament-player-rank",
+    ),
+    path(
+        "tournaments/<int:pk>/rounds/<int:round_number>/results/",
+        RoundResultsAPIView.as_view(),
+        name="tournament-round-results",
+    ),
     path("matches/", MatchListCreateAPIView.as_view(), name="match-list-create"),
+    path(
+        "matches/generate_pairings/",
+        GeneratePairingsAPIView.as_view(),
+        name="match-generate-pairings",
+    ),
     path("matches/<int:pk>/", MatchDetailAPIView.as_view(), name="match-detail"),
     path("scores/", ScoreListCreateAPIView.as_view(), name="score-list-create"),
     path("scores/<int:pk>/", ScoreDetailAPIView.as_view(), name="score-detail"),
 ]
+
+# Routed under ASGI only (see core/asgi_urls.py): GET of the async read
+# views, and the event stream, which holds its connection open and would
+# tie up a WSGI worker.
+async_urlpatterns = [
+    path(
+        "tournaments/<int:pk>/events/",
+        tournament_events,
+        name="tournament-events",
+    ),
+    path("tournaments/", async_views.TournamentListView.as_view()),
+    path("tournaments/<int:pk>/", async_views.TournamentDetailView.as_view()),
+    path(
+        "tournaments/<int:pk>/leaderboard/",
+        async_views.TournamentLeaderboardView.as_view(),
+    ),
+    path("matches/", async_views.MatchListView.as_view()),
+    path("matches/<int:pk>/", async_views.MatchDetailView.as_view()),
+    path("scores/", async_views.ScoreListView.as_view()),
+    path("scores/<int:pk>/", async_views.ScoreDetailView.as_view()),
+]
@@ -1,52 +1,110 @@
-from user.models import Player
+from typing import Dict, List, Optional
 
+from django.db import transaction
+
+from core.cache import invalidate_tags_on_commit
+
+from .events import publish_event
+from .history import record_matches
 from .models import Match, Tournament
+from .pairing import BLACK, WHITE, PairingPlayer, get_pairing_strategy
+from .signals import match_event, match_tags
+from .standings import apply_result_change, get_standings, POINTS_PER_WIN
 
 
-def generate_swiss_pairings(tournament_id, round_number):
-    tournament = Tournament.objects.get(id=tournament_id)
-    players = list(tournament.participants.all())
-    players.sort(key=lambda player: player.rating, reverse=True)
-
-    pairings = []
-    while len(players) > 1:
-        player1 = players.pop(0)
-        player2 = players.pop(0)
-        pairings.append((player1, player2))
-
-    if players:
-        player1 = players.pop(0)
-        pairings.append((player1, None))
-
-    matches = []
-    for player1, player2 in pairings:
-        match = Match(
-            tournament=tournament,
-            player1=player1,
-            player2=player2,
-            round_number=round_number,
-        )
-        matches.append(match)
+def load_pairing_players(tournament_id, round_number) -> List[PairingPlayer]:
+    """Build pairing records from the participants and all earlier rounds.
 
-    Match.objects.bulk_create(matches)
-    return matches
+    Uses one query for the participants and one for the match history.
+    """
+    through = Tournament.participants.through
+    players: Dict[int, PairingPlayer] = {
+        player_id: PairingPlayer(id=player_id, rating=rating)
+        for player_id, rating in through.objects.filter(
+            tournament_id=tournament_id
+        ).values_list("player_id", "player__rating")
+    }
+    history = (
+        Match.objects.filter(tournament_id=tournament_id, round_number__lt=round_number)
+        .order_by("round_number", "id")
+        .values_list("player1_id", "player2_id", "winner_id")
+    )
+    for white_id, black_id, winner_id in history:
+        white = players.get(white_id)
+        black = players.get(black_id)
+        if winner_id is not None and winner_id in players:
+            players[winner_id].score += POINTS_PER_WIN
+        if black_id is None:
+            if white:
+                white.had_bye = True
+            continue
+        if white:
+            white.opponents.add(black_id)
+            white.colours.append(WHITE)
+        if black:
+            black.opponents.add(white_id)
+            black.colours.append(BLACK)
+    return list(players.values())
 
 
-def calculate_leaderboard(tournament_id):
-    tournament = Tournament.objects.get(id=tournament_id)
-    matches = Match.objects.filter(tournament=tournament)
+def generate_swiss_pairings(
+    tournament_id, round_number, strategy: Optional[str] = None
+):
+    """Create the matches of a round, or return them if it is already paired.
 
-    # Reset points for all players in the tournament
-    for player in tournament.participants.all():
-        player.points = 0
-        player.save()
+    Locks the tournament row for the duration, so concurrent calls for one
+    tournament (other workers, retried requests) run one after the other and
+    all but the first return the first one's matches; other tournaments are
+    not blocked.
+    """
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(id=tournament_id)
+        existing = list(
+            Match.objects.filter(
+                tournament=tournament, round_number=round_number
+            ).order_by("id")
+        )
+        if existing:
+            return existing
+
+        players = load_pairing_players(tournament.id, round_number)
+        result = get_pairing_strategy(strategy).pair(players)
+        matches = [
+            Match(
+                tournament=tournament,
+                player1_id=white_id,
+                player2_id=black_id,
+                round_number=round_number,
+            )
+            for white_id, black_id in result.pairs
+        ]
+        if result.bye is not None:
+            # A bye scores as a win for the player sitting out.
+            matches.append(
+                Match(
+                    tournament=tournament,
+                    player1_id=result.bye,
+                    player2_id=None,
+                    winner_id=result.bye,
+                    round_number=round_number,
+                )
+            )
+
+        Match.objects.bulk_create(matches)
+        record_matches(matches)
+        if result.bye is not None:
+            apply_result_change(tournament.id, None, result.bye)
+        invalidate_tags_on_commit(*match_tags(tournament.id))
+        publish_event(
+            tournament.id,
+            {
+                "type": "pairings",
+                "round": round_number,
+                "matches": [match_event(match) for match in matches],
+            },
+        )
+    return matches
 
-    # Calculate points for each player based on match results
-    for match in matches:
-        if match.winner:
-            match.winner.points += 1
-            match.winner.save()
 
-    # Retrieve players sorted by points
-    players = tournament.participants.all().order_by("-points", "-rating")
-    return players
+def calculate_leaderboard(tournament_id, tiebreaks=None):
+    return get_standings(tournament_id, tiebreaks)
@@ -1,18 +1,41 @@
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.decorators import action
-from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from core.conditional import cached_response
+from core.pagination import KeysetPagination
+from core.streaming import stream_list, wants_stream
+from jobs.views import job_accepted
+from player.serializers import PlayerSerializer
+from user.authentication import CachedJWTAuthentication
+from user.models import Player
+from django.db import transaction
+from rest_framework.exceptions import NotFound
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.db.models import Q
+from django.conf import settings
+from . import rank_index
 from .models import Match, Tournament, Score
 from .serializers import (
     MatchSerializer,
+    ParticipantsSerializer,
+    RoundResultsSerializer,
     TournamentSerializer,
     LeaderboardSerializer,
     ScoreSerializer,
 )
-from .utils import generate_swiss_pairings, calculate_leaderboard
-from typing import Any, Optional, Dict
+from .events import event_stream
+from .jobs import (
+    enqueue_pairings,
+    enqueue_ratings_recompute,
+    enqueue_standings_rebuild,
+)
+from .participants import add_participants, get_participant_count, remove_participants
+from .standings import apply_result_change, get_tiebreak_order
+from .tiebreaks import TIEBREAKS
+from .utils import calculate_leaderboard
+from typing import Any, Dict, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,20 +51,36 @@ class IsAdminUserOrReadOnly(permissions.BasePermission):
 class TournamentListCreateAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
+    pagination_class = KeysetPagination
+
     def get(self, request: Any) -> Response:
-        tournaments = cache.get("tournaments")
-        if tournaments is None:
-            tournaments = Tournament.objects.prefetch_related("participants").all()
-            serializer = TournamentSerializer(tournaments, many=True)
-            tournaments = serializer.data
-            cache.set("tournaments", tournaments, 60 * 5)
-        return Response(tournaments)
+        try:
+            params = TournamentSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        reader = TournamentSerializer.values_reader(**params)
+        queryset = reader.queryset(Tournament.objects.all())
+        if wants_stream(request):
+            return stream_list(queryset, reader.render)
+        paginator = self.pagination_class()
+
+        def compute() -> Dict[str, Any]:
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        return cached_response(
+            request,
+            paginator.get_cache_key(
+                "tournaments", request, TournamentSerializer.get_cache_params(params)
+            ),
+            compute,
+            tags=["tournaments:list", *TournamentSerializer.expansion_tags(params)],
+        )
 
     def post(self, request: Any) -> Response:
         serializer = TournamentSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            cache.delete("tournaments")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -50,65 +89,252 @@ class TournamentDetailAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
     def get(self, request: Any, pk: int) -> Response:
-        cache_key = f"tournament_{pk}"
-        tournament = cache.get(cache_key)
-        if tournament is None:
-            tournament = Tournament.objects.prefetch_related("participants").get(pk=pk)
-            serializer = TournamentSerializer(tournament)
-            tournament = serializer.data
-            cache.set(cache_key, tournament, 60 * 5)
-        return Response(tournament)
+        try:
+            params = TournamentSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute() -> Dict[str, Any]:
+            reader = TournamentSerializer.values_reader(**params)
+            return reader.build(reader.queryset(Tournament.objects.all()).get(pk=pk))
+
+        return cached_response(
+            request,
+            TournamentSerializer.get_cache_key(f"tournament_{pk}", params),
+            compute,
+            tags=[f"tournament:{pk}", *TournamentSerializer.expansion_tags(params)],
+        )
 
     def put(self, request: Any, pk: int) -> Response:
         tournament = Tournament.objects.get(pk=pk)
         serializer = TournamentSerializer(tournament, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            cache.delete(f"tournament_{pk}")
-            cache.delete("tournaments")
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request: Any, pk: int) -> Response:
         tournament = Tournament.objects.get(pk=pk)
         tournament.delete()
-        cache.delete(f"tournament_{pk}")
-        cache.delete("tournaments")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(detail=True, methods=["get"])
-    def leaderboard(self, request: Any, pk: Optional[int] = None) -> Response:
-        players = calculate_leaderboard(pk)
-        serializer = LeaderboardSerializer(players, many=True)
-        return Response(serializer.data)
+
+class TournamentParticipantsAPIView(APIView):
+    """Paginated participants of a tournament, with bulk enroll and withdraw.
+
+    ``POST`` and ``DELETE`` take ``{"players": [ids]}``; ids already enrolled
+    (or not enrolled, for ``DELETE``) are skipped.
+    """
+
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    pagination_class = KeysetPagination
+
+    def get(self, request: Any, pk: int) -> Response:
+        try:
+            params = PlayerSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = self.pagination_class()
+
+        def compute() -> Dict[str, Any]:
+            if not Tournament.objects.filter(pk=pk).exists():
+                raise NotFound("Tournament not found")
+            reader = PlayerSerializer.values_reader(**params)
+            queryset = reader.queryset(Player.objects.filter(tournaments=pk))
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        return cached_response(
+            request,
+            paginator.get_cache_key(
+                f"participants_{pk}", request, PlayerSerializer.get_cache_params(params)
+            ),
+            compute,
+            tags=[f"tournament:{pk}", "players:list"],
+        )
+
+    def post(self, request: Any, pk: int) -> Response:
+        return self.change(request, pk, add=True)
+
+    def delete(self, request: Any, pk: int) -> Response:
+        return self.change(request, pk, add=False)
+
+    def change(self, request: Any, pk: int, add: bool) -> Response:
+        if not Tournament.objects.filter(pk=pk).exists():
+            return Response(
+                {"error": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        serializer = ParticipantsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        player_ids = [player.pk for player in serializer.validated_data["players"]]
+        if add:
+            result = {"added": len(add_participants(pk, player_ids))}
+        else:
+            result = {"removed": remove_participants(pk, player_ids)}
+        return Response({**result, "participant_count": get_participant_count(pk)})
+
+
+def get_requested_tiebreaks(query_params) -> Tuple[str, ...]:
+    """``?tiebreaks=`` or the configured order; raises ``ValueError`` if unknown."""
+    if "tiebreaks" not in query_params:
+        return get_tiebreak_order()
+    tiebreaks = tuple(name for name in query_params["tiebreaks"].split(",") if name)
+    unknown = [name for name in tiebreaks if name not in TIEBREAKS]
+    if unknown:
+        raise ValueError(f"Unknown tiebreaks: {', '.join(unknown)}")
+    return tiebreaks
+
+
+class TournamentLeaderboardAPIView(APIView):
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    def get(self, request: Any, pk: int) -> Response:
+        """Standings ordered by points, then by the requested tiebreaks.
+
+        ``?tiebreaks=sonneborn_berger,buchholz`` overrides the configured
+        ``LEADERBOARD_TIEBREAKS`` order.
+        """
+        try:
+            tiebreaks = get_requested_tiebreaks(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute() -> List[Dict[str, Any]]:
+            standings = calculate_leaderboard(pk, tiebreaks)
+            return LeaderboardSerializer(standings, many=True).data
+
+        return cached_response(
+            request,
+            f"leaderboard_{pk}:{','.join(tiebreaks)}",
+            compute,
+            tags=[f"standings:{pk}", "players:list"],
+        )
+
+
+def get_count_param(query_params, name: str, default: int) -> int:
+    """A positive ``?name=`` capped at ``API_MAX_PAGE_SIZE``; raises ``ValueError``."""
+    try:
+        value = int(query_params.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return min(value, getattr(settings, "API_MAX_PAGE_SIZE", 1000))
+
+
+def ranked_rows(players: List[rank_index.RankedPlayer]) -> List[Dict[str, Any]]:
+    """Rank index entries with the players' names (one primary key query)."""
+    names = dict(
+        Player.objects.filter(
+            pk__in=[player.player_id for player in players]
+        ).values_list("id", "name")
+    )
+    return [
+        {**player.as_dict(), "name": names.get(player.player_id)} for player in players
+    ]
+
+
+class TournamentRanksAPIView(APIView):
+    """The top ``?limit=`` (default 10) of the standings, from the rank index."""
+
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    def get(self, request: Any, pk: int) -> Response:
+        try:
+            limit = get_count_param(request.query_params, "limit", 10)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not limit:
+            return Response([])
+        return Response(ranked_rows(rank_index.top(pk, limit)))
+
+
+class PlayerRankAPIView(APIView):
+    """Rank of one player, or with ``?around=N`` the N players either side too."""
+
+    permission_classes = [IsAdminUserOrReadOnly]
+
+    def get(self, request: Any, pk: int, player_id: int) -> Response:
+        try:
+            size = get_count_param(request.query_params, "around", 0)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        players = rank_index.around(pk, player_id, size)
+        if not players:
+            return Response(
+                {"error": "Player is not ranked in this tournament"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        rows = ranked_rows(players)
+        if "around" not in request.query_params:
+            return Response(rows[0])
+        return Response(rows)
+
+
+class LeaderboardRebuildAPIView(APIView):
+    """Queue a full recomputation of a tournament's standings (202 + job)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request: Any, pk: int) -> Response:
+        if not Tournament.objects.filter(pk=pk).exists():
+            return Response(
+                {"error": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        job, _ = enqueue_standings_rebuild(pk)
+        return job_accepted(job)
 
 
 class MatchListCreateAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
+    pagination_class = KeysetPagination
+
     def get(self, request: Any) -> Response:
-        matches = cache.get("matches")
-        if matches is None:
-            matches = Match.objects.select_related(
-                "tournament", "player1", "player2", "winner"
-            ).all()
-            serializer = MatchSerializer(matches, many=True)
-            matches = serializer.data
-            cache.set("matches", matches, 60 * 5)
-        return Response(matches)
+        try:
+            params = MatchSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        reader = MatchSerializer.values_reader(**params)
+        queryset = reader.queryset(Match.objects.all())
+        if wants_stream(request):
+            return stream_list(queryset, reader.render)
+        paginator = self.pagination_class()
+
+        def compute() -> Dict[str, Any]:
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        return cached_response(
+            request,
+            paginator.get_cache_key(
+                "matches", request, MatchSerializer.get_cache_params(params)
+            ),
+            compute,
+            tags=["matches:list", *MatchSerializer.expansion_tags(params)],
+        )
 
     def post(self, request: Any) -> Response:
         serializer = MatchSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            cache.delete("matches")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(
-        detail=False, methods=["post"], permission_classes=[permissions.IsAdminUser]
-    )
-    def generate_pairings(self, request: Any) -> Response:
+
+class GeneratePairingsAPIView(APIView):
+    """Queue pairing generation for a round (see ``tournament.jobs``).
+
+    Returns 202 with the job; poll ``Location`` or listen for its ``job``
+    event on the tournament's event stream. Posting again while the job for
+    the same round is queued or running returns that job.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request: Any) -> Response:
         tournament_id = request.data.get("tournament_id")
         round_number = request.data.get("round_number")
 
@@ -117,62 +343,130 @@ class MatchListCreateAPIView(APIView):
                 {"error": "tournament_id and round_number are required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        matches = generate_swiss_pairings(tournament_id, round_number)
-        serializer = MatchSerializer(matches, many=True)
-        return Response(serializer.data)
+        try:
+            tournament_id, round_number = int(tournament_id), int(round_number)
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "tournament_id and round_number must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not Tournament.objects.filter(pk=tournament_id).exists():
+            return Response(
+                {"error": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        job, _ = enqueue_pairings(tournament_id, round_number)
+        return job_accepted(job)
+
+
+class RoundResultsAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request: Any, pk: int, round_number: int) -> Response:
+        with transaction.atomic():
+            matches = {
+                match.pk: match
+                for match in Match.objects.select_for_update()
+                .filter(tournament_id=pk, round_number=round_number)
+                .only(
+                    "id",
+                    "tournament",
+                    "player1",
+                    "player2",
+                    "winner",
+                    "round_number",
+                    "rated",
+                )
+            }
+            if not matches:
+                return Response(
+                    {"error": "Round not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+            serializer = RoundResultsSerializer(
+                data=request.data, context={"matches": matches}
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            updated = serializer.save()
+        return Response(
+            {
+                "updated": len(updated),
+                "matches": MatchSerializer(matches.values(), many=True).data,
+            }
+        )
 
 
 class MatchDetailAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
     def get(self, request: Any, pk: int) -> Response:
-        cache_key = f"match_{pk}"
-        match = cache.get(cache_key)
-        if match is None:
-            match = Match.objects.select_related(
-                "tournament", "player1", "player2", "winner"
-            ).get(pk=pk)
-            serializer = MatchSerializer(match)
-            match = serializer.data
-            cache.set(cache_key, match, 60 * 5)
-        return Response(match)
+        try:
+            params = MatchSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute() -> Dict[str, Any]:
+            reader = MatchSerializer.values_reader(**params)
+            return reader.build(reader.queryset(Match.objects.all()).get(pk=pk))
+
+        return cached_response(
+            request,
+            MatchSerializer.get_cache_key(f"match_{pk}", params),
+            compute,
+            tags=[f"match:{pk}", *MatchSerializer.expansion_tags(params)],
+        )
 
     def put(self, request: Any, pk: int) -> Response:
         match = Match.objects.get(pk=pk)
         serializer = MatchSerializer(match, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            cache.delete(f"match_{pk}")
-            cache.delete("matches")
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request: Any, pk: int) -> Response:
         match = Match.objects.get(pk=pk)
-        match.delete()
-        cache.delete(f"match_{pk}")
-        cache.delete("matches")
+        with transaction.atomic():
+            apply_result_change(match.tournament_id, match.winner_id, None)
+            match.delete()
+            if match.rated:
+                # Its rating deltas are only taken out by a replay.
+                enqueue_ratings_recompute()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ScoreListCreateAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
+    pagination_class = KeysetPagination
+
     def get(self, request: Any) -> Response:
-        scores = cache.get("scores")
-        if scores is None:
-            scores = Score.objects.select_related("player", "tournament").all()
-            serializer = ScoreSerializer(scores, many=True)
-            scores = serializer.data
-            cache.set("scores", scores, 60 * 5)
-        return Response(scores)
+        try:
+            params = ScoreSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        reader = ScoreSerializer.values_reader(**params)
+        queryset = reader.queryset(Score.objects.all())
+        if wants_stream(request):
+            return stream_list(queryset, reader.render)
+        paginator = self.pagination_class()
+
+        def compute() -> Dict[str, Any]:
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(reader.render(page)).data
+
+        return cached_response(
+            request,
+            paginator.get_cache_key(
+                "scores", request, ScoreSerializer.get_cache_params(params)
+            ),
+            compute,
+            tags=["scores:list", *ScoreSerializer.expansion_tags(params)],
+        )
 
     def post(self, request: Any) -> Response:
         serializer = ScoreSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            cache.delete("scores")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -181,28 +475,51 @@ class ScoreDetailAPIView(APIView):
     permission_classes = [IsAdminUserOrReadOnly]
 
     def get(self, request: Any, pk: int) -> Response:
-        cache_key = f"score_{pk}"
-        score = cache.get(cache_key)
-        if score is None:
-            score = Score.objects.select_related("player", "tournament").get(pk=pk)
-            serializer = ScoreSerializer(score)
-            score = serializer.data
-            cache.set(cache_key, score, 60 * 5)
-        return Response(score)
+        try:
+            params = ScoreSerializer.get_field_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute() -> Dict[str, Any]:
+            reader = ScoreSerializer.values_reader(**params)
+            return reader.build(reader.queryset(Score.objects.all()).get(pk=pk))
+
+        return cached_response(
+            request,
+            ScoreSerializer.get_cache_key(f"score_{pk}", params),
+            compute,
+            tags=[f"score:{pk}", *ScoreSerializer.expansion_tags(params)],
+        )
 
     def put(self, request: Any, pk: int) -> Response:
         score = Score.objects.get(pk=pk)
         serializer = ScoreSerializer(score, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            cache.delete(f"score_{pk}")
-            cache.delete("scores")
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request: Any, pk: int) -> Response:
         score = Score.objects.get(pk=pk)
         score.delete()
-        cache.delete(f"score_{pk}")
-        cache.delete("scores")
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+async def tournament_events(request: Any, pk: int) -> HttpResponse:
+    """Stream pairing, result and standings events of a tournament (SSE).
+
+    Needs an ASGI server; the JWT is checked once when the stream opens.
+    """
+    try:
+        auth = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as exc:
+        return JsonResponse({"detail": str(exc.detail)}, status=401)
+    if auth is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+    return StreamingHttpResponse(
+        event_stream(pk),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
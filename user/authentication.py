@@ -0,0 +1,219 @@
+"""JWT authentication that resolves the user without a database query.
+
+``JWTAuthentication`` loads the ``User`` of every request by primary key.
+``CachedJWTAuthentication`` loads it once, with its ``Player``, and keeps
+it in a small per-process LRU (``AUTH_USER_LOCAL_TTL`` seconds) in front
+of the shared cache (``AUTH_USER_CACHE_TTL``), so an authenticated request
+that is answered from the cache makes no query at all. Only the fields
+those checks read are cached, never the password hash; every request
+gets new instances built from them.
+
+Saving or deleting the user or their player, and blacklisting one of their
+tokens, drops the shared entry and this process's copy (see
+``user/signals.py``). Other processes keep their local copy until it
+expires, which bounds how long a deactivated user stays signed in there.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Player
+
+
+def get_cache_ttl() -> int:
+    return getattr(settings, "AUTH_USER_CACHE_TTL", 60 * 5)
+
+
+def get_local_ttl() -> float:
+    return getattr(settings, "AUTH_USER_LOCAL_TTL", 5)
+
+
+def _cache_key(user_id: Any) -> str:
+    # v2: plain field values instead of a pickled ``User``.
+    return f"auth:user:v2:{user_id}"
+
+
+Entry = Dict[str, Any]
+
+
+class LocalUserCache:
+    """Thread-safe LRU of user cache entries with a per-entry expiry time."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Entry, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_users = LocalUserCache(getattr(settings, "AUTH_USER_LOCAL_SIZE", 10_000))
+
+
+# What authentication and permission checks read; other fields load on use.
+USER_FIELDS = ["id", "username", "is_active", "is_staff", "is_superuser"]
+PLAYER_FIELDS = ["id", "user_id", "name", "rating"]
+
+
+def _load_entry(user_id: Any) -> Optional[Entry]:
+    """The cached fields of a user and their player, without the password.
+
+    With ``CHECK_REVOKE_TOKEN`` the entry keeps the digest that tokens carry
+    in their revoke claim, not the password hash.
+    """
+    columns = [*USER_FIELDS, "player__id", "player__name", "player__rating"]
+    if api_settings.CHECK_REVOKE_TOKEN:
+        columns.append("password")
+    row = (
+        User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+        .values_list(*columns)
+        .first()
+    )
+    if row is None:
+        return None
+    user = row[: len(USER_FIELDS)]
+    player_id, name, rating = row[len(USER_FIELDS) : len(USER_FIELDS) + 3]
+    entry = {
+        "user": user,
+        "player": None if player_id is None else (player_id, user[0], name, rating),
+        "revoke": None,
+    }
+    if api_settings.CHECK_REVOKE_TOKEN:
+        entry["revoke"] = get_md5_hash_password(row[-1])
+    return entry
+
+
+def _instance(model, field_names: List[str], values: Sequence[Any]):
+    """A model instance with only ``field_names`` loaded, as from a query."""
+    loaded = dict(zip(field_names, values))
+    # ``from_db`` takes the values in the order of the model's fields.
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in loaded]
+    return model.from_db("default", names, [loaded[name] for name in names])
+
+
+def _build_user(entry: Entry) -> User:
+    """Fresh model instances from a cache entry, the player attached."""
+    user = _instance(User, USER_FIELDS, entry["user"])
+    player = None
+    if entry["player"] is not None:
+        player = _instance(Player, PLAYER_FIELDS, entry["player"])
+        Player.user.field.set_cached_value(player, user)
+    # Without a player, ``user.player`` raises without querying.
+    User.player.related.set_cached_value(user, player)
+    return user
+
+
+def load_entry(user_id: Any) -> Optional[Entry]:
+    """The cache entry of a user, loaded on a miss; ``None`` if not found."""
+    key = _cache_key(user_id)
+    entry = local_users.get(key)
+    if entry is None:
+        entry = cache.get(key)
+        if entry is None:
+            entry = _load_entry(user_id)
+            if entry is None:
+                return None
+            cache.set(key, entry, get_cache_ttl())
+        local_users.set(key, entry, get_local_ttl())
+    return entry
+
+
+def load_user(user_id: Any) -> Optional[User]:
+    """The user with ``USER_ID_FIELD`` ``user_id`` and their player, cached.
+
+    Returns ``None`` if there is no such user. Each call builds new
+    instances, so changes to ``request.user`` never leak into the cache.
+    Fields that are not cached load from the database when read.
+    """
+    entry = load_entry(user_id)
+    return None if entry is None else _build_user(entry)
+
+
+def forget_user(user_id: Any) -> None:
+    """Drop a cached user now and again once the current transaction commits.
+
+    The second drop discards anything a concurrent request cached from the
+    pre-commit state in between.
+    """
+    forget_users([user_id])
+
+
+def forget_users(user_ids: Iterable[Any]) -> None:
+    """``forget_user`` for many users, for writers that send no signals."""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    def drop() -> None:
+        for key in keys:
+            local_users.delete(key)
+        cache.delete_many(keys)
+
+    drop()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(drop)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` with the user lookup served by ``load_user``."""
+
+    def get_user(self, validated_token: Token) -> User:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        entry = load_entry(user_id)
+        if entry is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user = _build_user(entry)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry["revoke"]:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,52 @@
+"""Background jobs of accounts, run by ``manage.py run_jobs``."""
+
+from typing import Any, Dict, List
+
+from django.dispatch import receiver
+
+from jobs.models import Job
+from jobs.queue import enqueue, job_finished, register
+
+from .provisioning import get_hash_workers, make_hash_pool, provision_accounts
+
+PROVISION_ACCOUNTS = "user.provision_accounts"
+
+
+def enqueue_provisioning(rows: List[Any]):
+    return enqueue(PROVISION_ACCOUNTS, {"rows": rows})
+
+
+def without_passwords(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "rows": [
+            (
+                {name: value for name, value in row.items() if name != "password"}
+                if isinstance(row, dict)
+                else row
+            )
+            for row in payload.get("rows", [])
+        ]
+    }
+
+
+@register(PROVISION_ACCOUNTS)
+def provision(rows: List[Any]) -> Dict[str, Any]:
+    pool = make_hash_pool(get_hash_workers())
+    try:
+        result = provision_accounts(rows, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {"created": result.created, "errors": result.errors}
+
+
+@receiver(job_finished)
+def forget_passwords(sender: Any, job: Job, **kwargs: Any) -> None:
+    """Drop the plain-text passwords of a finished provisioning job.
+
+    They stay in the payload only while the job may still be retried.
+    """
+    if job.kind != PROVISION_ACCOUNTS:
+        return
+    job.payload = without_passwords(job.payload)
+    Job.objects.filter(pk=job.pk).update(payload=job.payload)
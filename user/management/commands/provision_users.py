@@ -0,0 +1,73 @@
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from player.transfer import FORMATS, parse_rows
+from user.provisioning import (
+    MAX_ROWS,
+    get_hash_workers,
+    make_hash_pool,
+    provision_accounts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users, and their players, from a CSV or NDJSON file (use - for "
+        "stdin) with columns username,email,password,name,age,rating,country."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FORMATS,
+            help="Input format (default: from the file extension, else csv).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MAX_ROWS,
+            help="Accounts hashed and inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        created = failed = 0
+        line = 0  # Records read before the current batch.
+        # Forked once for the whole file, and shut down with the command.
+        pool = make_hash_pool(get_hash_workers())
+        try:
+            rows = (_without_blanks(row) for row in parse_rows(stream, file_format))
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+                result = provision_accounts(batch, pool)
+                for error in result.errors:
+                    self.stderr.write(f"Row {line + error['row']}: {error['errors']}")
+                created += len(result.created)
+                failed += len(result.errors)
+                line += len(batch)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        summary = f"Created {created} accounts."
+        if failed:
+            raise CommandError(f"{summary} {failed} rows could not be created.")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+
+def _without_blanks(row):
+    # Empty CSV cells mean "not given" (e.g. no player, or no password).
+    if isinstance(row, dict):
+        return {name: value for name, value in row.items() if value not in ("", None)}
+    return row
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0003_alter_player_user_delete_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="rated_games",
+            field=models.IntegerField(default=0),
+        ),
+    ]
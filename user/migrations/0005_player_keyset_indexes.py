@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 20:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0004_player_rated_games"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(fields=["rating", "id"], name="player_rating_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(fields=["points", "id"], name="player_points_id_idx"),
+        ),
+    ]
@@ -6,8 +6,16 @@ class Player(models.Model):
     name = models.CharField(max_length=100)
     age = models.IntegerField()
     rating = models.IntegerField(default=1200)
+    rated_games = models.IntegerField(default=0)
     country = models.CharField(max_length=100)
     points = models.IntegerField(default=0)  # Add points field
 
+    class Meta:
+        # Keyset pages of ?ordering=rating/points (see core.pagination).
+        indexes = [
+            models.Index(fields=['rating', 'id'], name='player_rating_id_idx'),
+            models.Index(fields=['points', 'id'], name='player_points_id_idx'),
+        ]
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""Bulk creation of user accounts and their players.
+
+Password hashing is deliberately slow (PBKDF2 costs tens of milliseconds
+per password), so a roster registered with one ``create_user`` per account
+keeps a request worker busy for seconds. ``provision_accounts`` validates
+every row first, hashes the passwords, and then inserts the users and
+players with two ``bulk_create`` calls in one transaction.
+
+Hashing a full batch takes minutes, so it never runs in a web worker:
+``POST /api/auth/provision/`` queues a job (see ``user.jobs``) and the
+``run_jobs`` worker, like the ``provision_users`` command, hashes on a pool
+of ``PROVISIONING_HASH_WORKERS`` forked processes that lives as long as the
+batch.
+
+Invalid rows, and usernames that are taken, are reported per row and the
+other rows are still created.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from core.cache import invalidate_tags_on_commit
+from .models import Player
+
+PLAYER_FIELDS = ["name", "age", "rating", "country"]
+MAX_ROWS = 1000
+# Rows hashed per task sent to a worker process.
+HASH_CHUNK_SIZE = 8
+
+
+class AccountRowSerializer(serializers.Serializer):
+    """One account; the player fields are optional but go together."""
+
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()]
+    )
+    email = serializers.EmailField(required=False, allow_blank=True, default="")
+    # Accounts without a password get an unusable one until they reset it.
+    password = serializers.CharField(required=False, write_only=True, max_length=128)
+    name = serializers.CharField(required=False, max_length=100)
+    age = serializers.IntegerField(required=False, min_value=0)
+    rating = serializers.IntegerField(required=False, min_value=0)
+    country = serializers.CharField(required=False, max_length=100)
+
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if any(name in data for name in PLAYER_FIELDS):
+            missing = {
+                name: ["This field is required to create a player."]
+                for name in ("name", "age", "country")
+                if name not in data
+            }
+            if missing:
+                raise serializers.ValidationError(missing)
+        return data
+
+
+@dataclass
+class ProvisionResult:
+    created: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def get_hash_workers() -> int:
+    return getattr(settings, "PROVISIONING_HASH_WORKERS", None) or os.cpu_count() or 1
+
+
+def make_hash_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """A pool of ``workers`` hashing processes; ``None`` for one or fewer.
+
+    Only for single-threaded processes such as management commands: the
+    workers are forked. Shut it down when the batch is done.
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(workers)
+
+
+def hash_passwords(
+    passwords: List[Optional[str]], pool: Optional[ProcessPoolExecutor] = None
+) -> List[str]:
+    """``make_password`` of each password, on ``pool`` if one is given.
+
+    ``None`` gives an unusable password. Without a pool, and for a single
+    password, the hashing happens in this process.
+    """
+    if pool is None or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+def _validate(rows: List[Any], result: ProvisionResult) -> Dict[int, Dict[str, Any]]:
+    """Valid rows by 1-based row number; the others go to ``result.errors``."""
+    # One serializer for every row: a new one per row would copy its fields.
+    serializer = AccountRowSerializer()
+    valid: Dict[int, Dict[str, Any]] = {}
+    seen = set()
+    for number, row in enumerate(rows, 1):
+        try:
+            data = serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            result.errors.append({"row": number, "errors": exc.detail})
+            continue
+        if data["username"] in seen:
+            result.errors.append(
+                {"row": number, "errors": {"username": ["Repeated in this batch."]}}
+            )
+            continue
+        seen.add(data["username"])
+        valid[number] = data
+    return valid
+
+
+def _reject_taken(valid: Dict[int, Dict[str, Any]], result: ProvisionResult) -> None:
+    taken = set(
+        User.objects.filter(
+            username__in=[data["username"] for data in valid.values()]
+        ).values_list("username", flat=True)
+    )
+    for number, data in list(valid.items()):
+        if data["username"] in taken:
+            result.errors.append(
+                {
+                    "row": number,
+                    "errors": {
+                        "username": ["A user with that username already exists."]
+                    },
+                }
+            )
+            del valid[number]
+
+
+def _insert(valid: Dict[int, Dict[str, Any]], result: ProvisionResult) -> None:
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=data["username"],
+                email=data["email"],
+                password=data["password"],
+            )
+            for data in valid.values()
+        ]
+    )
+    players = Player.objects.bulk_create(
+        [
+            Player(
+                user=user,
+                **{name: data[name] for name in PLAYER_FIELDS if name in data}
+            )
+            for user, data in zip(users, valid.values())
+            if "name" in data
+        ]
+    )
+    player_ids = {player.user_id: player.pk for player in players}
+    result.created.extend(
+        {
+            "row": number,
+            "id": user.pk,
+            "username": user.username,
+            "player": player_ids.get(user.pk),
+        }
+        for number, user in zip(valid, users)
+    )
+    if players:
+        # ``bulk_create`` sends no signals.
+        invalidate_tags_on_commit("players:list")
+
+
+def provision_accounts(
+    rows: Iterable[Any], pool: Optional[ProcessPoolExecutor] = None
+) -> ProvisionResult:
+    """Create the users (and players) of valid ``rows``; report the others.
+
+    Rows are numbered from 1 in ``result.errors`` and ``result.created``.
+    The passwords are hashed on ``pool`` (see ``hash_passwords``), and the
+    accounts are created in one transaction after the hashing.
+    """
+    result = ProvisionResult()
+    valid = _validate(list(rows), result)
+    _reject_taken(valid, result)
+    hashes = hash_passwords([data.get("password") for data in valid.values()], pool)
+    for data, password in zip(valid.values(), hashes):
+        data["password"] = password
+    while valid:
+        try:
+            with transaction.atomic():
+                _insert(valid, result)
+            break
+        except IntegrityError:
+            # Another request took one of the usernames since the check.
+            before = len(valid)
+            _reject_taken(valid, result)
+            if len(valid) == before:
+                raise
+    result.errors.sort(key=lambda error: error["row"])
+    return result
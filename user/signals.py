@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import forget_user
+from .models import Player
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Player)
+def forget_cached_player(sender, instance, **kwargs):
+    # The cached user carries their player.
+    forget_user(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def forget_blacklisted_user(sender, instance, **kwargs):
+    if instance.token.user_id is not None:
+        forget_user(instance.token.user_id)
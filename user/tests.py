@@ -1,3 +1,240 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from jobs.queue import claim_jobs, run_job
+from player.transfer import import_players
+from tournament.ratings import recompute_all_ratings
+from user.authentication import _cache_key, local_users
+from user.models import Player
+
+
+@pytest.fixture
+def arbiter():
+    cache.clear()
+    local_users.clear()
+    user = User.objects.create_user(
+        username="arbiter", password="password", is_staff=True
+    )
+    Player.objects.create(user=user, name="Arbiter", age=40, country="USA")
+    return user
+
+
+def bearer_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+@pytest.mark.django_db
+def test_cached_reads_make_no_queries(arbiter, django_assert_num_queries):
+    client = bearer_client(arbiter)
+    url = reverse("player-list-create")
+    client.get(url)
+
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.status_code == 200
+    # The player comes with the cached user.
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.wsgi_request.user.player.name == "Arbiter"
+
+    # Another process (empty local cache) is served from the shared cache.
+    local_users.clear()
+    with django_assert_num_queries(0):
+        client.get(url)
+
+
+@pytest.mark.django_db
+def test_cache_holds_no_password_and_no_shared_instances(
+    arbiter, django_assert_num_queries
+):
+    client = bearer_client(arbiter)
+    url = reverse("player-list-create")
+    first = client.get(url).wsgi_request.user
+    assert arbiter.password not in str(cache.get(_cache_key(arbiter.pk)))
+
+    first.player.name = "Changed in a view"
+    first.is_staff = False
+    user = client.get(url).wsgi_request.user
+    assert (user.player.name, user.is_staff) == ("Arbiter", True)
+    # Fields that are not cached are loaded when read.
+    with django_assert_num_queries(1):
+        assert user.check_password("password")
+
+
+@pytest.mark.django_db
+def test_user_and_player_changes_are_seen(arbiter):
+    client = bearer_client(arbiter)
+    url = reverse("player-list-create")
+    payload = {"name": "New", "age": 20, "rating": 1500, "country": "USA"}
+    client.get(url)
+
+    arbiter.is_staff = False
+    arbiter.save()
+    assert client.post(url, payload).status_code == 403
+
+    client.get(url)
+    arbiter.player.name = "Chief Arbiter"
+    arbiter.player.save()
+    assert client.get(url).wsgi_request.user.player.name == "Chief Arbiter"
+
+    arbiter.is_active = False
+    arbiter.save()
+    assert client.get(url).status_code == 401
+    arbiter.delete()
+    assert client.get(url).status_code == 401
+
+
+@pytest.mark.django_db
+def test_blacklisting_a_token_drops_the_user(arbiter):
+    client = bearer_client(arbiter)
+    client.get(reverse("player-list-create"))
+    assert cache.get(_cache_key(arbiter.pk)) is not None
+
+    RefreshToken.for_user(arbiter).blacklist()
+    assert cache.get(_cache_key(arbiter.pk)) is None
+    assert local_users.get(_cache_key(arbiter.pk)) is None
+
+
+@pytest.fixture
+def admin_client(arbiter):
+    arbiter.is_superuser = True
+    arbiter.save()
+    return bearer_client(arbiter)
+
+
+def run_provisioning(job_id):
+    (job,) = claim_jobs("worker-1")
+    assert job.pk == job_id
+    return run_job(job)
+
+
+@pytest.mark.django_db
+def test_provisioning_creates_valid_rows_and_reports_the_others(admin_client, settings):
+    settings.PROVISIONING_HASH_WORKERS = 2
+    accounts = [
+        {
+            "username": "alice",
+            "password": "s3cret-pass",
+            "name": "Alice",
+            "age": 12,
+            "country": "USA",
+        },
+        {"username": "bob", "password": "hunter22", "email": "bob@example.com"},
+        {"username": "arbiter", "password": "password"},
+        {"username": "carol", "name": "Carol", "age": -1, "country": "USA"},
+        {"username": "alice", "password": "again"},
+        {
+            "username": "dave",
+            "password": "pa55word",
+            "name": "Dave",
+            "age": 15,
+            "rating": 1650,
+            "country": "NOR",
+        },
+        {"username": "erin", "name": "Erin", "age": 16, "country": "USA"},
+    ]
+    response = admin_client.post(
+        reverse("provision"), {"accounts": accounts}, format="json"
+    )
+    # The request only queues the job, and does not echo the passwords.
+    assert response.status_code == 202
+    assert not User.objects.filter(username="alice").exists()
+    assert "password" not in response.data["payload"]["rows"][0]
+
+    job = run_provisioning(response.data["id"])
+    assert job.status == "succeeded"
+    assert [row["username"] for row in job.result["created"]] == [
+        "alice",
+        "bob",
+        "dave",
+        "erin",
+    ]
+    assert [row["row"] for row in job.result["created"]] == [1, 2, 6, 7]
+    assert [error["row"] for error in job.result["errors"]] == [3, 4, 5]
+    assert set(job.result["errors"][1]["errors"]) == {"age"}
+    # Once the job is done, its payload no longer holds the passwords.
+    job = admin_client.get(response["Location"]).data
+    assert all("password" not in row for row in job["payload"]["rows"])
+
+    assert User.objects.get(username="alice").check_password("s3cret-pass")
+    assert User.objects.get(username="bob").email == "bob@example.com"
+    assert not User.objects.get(username="erin").has_usable_password()
+    assert not Player.objects.filter(user__username="bob").exists()
+    dave = Player.objects.get(user__username="dave")
+    assert (dave.rating, dave.country) == (1650, "NOR")
+    assert job["result"]["created"][2]["player"] == dave.pk
+    assert Player.objects.get(user__username="alice").rating == 1200
+
+
+@pytest.mark.django_db
+def test_provisioning_endpoint_validation(admin_client, arbiter):
+    url = reverse("provision")
+    response = admin_client.post(
+        url, {"accounts": [{"username": "x", "name": "X"}]}, format="json"
+    )
+    # Rows are reported the same way when none of them could be created.
+    assert response.status_code == 202
+    job = run_provisioning(response.data["id"])
+    assert job.result["created"] == []
+    assert set(job.result["errors"][0]["errors"]) == {"age", "country"}
+
+    assert admin_client.post(url, {"accounts": []}, format="json").status_code == 400
+    assert admin_client.post(url, [], format="json").status_code == 400
+
+    arbiter.is_staff = False
+    arbiter.save()
+    response = admin_client.post(url, {"accounts": [{"username": "x"}]}, format="json")
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_provision_users_command(arbiter, tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text(
+        "username,email,password,name,age,rating,country\n"
+        "frank,,pw-frank,Frank,14,,USA\n"
+        "arbiter,,pw,,,,\n"
+        "grace,grace@example.com,pw-grace,,,,\n"
+    )
+    out, err = StringIO(), StringIO()
+    with pytest.raises(CommandError, match="Created 2 accounts. 1 rows"):
+        call_command(
+            "provision_users", str(path), "--batch-size", "2", stdout=out, stderr=err
+        )
+    assert "Row 2:" in err.getvalue()
+    assert Player.objects.get(user__username="frank").name == "Frank"
+    assert User.objects.get(username="grace").check_password("pw-grace")
+
+
+@pytest.mark.django_db
+def test_bulk_player_writes_drop_cached_users(arbiter):
+    client = bearer_client(arbiter)
+    url = reverse("player-list-create")
+    key = _cache_key(arbiter.pk)
+
+    client.get(url)
+    import_players(
+        [
+            {
+                "username": "arbiter",
+                "name": "Imported",
+                "age": 41,
+                "rating": 1900,
+                "country": "USA",
+            }
+        ]
+    )
+    assert cache.get(key) is None and local_users.get(key) is None
+    assert client.get(url).wsgi_request.user.player.rating == 1900
+
+    recompute_all_ratings()
+    assert cache.get(key) is None
+    assert client.get(url).wsgi_request.user.player.rating == 1200
@@ -1,7 +1,11 @@
 from django.contrib.auth.models import User
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
+from jobs.views import job_accepted
+from .jobs import enqueue_provisioning, without_passwords
+from .provisioning import MAX_ROWS
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer
 
 class RegisterView(generics.CreateAPIView):
@@ -22,3 +26,33 @@ class LoginView(generics.GenericAPIView):
             'refresh': str(refresh),
             'access': str(refresh.access_token),
         })
+
+
+class ProvisionView(APIView):
+    """Queue the creation of up to ``MAX_ROWS`` accounts, with their players.
+
+    Hashing the passwords takes up to minutes, so it runs in a job (see
+    ``user.jobs``). Returns 202 with the job; once it has finished, its
+    ``result`` is ``{'created': [...], 'errors': [...]}``, where rows that
+    could not be created are reported without stopping the others.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        accounts = None
+        if isinstance(request.data, dict):
+            accounts = request.data.get('accounts')
+        if not isinstance(accounts, list) or not accounts:
+            return Response(
+                {'error': 'accounts must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(accounts) > MAX_ROWS:
+            return Response(
+                {'error': f'At most {MAX_ROWS} accounts per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        job, _ = enqueue_provisioning(accounts)
+        # Not echoed back; the job drops them from its payload once finished.
+        job.payload = without_passwords(job.payload)
+        return job_accepted(job)